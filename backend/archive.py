@@ -0,0 +1,276 @@
+"""
+Columnar archive tier for SmartZone-R.
+Readings older than ARCHIVE_AFTER_DAYS are moved out of SQLite into Parquet
+files partitioned by day and zone (hive layout: day=YYYY-MM-DD/zone=N/).
+Reads memory-map the files and push column selection and zone/time
+filters down to the scan, so partitions and row groups outside the
+requested range are never decoded.
+"""
+
+import os
+import asyncio
+import argparse
+import logging
+from datetime import datetime, timedelta
+from typing import Iterator, Optional
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+
+import database
+from executor import run_blocking
+from rollups import update_rollups
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_PATH = os.getenv("ARCHIVE_PATH", "../software/data/archive")
+if not os.path.isabs(ARCHIVE_PATH):
+    ARCHIVE_PATH = os.path.join(os.path.dirname(__file__), ARCHIVE_PATH)
+
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "30"))
+# 0 disables the periodic archiver (the CLI still works)
+ARCHIVE_INTERVAL_SECONDS = float(os.getenv("ARCHIVE_INTERVAL_SECONDS", "86400"))
+
+ARCHIVE_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("timestamp", pa.timestamp("us")),
+    ("flight_id", pa.string()),
+    ("aircraft", pa.string()),
+    ("zone", pa.int64()),
+    ("rubber_mm", pa.float64()),
+    ("cracks_mm", pa.float64()),
+    ("water_mm", pa.float64()),
+    ("stress", pa.float64()),
+    ("fod_weight_g", pa.float64()),
+    ("temperature_C", pa.float64()),
+    ("humidity_pct", pa.float64()),
+    ("rain_mm", pa.float64()),
+    ("anomaly", pa.int64()),
+    ("created_at", pa.string()),
+    ("day", pa.string()),
+])
+PARTITIONING = ds.partitioning(pa.schema([("day", pa.string()), ("zone", pa.int64())]), flavor="hive")
+DATA_COLUMNS = [name for name in ARCHIVE_SCHEMA.names if name != "day"]
+
+_FILESYSTEM = pafs.LocalFileSystem(use_mmap=True)
+
+
+def open_archive(archive_path=None) -> Optional[ds.Dataset]:
+    """Open the archive as a memory-mapped dataset, or None if it is empty."""
+    root = archive_path or ARCHIVE_PATH
+    if not os.path.isdir(root):
+        return None
+    dataset = ds.dataset(
+        root, schema=ARCHIVE_SCHEMA, format="parquet",
+        partitioning=PARTITIONING, filesystem=_FILESYSTEM,
+    )
+    return dataset if dataset.files else None
+
+
+def archive_days(archive_path=None) -> list:
+    """Archived days (YYYY-MM-DD), oldest first."""
+    root = archive_path or ARCHIVE_PATH
+    if not os.path.isdir(root):
+        return []
+    return sorted(name[4:] for name in os.listdir(root) if name.startswith("day="))
+
+
+def archive_filter(zone: int = None, start: datetime = None, end: datetime = None):
+    """
+    Scan predicate for a zone and [start, end) window.
+
+    The day bounds prune whole partitions; the timestamp bounds are checked
+    against row-group statistics inside the remaining files.
+    """
+    predicate = None
+
+    def both(expr):
+        return expr if predicate is None else predicate & expr
+
+    if zone is not None:
+        predicate = both(ds.field("zone") == int(zone))
+    if start is not None:
+        predicate = both(ds.field("day") >= start.strftime("%Y-%m-%d"))
+        predicate = both(ds.field("timestamp") >= pa.scalar(start, type=pa.timestamp("us")))
+    if end is not None:
+        predicate = both(ds.field("day") <= end.strftime("%Y-%m-%d"))
+        predicate = both(ds.field("timestamp") < pa.scalar(end, type=pa.timestamp("us")))
+    return predicate
+
+
+def read_archive(columns: list = None, zone: int = None, start: datetime = None,
+                 end: datetime = None, archive_path=None) -> pd.DataFrame:
+    """
+    Read archived readings with column pruning and predicate pushdown.
+
+    Args:
+        columns (list): Columns to decode (default: every runway_data column)
+        zone (int): Filter by zone (optional)
+        start, end (datetime): Time range (optional)
+
+    Returns:
+        pd.DataFrame: Matching rows ordered by id (raw, not yet validated)
+    """
+    dataset = open_archive(archive_path)
+    columns = list(columns or DATA_COLUMNS)
+    if dataset is None:
+        return pd.DataFrame(columns=columns)
+
+    scan = columns if "id" in columns else columns + ["id"]
+    table = dataset.to_table(columns=scan, filter=archive_filter(zone, start, end))
+    df = table.sort_by("id").to_pandas()
+    return df[columns]
+
+
+def iter_archive_days(columns: list = None, zone: int = None, start: datetime = None,
+                      end: datetime = None, archive_path=None) -> Iterator[pd.DataFrame]:
+    """Yield archived rows one day at a time in (timestamp, id) order."""
+    dataset = open_archive(archive_path)
+    if dataset is None:
+        return
+    columns = list(columns or DATA_COLUMNS)
+    scan = list(dict.fromkeys(columns + ["timestamp", "id"]))
+    for day in archive_days(archive_path):
+        if start is not None and day < start.strftime("%Y-%m-%d"):
+            continue
+        if end is not None and day > end.strftime("%Y-%m-%d"):
+            break
+        predicate = ds.field("day") == day
+        window = archive_filter(zone, start, end)
+        if window is not None:
+            predicate = predicate & window
+        table = dataset.to_table(columns=scan, filter=predicate)
+        if table.num_rows:
+            yield table.sort_by([("timestamp", "ascending"), ("id", "ascending")]).to_pandas()[columns]
+
+
+def _write_day(df: pd.DataFrame, day: str, archive_path=None):
+    """Write one day's rows as one Parquet file per zone partition."""
+    df = df.copy()
+    df["timestamp"] = pd.to_datetime(df["timestamp"], format="ISO8601")
+    df["day"] = day
+    table = pa.Table.from_pandas(df[ARCHIVE_SCHEMA.names], schema=ARCHIVE_SCHEMA, preserve_index=False)
+    # Named after the day's first id: re-archiving the same rows after a
+    # crash overwrites the earlier file instead of duplicating it
+    ds.write_dataset(
+        table, archive_path or ARCHIVE_PATH, format="parquet", partitioning=PARTITIONING,
+        basename_template=f"part-{int(df['id'].min())}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+    )
+
+
+def archive_old_data(older_than_days: int = None, now: datetime = None,
+                     db_path=None, archive_path=None) -> int:
+    """
+    Move whole days older than the cutoff from SQLite into the archive.
+
+    Rollups are brought up to date first, so archived rows stay counted in
+    every aggregate. Each day is read, written and deleted under one write
+    lock, so no reading is lost or duplicated by a concurrent insert.
+
+    Returns:
+        int: Number of rows moved
+    """
+    if not database.sqlite_available(db_path):
+        return 0
+    days = ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    cutoff = ((now or datetime.utcnow()) - timedelta(days=days)).strftime("%Y-%m-%d")
+
+    moved = 0
+    with database.get_db_connection(db_path, write=True) as conn:
+        update_rollups(conn)
+        pending = [row[0] for row in conn.execute(
+            "SELECT DISTINCT substr(timestamp, 1, 10) FROM runway_data WHERE timestamp < ? ORDER BY 1",
+            (cutoff,),
+        )]
+    for day in pending:
+        next_day = (datetime.strptime(day, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+        # The writer is checked out per day so ingest batches interleave
+        with database.get_db_connection(db_path, write=True) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                df = pd.read_sql(
+                    f"SELECT {', '.join(DATA_COLUMNS)} FROM runway_data "
+                    "WHERE timestamp >= ? AND timestamp < ? ORDER BY timestamp, id",
+                    conn, params=(day, next_day),
+                )
+                if not df.empty:
+                    _write_day(df, day, archive_path)
+                    conn.execute(
+                        "DELETE FROM runway_data WHERE timestamp >= ? AND timestamp < ?", (day, next_day)
+                    )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        moved += len(df)
+        logger.info(f"Archived {len(df):,} rows for {day}")
+    return moved
+
+
+def get_archive_stats(archive_path=None) -> dict:
+    """Archived days, files and bytes on disk"""
+    dataset = open_archive(archive_path)
+    files = dataset.files if dataset is not None else []
+    days = archive_days(archive_path)
+    return {
+        "path": archive_path or ARCHIVE_PATH,
+        "days": len(days),
+        "first_day": days[0] if days else None,
+        "last_day": days[-1] if days else None,
+        "files": len(files),
+        "bytes": sum(os.path.getsize(f) for f in files),
+    }
+
+
+# Periodic archiver
+
+_archive_task: Optional[asyncio.Task] = None
+
+
+async def _run_archiver():
+    while True:
+        try:
+            moved = await run_blocking(archive_old_data)
+            if moved:
+                logger.info(f"Archiver moved {moved:,} rows")
+        except Exception as e:
+            logger.error(f"Archiver failed: {e}")
+        await asyncio.sleep(ARCHIVE_INTERVAL_SECONDS)
+
+
+def start_archiver():
+    """Start the periodic archive task (no-op when ARCHIVE_INTERVAL_SECONDS is 0)"""
+    global _archive_task
+    if ARCHIVE_INTERVAL_SECONDS > 0 and _archive_task is None:
+        _archive_task = asyncio.create_task(_run_archiver())
+
+
+async def stop_archiver():
+    """Cancel the periodic archive task"""
+    global _archive_task
+    if _archive_task is not None:
+        _archive_task.cancel()
+        try:
+            await _archive_task
+        except asyncio.CancelledError:
+            pass
+        _archive_task = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Move old SmartZone-R readings into the Parquet archive")
+    parser.add_argument("--older-than-days", type=int, default=ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--db", default=None, help="Database path (default: DB_PATH)")
+    parser.add_argument("--archive", default=None, help="Archive directory (default: ARCHIVE_PATH)")
+    args = parser.parse_args(argv)
+
+    moved = archive_old_data(args.older_than_days, db_path=args.db, archive_path=args.archive)
+    stats = get_archive_stats(args.archive)
+    logger.info(f"Moved {moved:,} rows; archive holds {stats['days']} days in {stats['files']} files")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    main()
@@ -5,11 +5,17 @@ JWT-based RBAC with role-based endpoint protection
 
 import jwt
 import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from functools import wraps
 from fastapi import HTTPException, status, Request
 from dotenv import load_dotenv
 
+import metrics
+
 load_dotenv()
 
 # Configuration
@@ -20,6 +26,10 @@ if not JWT_SECRET:
 JWT_EXPIRY_HOURS = 8
 REFRESH_WINDOW_HOURS = 1
 
+# Verified-claims cache: skips HMAC verification for tokens seen recently
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "1024"))
+TOKEN_CACHE_TTL_SECONDS = float(os.getenv("TOKEN_CACHE_TTL_SECONDS", "300"))
+
 # Credentials from .env only
 ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD")
 MAINTENANCE_PASSWORD = os.getenv("MAINTENANCE_PASSWORD")
@@ -32,6 +42,106 @@ ROLES = {
     "viewer": ["read"],
 }
 
+def token_digest(token: str) -> str:
+    """Cache key for a token (the raw token is never stored)"""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class VerifiedTokenCache:
+    """Bounded LRU of verified JWT claims, keyed by token digest"""
+
+    def __init__(self, max_size: int = None, ttl_seconds: float = None):
+        self.max_size = TOKEN_CACHE_SIZE if max_size is None else max_size
+        self.ttl_seconds = TOKEN_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.entries = OrderedDict()  # digest -> (claims, expires_at epoch seconds)
+        self.revoked = {}  # digest -> token exp, kept until the token would expire anyway
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, token: str):
+        """Cached claims, or None if absent, expired or revoked"""
+        digest = token_digest(token)
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(digest)
+            if entry is not None and entry[1] > now:
+                self.entries.move_to_end(digest)
+                self.hits += 1
+                return dict(entry[0])
+            if entry is not None:
+                del self.entries[digest]
+            self.misses += 1
+            return None
+
+    def put(self, token: str, claims: dict):
+        """Cache claims until the TTL or the token's own exp, whichever is first"""
+        if self.max_size <= 0:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        if "exp" in claims:
+            expires_at = min(expires_at, float(claims["exp"]))
+        digest = token_digest(token)
+        with self.lock:
+            self.entries[digest] = (dict(claims), expires_at)
+            self.entries.move_to_end(digest)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def is_revoked(self, token: str) -> bool:
+        if not self.revoked:
+            return False
+        with self.lock:
+            return token_digest(token) in self.revoked
+
+    def revoke(self, token: str, exp: float):
+        """Evict a token and reject it until its exp (logout)"""
+        digest = token_digest(token)
+        now = time.time()
+        with self.lock:
+            self.entries.pop(digest, None)
+            self.revoked = {d: e for d, e in self.revoked.items() if e > now}
+            self.revoked[digest] = exp
+
+    def clear(self):
+        """Drop every cached claim (secret rotation)"""
+        with self.lock:
+            self.entries.clear()
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "revoked": len(self.revoked),
+            }
+
+
+token_cache = VerifiedTokenCache()
+
+
+def rotate_secret(new_secret: str):
+    """Switch the signing secret; tokens verified under the old one are re-checked"""
+    global JWT_SECRET
+    if not new_secret:
+        raise ValueError("JWT secret must not be empty")
+    JWT_SECRET = new_secret
+    token_cache.clear()
+
+
+def get_token_cache_stats() -> dict:
+    """Get verified-token cache hit/miss counters"""
+    return token_cache.get_stats()
+
+
 class AuthToken:
     """JWT token management"""
 
@@ -49,9 +159,19 @@ class AuthToken:
 
     @staticmethod
     def verify_token(token: str) -> dict:
-        """Verify and decode JWT token"""
+        """Verify and decode JWT token (served from the verified-token cache when possible)"""
+        if token_cache.is_revoked(token):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token revoked",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        payload = token_cache.get(token)
+        if payload is not None:
+            return payload
         try:
             payload = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
+            token_cache.put(token, payload)
             return payload
         except jwt.ExpiredSignatureError:
             raise HTTPException(
@@ -70,13 +190,15 @@ class AuthToken:
     def is_token_expiring_soon(token: str) -> bool:
         """Check if token expires within REFRESH_WINDOW_HOURS"""
         try:
-            payload = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
-            exp_time = datetime.fromtimestamp(payload["exp"])
-            refresh_window = datetime.utcnow() + timedelta(hours=REFRESH_WINDOW_HOURS)
-            return exp_time < refresh_window
-        except jwt.InvalidTokenError:
+            return AuthToken.claims_expiring_soon(AuthToken.verify_token(token))
+        except HTTPException:
             return False
 
+    @staticmethod
+    def claims_expiring_soon(payload: dict) -> bool:
+        """Check already-verified claims against REFRESH_WINDOW_HOURS"""
+        return payload["exp"] < time.time() + REFRESH_WINDOW_HOURS * 3600
+
 
 class Authentication:
     """Handle login/logout/refresh flows"""
@@ -112,7 +234,7 @@ class Authentication:
         """Issue new token if current one is expiring"""
         payload = AuthToken.verify_token(token)
 
-        if not AuthToken.is_token_expiring_soon(token):
+        if not AuthToken.claims_expiring_soon(payload):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Token not expiring soon",
@@ -127,6 +249,12 @@ class Authentication:
             "expires_in": JWT_EXPIRY_HOURS * 3600,
         }
 
+    @staticmethod
+    def logout(token: str):
+        """Revoke a token so neither the cache nor a fresh decode accepts it"""
+        payload = AuthToken.verify_token(token)
+        token_cache.revoke(token, float(payload["exp"]))
+
     @staticmethod
     def get_token_from_header(request: Request) -> str:
         """Extract token from Authorization header"""
@@ -219,3 +347,13 @@ def require_auth_sync(required_role: str = None):
         return wrapper
 
     return decorator
+
+
+def _collect_metrics():
+    return metrics.stats_samples(
+        "smartzone_token_cache", get_token_cache_stats(),
+        counters=("hits", "misses", "evictions"), gauges=("entries", "hit_ratio", "revoked"),
+    )
+
+
+metrics.register_collector(_collect_metrics)
@@ -0,0 +1,202 @@
+"""
+Streaming CSV exports for SmartZone-R.
+Rows are read from the archive a day at a time and from a SQLite cursor in
+fixed-size chunks, and written out as CSV (optionally gzipped) chunk by
+chunk, so memory stays flat regardless of how many rows an export covers.
+"""
+
+import io
+import os
+import csv
+import zlib
+import logging
+from datetime import datetime
+from typing import Iterator, Optional
+import numpy as np
+import pandas as pd
+from fastapi.responses import StreamingResponse
+
+import archive
+import database
+import db_pool
+from executor import iterate_blocking
+from database import _FLIGHT_SELECT, SEVERITY_LEVELS, evaluate_alerts, _alert_reasons
+
+logger = logging.getLogger(__name__)
+
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "5000"))
+EXPORT_GZIP_LEVEL = int(os.getenv("EXPORT_GZIP_LEVEL", "6"))
+
+FLIGHT_COLUMNS = [
+    "timestamp", "flight_id", "aircraft", "zone", "rubber_mm", "cracks_mm", "water_mm",
+    "stress", "fod_weight_g", "temperature_C", "humidity_pct", "rain_mm", "anomaly",
+]
+ALERT_COLUMNS = [
+    "timestamp", "flight_id", "aircraft", "zone", "severity", "reasons",
+    "stress", "rubber_mm", "cracks_mm", "water_mm", "fod_weight_g",
+]
+
+
+def _bound_text(value) -> str:
+    """A range bound in the stored timestamp format (naive UTC, fraction only when set)"""
+    ts = database.naive_utc(value)
+    text = ts.strftime("%Y-%m-%dT%H:%M:%S")
+    return f"{text}.{ts.microsecond:06d}" if ts.microsecond else text
+
+
+def export_query(zone: int = None, start: datetime = None, end: datetime = None) -> tuple:
+    """
+    Build the filtered, time-ordered runway_data SELECT for an export.
+
+    Timestamps are stored as ISO text, so range filters compare strings and
+    can use the (zone, timestamp) index. The window is [start, end);
+    timezone-aware bounds are converted to UTC first.
+
+    Returns:
+        tuple: (sql, params)
+    """
+    where, params = [], []
+    if zone is not None:
+        where.append("zone = ?")
+        params.append(int(zone))
+    if start is not None:
+        where.append("timestamp >= ?")
+        params.append(_bound_text(start))
+    if end is not None:
+        where.append("timestamp < ?")
+        params.append(_bound_text(end))
+    clause = f"WHERE {' AND '.join(where)} " if where else ""
+    return f"SELECT {_FLIGHT_SELECT} FROM runway_data {clause}ORDER BY timestamp, id", tuple(params)
+
+
+def zone_has_rows(zone: int, db_path=None) -> bool:
+    """Check whether a zone has any readings, live or archived."""
+    row = database.execute_query(
+        "SELECT 1 FROM runway_data WHERE zone = ? LIMIT 1", (int(zone),), fetch_one=True, db_path=db_path
+    )
+    return row is not None or not archive.read_archive(["id"], zone=zone).empty
+
+
+def iter_row_chunks(zone: int = None, start: datetime = None, end: datetime = None,
+                    chunk_rows: int = None, db_path=None) -> Iterator[list]:
+    """
+    Yield lists of at most `chunk_rows` rows, archived days first, then
+    the SQLite tail from one open cursor.
+
+    Archived rows are read one day at a time; the connection stays open
+    only while the generator is being consumed and is closed when it
+    finishes or is abandoned.
+    """
+    chunk_rows = chunk_rows or EXPORT_CHUNK_ROWS
+    # Both sources compare against naive UTC readings
+    start = None if start is None else database.naive_utc(start).to_pydatetime()
+    end = None if end is None else database.naive_utc(end).to_pydatetime()
+    for day in archive.iter_archive_days(FLIGHT_COLUMNS, zone, start, end):
+        day = database.validate_data(day)
+        day["timestamp"] = day["timestamp"].map(pd.Timestamp.isoformat)
+        rows = list(day.itertuples(index=False, name=None))
+        for i in range(0, len(rows), chunk_rows):
+            yield rows[i:i + chunk_rows]
+
+    sql, params = export_query(zone, start, end)
+    # A dedicated connection rather than a pooled one: the cursor outlives
+    # this call and successive chunks may be fetched from different threads
+    conn = db_pool.connect(db_path or database.DB_PATH, check_same_thread=False)
+    try:
+        cursor = conn.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(chunk_rows)
+            if not rows:
+                break
+            yield rows
+    finally:
+        conn.close()
+
+
+def _csv_text(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(rows)
+    return buffer.getvalue()
+
+
+def iter_flight_csv(zone: int = None, start: datetime = None, end: datetime = None,
+                    chunk_rows: int = None, db_path=None) -> Iterator[bytes]:
+    """
+    Stream raw readings as CSV, one encoded chunk per cursor batch.
+
+    Values are clipped to VALID_RANGES in SQL, as in the flights API.
+    """
+    yield _csv_text([FLIGHT_COLUMNS]).encode("utf-8")
+    for rows in iter_row_chunks(zone, start, end, chunk_rows, db_path):
+        yield _csv_text(rows).encode("utf-8")
+
+
+def iter_alert_csv(zone: int = None, start: datetime = None, end: datetime = None,
+                   severity: Optional[str] = None, thresholds: dict = None,
+                   chunk_rows: int = None, db_path=None) -> Iterator[bytes]:
+    """
+    Stream alerting readings as CSV in time order.
+
+    Each cursor batch is evaluated with evaluate_alerts(), so severities and
+    reasons match /api/alerts; only the alerting rows of a batch are written.
+    """
+    if severity is not None and severity not in SEVERITY_LEVELS:
+        raise ValueError(f"Unknown severity: {severity}")
+
+    yield _csv_text([ALERT_COLUMNS]).encode("utf-8")
+    for rows in iter_row_chunks(zone, start, end, chunk_rows, db_path):
+        df = pd.DataFrame.from_records(rows, columns=FLIGHT_COLUMNS)
+        result = evaluate_alerts(df, thresholds)
+        selected = result["alerting"]
+        if severity is not None:
+            selected = selected & (result["severity"] == SEVERITY_LEVELS.index(severity))
+
+        out = []
+        for i in np.flatnonzero(selected):
+            row = rows[i]
+            out.append([
+                row[0], row[1], row[2], row[3],
+                SEVERITY_LEVELS[result["severity"][i]],
+                "; ".join(_alert_reasons(df, result["masks"], i)),
+                row[7], row[4], row[5], row[6], row[8],
+            ])
+        if out:
+            yield _csv_text(out).encode("utf-8")
+
+
+def gzip_chunks(chunks: Iterator[bytes], level: int = None) -> Iterator[bytes]:
+    """Compress a byte stream into a single gzip member, chunk by chunk."""
+    compressor = zlib.compressobj(
+        EXPORT_GZIP_LEVEL if level is None else level, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+    )
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_filename(prefix: str, start: datetime = None, end: datetime = None, gzip: bool = False) -> str:
+    """Download filename describing the export window."""
+    parts = [prefix]
+    if start is not None:
+        parts.append(start.strftime("%Y%m%d"))
+    if end is not None:
+        parts.append(end.strftime("%Y%m%d"))
+    return "_".join(parts) + (".csv.gz" if gzip else ".csv")
+
+
+def csv_response(chunks: Iterator[bytes], filename: str, gzip: bool = False) -> StreamingResponse:
+    """
+    Wrap a CSV chunk generator in a download response.
+
+    Each chunk is produced on the DB executor, so cursor reads and
+    compression never block the event loop.
+    """
+    if gzip:
+        chunks = gzip_chunks(chunks)
+    return StreamingResponse(
+        iterate_blocking(chunks),
+        media_type="application/gzip" if gzip else "text/csv; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
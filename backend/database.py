@@ -5,12 +5,18 @@ Handles data loading from SQLite/CSV and data validation.
 
 import sqlite3
 import pandas as pd
+import numpy as np
 import os
+import time
 import logging
 from pathlib import Path
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 
+import metrics
+from db_pool import get_pool
+from profiling import slow_query_log
+
 # Setup logging
 logger = logging.getLogger(__name__)
 
@@ -26,22 +32,56 @@ if not os.path.isabs(CSV_PATH):
     CSV_PATH = os.path.join(os.path.dirname(__file__), CSV_PATH)
 
 
+load_data_seconds = metrics.histogram(
+    "smartzone_load_data_seconds", "Full dataset load time (SQLite/CSV plus archive)"
+)
+query_seconds = metrics.histogram(
+    "smartzone_db_query_seconds", "execute_query() statement time (execute plus fetch/commit)", ("mode",)
+)
+
+
+# Valid ranges
+VALID_RANGES = {
+    "rubber_mm": (0, 20),
+    "cracks_mm": (0, 50),
+    "water_mm": (0, 200),
+    "stress": (0, 1000),
+    "fod_weight_g": (0, 5000),
+    "temperature_C": (-10, 60),
+    "humidity_pct": (0, 100),
+    "rain_mm": (0, 500),
+}
+
+
 def load_data() -> pd.DataFrame:
     """
     Load runway data from SQLite or CSV fallback.
     
+    SQLite rows are unioned with days already moved to the Parquet archive,
+    so callers see the full history either way.
+    
     Returns:
         pd.DataFrame: Validated runway data
     """
+    with load_data_seconds.time():
+        return _load_data()
+
+
+LOAD_DATA_QUERY = "SELECT * FROM runway_data"
+
+
+def _load_data() -> pd.DataFrame:
+    """Read SQLite (plus archive) or the CSV fallback; see load_data()."""
     df = None
     
     # Try SQLite first
     if os.path.exists(DB_PATH):
         try:
-            conn = sqlite3.connect(DB_PATH)
-            df = pd.read_sql("SELECT * FROM runway_data", conn, parse_dates=["timestamp"])
-            conn.close()
-            return validate_data(df)
+            start = time.perf_counter()
+            with get_db_connection() as conn:
+                df = pd.read_sql(LOAD_DATA_QUERY, conn, parse_dates=["timestamp"])
+            slow_query_log.record(LOAD_DATA_QUERY, None, len(df), time.perf_counter() - start, source="load_data")
+            return validate_data(_with_archive(df))
         except Exception as e:
             logger.warning(f"SQLite error: {e}, falling back to CSV...")
     
@@ -58,6 +98,72 @@ def load_data() -> pd.DataFrame:
     return pd.DataFrame()
 
 
+def _with_archive(df: pd.DataFrame) -> pd.DataFrame:
+    """Prepend archived rows (older ids) to rows read from SQLite."""
+    import archive  # archive imports this module
+    
+    cold = archive.read_archive(columns=[c for c in df.columns if c in archive.DATA_COLUMNS])
+    if cold.empty:
+        return df
+    if df.empty:
+        return cold.reindex(columns=df.columns)
+    return pd.concat([cold, df], ignore_index=True)
+
+
+def load_rows_after(last_id: int, up_to: int = None) -> pd.DataFrame:
+    """
+    Load SQLite rows with an id greater than last_id.
+    
+    Args:
+        last_id (int): Highest runway_data.id already loaded
+        up_to (int): Highest id to include (rows inserted later are left
+            for the next refresh)
+    
+    Returns:
+        pd.DataFrame: Validated new rows ordered by id
+    """
+    query = "SELECT * FROM runway_data WHERE id > ?"
+    params = [int(last_id)]
+    if up_to is not None:
+        query += " AND id <= ?"
+        params.append(int(up_to))
+    with get_db_connection() as conn:
+        df = pd.read_sql(
+            query + " ORDER BY id",
+            conn,
+            params=tuple(params),
+            parse_dates=["timestamp"]
+        )
+    return validate_data(df)
+
+
+# AUTOINCREMENT's sequence keeps the high-water mark after old rows move to
+# the archive; plain MAX(id) covers tables created without it
+MAX_ROW_ID_QUERY = (
+    "SELECT COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'runway_data'), "
+    "(SELECT MAX(id) FROM runway_data), 0)"
+)
+
+
+def get_max_row_id():
+    """
+    Get the highest runway_data.id ever assigned in SQLite.
+    
+    Returns:
+        int: Max id, 0 for an empty table, None if the table is unavailable
+    """
+    if not os.path.exists(DB_PATH):
+        return None
+    
+    try:
+        with get_db_connection() as conn:
+            row = conn.execute(MAX_ROW_ID_QUERY).fetchone()
+        return int(row[0] or 0)
+    except sqlite3.Error as e:
+        logger.warning(f"Could not read max row id: {e}")
+        return None
+
+
 def validate_data(df: pd.DataFrame) -> pd.DataFrame:
     """
     Validate and clean runway data.
@@ -73,23 +179,11 @@ def validate_data(df: pd.DataFrame) -> pd.DataFrame:
     
     df = df.copy()
     
-    # Valid ranges
-    ranges = {
-        "rubber_mm": (0, 20),
-        "cracks_mm": (0, 50),
-        "water_mm": (0, 200),
-        "stress": (0, 1000),
-        "fod_weight_g": (0, 5000),
-        "temperature_C": (-10, 60),
-        "humidity_pct": (0, 100),
-        "rain_mm": (0, 500),
-    }
-    
     # Drop nulls
     df = df.dropna(subset=["timestamp"])
     
     # Clip numeric columns
-    for col, (min_val, max_val) in ranges.items():
+    for col, (min_val, max_val) in VALID_RANGES.items():
         if col in df.columns:
             df[col] = pd.to_numeric(df[col], errors="coerce")
             df[col] = df[col].clip(min_val, max_val)
@@ -97,46 +191,120 @@ def validate_data(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def get_zone_summary(df: pd.DataFrame) -> list:
+# Metrics aggregated per zone as sum + non-null count so means can be combined
+ZONE_METRICS = [
+    "stress", "rubber_mm", "cracks_mm", "water_mm",
+    "fod_weight_g", "temperature_C", "humidity_pct"
+]
+
+
+def _zone_status(avg_stress: float) -> str:
+    """Classify a zone by its average stress."""
+    if avg_stress > 85:
+        return "critical"
+    elif avg_stress > 70:
+        return "high"
+    return "normal"
+
+
+def _aggregate_mean(row: dict, metric: str) -> float:
+    """Mean of a metric from its sum and non-null count."""
+    count = row[f"{metric}_n"]
+    return float(row[f"{metric}_sum"]) / count if count else float("nan")
+
+
+def summarize_zone_aggregates(agg: pd.DataFrame) -> list:
     """
-    Get per-zone aggregated metrics.
+    Format per-zone aggregates as zone summary dicts.
     
     Args:
-        df (pd.DataFrame): Flight data
+        agg (pd.DataFrame): One row per zone with flight_count, anomaly_count,
+            stress_max and <metric>_sum / <metric>_n columns
     
     Returns:
         list: List of dicts with zone summary
     """
-    if df.empty:
+    if agg is None or agg.empty:
         return []
     
     summaries = []
-    for zone in sorted(df["zone"].unique()):
-        zone_data = df[df["zone"] == zone]
-        
-        status = "normal"
-        avg_stress = zone_data["stress"].mean()
-        if avg_stress > 85:
-            status = "critical"
-        elif avg_stress > 70:
-            status = "high"
-        
+    for row in agg.sort_values("zone").to_dict("records"):
+        avg_stress = _aggregate_mean(row, "stress")
         summaries.append({
-            "zone": int(zone),
-            "avg_stress": round(float(avg_stress), 2),
-            "max_stress": round(float(zone_data["stress"].max()), 2),
-            "avg_rubber": round(float(zone_data["rubber_mm"].mean()), 2),
-            "avg_cracks": round(float(zone_data["cracks_mm"].mean()), 2),
-            "avg_water": round(float(zone_data["water_mm"].mean()), 2),
-            "avg_fod": round(float(zone_data["fod_weight_g"].mean()), 2),
-            "flight_count": int(len(zone_data)),
-            "anomaly_count": int(zone_data["anomaly"].sum()),
-            "status": status
+            "zone": int(row["zone"]),
+            "avg_stress": round(avg_stress, 2),
+            "max_stress": round(float(row["stress_max"]), 2),
+            "avg_rubber": round(_aggregate_mean(row, "rubber_mm"), 2),
+            "avg_cracks": round(_aggregate_mean(row, "cracks_mm"), 2),
+            "avg_water": round(_aggregate_mean(row, "water_mm"), 2),
+            "avg_fod": round(_aggregate_mean(row, "fod_weight_g"), 2),
+            "flight_count": int(row["flight_count"]),
+            "anomaly_count": int(row["anomaly_count"]),
+            "status": _zone_status(avg_stress)
         })
     
     return summaries
 
 
+def compute_zone_aggregates(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aggregate every zone in a single groupby pass.
+    
+    Args:
+        df (pd.DataFrame): Flight data
+    
+    Returns:
+        pd.DataFrame: One row per zone (see summarize_zone_aggregates)
+    """
+    if df is None or df.empty:
+        return pd.DataFrame()
+    
+    spec = {
+        "flight_count": ("zone", "size"),
+        "anomaly_count": ("anomaly", "sum"),
+        "stress_max": ("stress", "max"),
+    }
+    for metric in ZONE_METRICS:
+        if metric in df.columns:
+            spec[f"{metric}_sum"] = (metric, "sum")
+            spec[f"{metric}_n"] = (metric, "count")
+    
+    return df.groupby("zone", sort=True).agg(**spec).reset_index()
+
+
+def summarize_overall(agg: pd.DataFrame) -> dict:
+    """
+    Combine per-zone aggregates into whole-runway totals and means.
+    
+    Args:
+        agg (pd.DataFrame): Per-zone aggregates
+    
+    Returns:
+        dict: Flight/anomaly totals and overall metric means
+    """
+    totals = agg.sum(numeric_only=True).to_dict()
+    overall = {
+        "total_flights": int(totals["flight_count"]),
+        "anomaly_count": int(totals["anomaly_count"]),
+    }
+    for metric in ZONE_METRICS:
+        overall[f"avg_{metric}"] = _aggregate_mean(totals, metric)
+    return overall
+
+
+def get_zone_summary(df: pd.DataFrame) -> list:
+    """
+    Get per-zone aggregated metrics.
+    
+    Args:
+        df (pd.DataFrame): Flight data
+    
+    Returns:
+        list: List of dicts with zone summary
+    """
+    return summarize_zone_aggregates(compute_zone_aggregates(df))
+
+
 def get_recent_flights(df: pd.DataFrame, n: int = 50) -> list:
     """
     Get most recent flight records.
@@ -193,13 +361,99 @@ def get_flights_by_zone(df: pd.DataFrame, zone: int, n: int = 20) -> list:
     return get_recent_flights(df_zone, n)
 
 
-def get_active_alerts(df: pd.DataFrame, thresholds: dict = None) -> list:
+DEFAULT_ALERT_THRESHOLDS = {
+    "stress": 85,
+    "rubber_mm": 5,
+    "cracks_mm": 10,
+    "water_mm": 3,
+    "fod_weight_g": 50
+}
+
+# Severity codes, ordered from most to least severe
+SEVERITY_LEVELS = ["critical", "high", "medium", "normal"]
+SEVERITY_CRITICAL, SEVERITY_HIGH, SEVERITY_MEDIUM, SEVERITY_NORMAL = range(4)
+
+
+def _column_values(df: pd.DataFrame, col: str) -> np.ndarray:
+    """Get a column as a float array (NaN never trips a threshold)."""
+    return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+
+
+def evaluate_alerts(df: pd.DataFrame, thresholds: dict = None) -> dict:
+    """
+    Evaluate alert thresholds for every row in one columnar pass.
+    
+    Args:
+        df (pd.DataFrame): Flight data
+        thresholds (dict): Threshold values
+    
+    Returns:
+        dict: Per-reason boolean masks, severity codes and the alerting mask
+    """
+    if thresholds is None:
+        thresholds = DEFAULT_ALERT_THRESHOLDS
+    
+    with np.errstate(invalid="ignore"):
+        masks = {
+            "stress": _column_values(df, "stress") > thresholds["stress"],
+            "rubber_mm": _column_values(df, "rubber_mm") > thresholds["rubber_mm"],
+            "cracks_mm": _column_values(df, "cracks_mm") > thresholds["cracks_mm"],
+            "water_mm": _column_values(df, "water_mm") > thresholds["water_mm"],
+            "fod_weight_g": _column_values(df, "fod_weight_g") > thresholds["fod_weight_g"],
+            "anomaly": _column_values(df, "anomaly") > 0,
+        }
+    
+    # Stress is critical; rubber is high; cracks/water downgrade a lone FOD to medium
+    severity = np.select(
+        [
+            masks["stress"],
+            masks["rubber_mm"],
+            masks["cracks_mm"] | masks["water_mm"],
+            masks["fod_weight_g"],
+            masks["anomaly"],
+        ],
+        [SEVERITY_CRITICAL, SEVERITY_HIGH, SEVERITY_MEDIUM, SEVERITY_HIGH, SEVERITY_MEDIUM],
+        default=SEVERITY_NORMAL
+    ).astype(np.int8)
+    
+    alerting = np.zeros(len(df), dtype=bool)
+    for mask in masks.values():
+        alerting |= mask
+    
+    return {"masks": masks, "severity": severity, "alerting": alerting}
+
+
+def _alert_reasons(df: pd.DataFrame, masks: dict, i: int) -> list:
+    """Build the reason strings for a single alerting row."""
+    reasons = []
+    if masks["stress"][i]:
+        reasons.append(f"High stress ({df['stress'].iat[i]:.0f}%)")
+    if masks["rubber_mm"][i]:
+        reasons.append(f"Rubber buildup ({df['rubber_mm'].iat[i]:.1f}mm)")
+    if masks["cracks_mm"][i]:
+        reasons.append(f"Surface cracks ({df['cracks_mm'].iat[i]:.1f}mm)")
+    if masks["water_mm"][i]:
+        reasons.append(f"Water accumulation ({df['water_mm'].iat[i]:.1f}mm)")
+    if masks["fod_weight_g"][i]:
+        reasons.append(f"FOD detected ({df['fod_weight_g'].iat[i]:.0f}g)")
+    if masks["anomaly"][i]:
+        reasons.append("Anomaly detected")
+    return reasons
+
+
+def get_active_alerts(df: pd.DataFrame, thresholds: dict = None, severity: str = None,
+                      limit: int = None, offset: int = 0) -> list:
     """
     Get records that trigger alerts based on thresholds.
     
+    Only the requested page is materialized into dicts.
+    
     Args:
         df (pd.DataFrame): Flight data
         thresholds (dict): Threshold values
+        severity (str): Only return alerts of this severity (optional)
+        limit (int): Maximum number of alerts (optional)
+        offset (int): Number of alerts to skip
     
     Returns:
         list: Alert records
@@ -207,185 +461,363 @@ def get_active_alerts(df: pd.DataFrame, thresholds: dict = None) -> list:
     if df.empty:
         return []
     
-    if thresholds is None:
-        thresholds = {
-            "stress": 85,
-            "rubber_mm": 5,
-            "cracks_mm": 10,
-            "water_mm": 3,
-            "fod_weight_g": 50
-        }
+    result = evaluate_alerts(df, thresholds)
+    codes = result["severity"]
+    selected = result["alerting"]
+    if severity is not None:
+        if severity not in SEVERITY_LEVELS:
+            return []
+        selected = selected & (codes == SEVERITY_LEVELS.index(severity))
+    
+    # Most severe first (code 0 = critical) so the first page holds the
+    # critical alerts; row order is preserved within a severity
+    idx = np.flatnonzero(selected)
+    idx = idx[np.argsort(codes[idx], kind="stable")]
     
+    end = None if limit is None else offset + limit
+    idx = idx[offset:end]
+    
+    masks = result["masks"]
     alerts = []
+    for i in idx:
+        ts = df["timestamp"].iat[i]
+        alerts.append({
+            "timestamp": ts.isoformat() if pd.notna(ts) else "",
+            "flight_id": str(df["flight_id"].iat[i]),
+            "aircraft": str(df["aircraft"].iat[i]),
+            "zone": int(df["zone"].iat[i]),
+            "severity": SEVERITY_LEVELS[codes[i]],
+            "reasons": _alert_reasons(df, masks, i),
+            "stress": round(float(df["stress"].iat[i]), 2),
+            "rubber_mm": round(float(df["rubber_mm"].iat[i]), 2),
+            "cracks_mm": round(float(df["cracks_mm"].iat[i]), 2),
+            "water_mm": round(float(df["water_mm"].iat[i]), 2),
+            "fod_weight_g": round(float(df["fod_weight_g"].iat[i]), 2)
+        })
     
-    for _, row in df.iterrows():
-        reasons = []
-        severity = "normal"
-        
-        if row["stress"] > thresholds["stress"]:
-            reasons.append(f"High stress ({row['stress']:.0f}%)")
-            severity = "critical"
-        
-        if row["rubber_mm"] > thresholds["rubber_mm"]:
-            reasons.append(f"Rubber buildup ({row['rubber_mm']:.1f}mm)")
-            if severity != "critical":
-                severity = "high"
-        
-        if row["cracks_mm"] > thresholds["cracks_mm"]:
-            reasons.append(f"Surface cracks ({row['cracks_mm']:.1f}mm)")
-            if severity == "normal":
-                severity = "medium"
-        
-        if row["water_mm"] > thresholds["water_mm"]:
-            reasons.append(f"Water accumulation ({row['water_mm']:.1f}mm)")
-            if severity == "normal":
-                severity = "medium"
-        
-        if row["fod_weight_g"] > thresholds["fod_weight_g"]:
-            reasons.append(f"FOD detected ({row['fod_weight_g']:.0f}g)")
-            if severity == "normal":
-                severity = "high"
-        
-        if row["anomaly"] > 0:
-            reasons.append("Anomaly detected")
-            if severity == "normal":
-                severity = "medium"
-        
-        if reasons:
-            alerts.append({
-                "timestamp": row["timestamp"].isoformat() if pd.notna(row["timestamp"]) else "",
-                "flight_id": str(row["flight_id"]),
-                "aircraft": str(row["aircraft"]),
-                "zone": int(row["zone"]),
-                "severity": severity,
-                "reasons": reasons,
-                "stress": round(float(row["stress"]), 2),
-                "rubber_mm": round(float(row["rubber_mm"]), 2),
-                "cracks_mm": round(float(row["cracks_mm"]), 2),
-                "water_mm": round(float(row["water_mm"]), 2),  
-                "fod_weight_g": round(float(row["fod_weight_g"]), 2)
-            })
+    return alerts
+
+
+def get_alert_counts(df: pd.DataFrame, thresholds: dict = None) -> dict:
+    """
+    Count alerts by severity without materializing alert records.
+    
+    Args:
+        df (pd.DataFrame): Flight data
+        thresholds (dict): Threshold values
+    
+    Returns:
+        dict: Counts per severity plus total
+    """
+    counts = {level: 0 for level in SEVERITY_LEVELS}
+    if df.empty:
+        counts["total"] = 0
+        return counts
+    
+    result = evaluate_alerts(df, thresholds)
+    codes = result["severity"][result["alerting"]]
+    per_code = np.bincount(codes, minlength=len(SEVERITY_LEVELS))
+    for code, level in enumerate(SEVERITY_LEVELS):
+        counts[level] = int(per_code[code])
+    counts["total"] = int(len(codes))
+    return counts
+
+
+def get_alert_counts_by_zone(df: pd.DataFrame, thresholds: dict = None) -> dict:
+    """
+    Count alerts per zone (zones without alerts report 0).
+    
+    Args:
+        df (pd.DataFrame): Flight data
+        thresholds (dict): Threshold values
+    
+    Returns:
+        dict: Zone number -> alert count
+    """
+    if df.empty:
+        return {}
     
-    return sorted(alerts, key=lambda x: {
-        "critical": 0,
-        "high": 1,
-        "medium": 2,
-        "normal": 3
-    }.get(x["severity"], 4), reverse=True)
+    result = evaluate_alerts(df, thresholds)
+    zones = df["zone"]
+    counts = zones[result["alerting"]].value_counts()
+    return {int(z): int(counts.get(z, 0)) for z in sorted(zones.unique())}
+
+
+# Default and hard cap for points per series returned by get_time_series
+TIMESERIES_DEFAULT_POINTS = int(os.getenv("TIMESERIES_DEFAULT_POINTS", "500"))
+TIMESERIES_POINTS_LIMIT = int(os.getenv("TIMESERIES_POINTS_LIMIT", "5000"))
+SERIES_COLORS = ["#00d4ff", "#00ff88", "#ffaa00", "#ff3333", "#0099ff"]
+
+
+def _series_style(i: int, single: bool) -> dict:
+    color = SERIES_COLORS[i % len(SERIES_COLORS)]
+    return {
+        "borderColor": color,
+        "backgroundColor": f"{color}40" if single else f"{color}20",
+        "tension": 0.3,
+        "spanGaps": True,
+    }
+
+
+def _nullable(values: np.ndarray) -> list:
+    """Float array to a JSON-ready list with NaN (empty bucket) as None"""
+    rounded = np.round(values, 2)
+    return [None if np.isnan(v) else v for v in rounded.tolist()]
+
 
+def _iso_labels(ns: np.ndarray) -> list:
+    return [t.isoformat() for t in pd.to_datetime(ns)]
 
-def get_time_series(df: pd.DataFrame, metric: str, zone: int = None) -> dict:
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: indices of n_out points preserving the visual shape.
+
+    The first and last points are always kept; each middle bucket keeps the point
+    forming the largest triangle with the previous pick and the next bucket's mean.
+    The loop runs once per output point (bounded by the budget); the per-bucket
+    area computation is vectorized.
     """
-    Get time series data for a metric.
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1])[:n_out]
+
+    x = x.astype(float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+
+    prev = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_lo:next_hi].mean()
+        avg_y = y[next_lo:next_hi].mean()
+        area = np.abs(
+            (x[prev] - avg_x) * (y[lo:hi] - y[prev]) - (x[prev] - x[lo:hi]) * (avg_y - y[prev])
+        )
+        prev = lo + int(np.argmax(area))
+        selected[i + 1] = prev
+    return selected
+
+
+def naive_utc(value) -> pd.Timestamp:
+    """Timestamp comparable with stored readings (tz-naive); aware values are converted to UTC"""
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert("UTC").tz_localize(None)
+    return ts
+
+
+def get_time_series(df: pd.DataFrame, metric: str, zone: int = None, start=None, end=None,
+                    max_points: int = None, method: str = "bucket") -> dict:
+    """
+    Get time series data for a metric, downsampled to at most max_points per series.
     
     Args:
         df (pd.DataFrame): Flight data
         metric (str): Metric name (stress, rubber_mm, etc.)
         zone (int): Filter by zone (optional)
+        start, end (datetime): Time range (optional, inclusive)
+        max_points (int): Points per series (default TIMESERIES_DEFAULT_POINTS)
+        method (str): "bucket" for min/mean/max per time bucket, "lttb" for
+            shape-preserving point selection
     
     Returns:
         dict: Time series with labels and datasets
+    
+    With "bucket", every series shares the labels axis: raw timestamps when
+    there are few enough, otherwise equal-width buckets over the range, with
+    None for empty buckets and per-bucket "min"/"max" next to the mean "data".
+    With "lttb", each dataset's "data" holds {"x", "y"} points and labels is
+    the union of the selected timestamps.
     """
+    empty = {"labels": [], "datasets": [], "method": method, "bucket_seconds": None}
     if df.empty or metric not in df.columns:
-        return {"labels": [], "datasets": []}
-    
+        return empty
+
+    max_points = min(max_points or TIMESERIES_DEFAULT_POINTS, TIMESERIES_POINTS_LIMIT)
+    timestamps = df["timestamp"]
+    mask = timestamps.notna() & df[metric].notna()
     if zone is not None:
-        df_filtered = df[df["zone"] == zone]
-    else:
-        df_filtered = df
-    
-    df_sorted = df_filtered.sort_values("timestamp")
-    
-    # For multiple zones, group by zone
-    if zone is None and len(df_filtered["zone"].unique()) > 1:
-        datasets = []
-        colors = ["#00d4ff", "#00ff88", "#ffaa00", "#ff3333", "#0099ff"]
-        
-        for i, z in enumerate(sorted(df_filtered["zone"].unique())):
-            z_data = df_sorted[df_sorted["zone"] == z]
+        mask &= df["zone"] == zone
+    if start is not None:
+        mask &= timestamps >= naive_utc(start)
+    if end is not None:
+        mask &= timestamps <= naive_utc(end)
+    if not mask.any():
+        return empty
+
+    t = timestamps[mask].to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    y = df.loc[mask, metric].to_numpy(dtype=float)
+    zone_ids, zone_codes = np.unique(df.loc[mask, "zone"].to_numpy(), return_inverse=True)
+    single = zone is not None or len(zone_ids) == 1
+
+    def label_for(i):
+        return metric.replace("_", " ").title() if single else f"Zone {int(zone_ids[i]):02d}"
+
+    if method == "lttb":
+        order = np.lexsort((t, zone_codes))
+        t, y, zone_codes = t[order], y[order], zone_codes[order]
+        bounds = np.searchsorted(zone_codes, np.arange(len(zone_ids) + 1))
+        datasets, picked = [], []
+        for i in range(len(zone_ids)):
+            zt, zy = t[bounds[i]:bounds[i + 1]], y[bounds[i]:bounds[i + 1]]
+            keep = lttb_indices(zt, zy, max_points)
+            picked.append(zt[keep])
+            labels = _iso_labels(zt[keep])
             datasets.append({
-                "label": f"Zone {int(z):02d}",
-                "data": z_data[metric].tolist(),
-                "borderColor": colors[i % len(colors)],
-                "backgroundColor": f"{colors[i % len(colors)]}20",
-                "tension": 0.3
+                "label": label_for(i),
+                "data": [{"x": x, "y": v} for x, v in zip(labels, np.round(zy[keep], 2).tolist())],
+                **_series_style(i, single),
             })
-        
-        return {
-            "labels": [t.isoformat() for t in df_sorted["timestamp"].unique()],
-            "datasets": datasets
-        }
-    else:
-        return {
-            "labels": [t.isoformat() for t in df_sorted["timestamp"]],
-            "datasets": [{
-                "label": metric.replace("_", " ").title(),
-                "data": df_sorted[metric].tolist(),
-                "borderColor": "#00d4ff",
-                "backgroundColor": "#00d4ff40",
-                "tension": 0.3
-            }]
-        }
+        axis = np.unique(np.concatenate(picked))
+        return {"labels": _iso_labels(axis), "datasets": datasets, "method": method, "bucket_seconds": None}
 
+    return bucket_time_series(
+        metric, t, df.loc[mask, "zone"].to_numpy(), y, np.ones(len(y)), y, y,
+        max_points, single=zone is not None
+    )
 
-def get_heatmap_data(df: pd.DataFrame) -> dict:
+
+def bucket_time_series(metric: str, t: np.ndarray, zones: np.ndarray, sums: np.ndarray,
+                       counts: np.ndarray, mins: np.ndarray, maxs: np.ndarray,
+                       max_points: int, single: bool = False) -> dict:
     """
-    Get zone × metric heatmap data.
+    Bucket pre-aggregated points onto one time axis shared by every zone.
+
+    Each input point carries sum/count/min/max, so raw rows (count 1) and
+    rollup buckets go through the same path.
+
+    Args:
+        metric (str): Metric name, used for the single-series label
+        t (np.ndarray): Point times as int64 nanoseconds
+        zones, sums, counts, mins, maxs (np.ndarray): Per-point zone and stats
+        max_points (int): Maximum axis length
+        single (bool): Label the series by metric even if it is one zone
+
+    Returns:
+        dict: Labels, one dataset per zone, bucket width in seconds (None if exact)
+    """
+    zone_ids, zone_codes = np.unique(zones, return_inverse=True)
+    single = single or len(zone_ids) == 1
+
+    # Common axis: exact timestamps when they fit the budget, else equal-width buckets
+    axis, positions = np.unique(t, return_inverse=True)
+    bucket_seconds = None
+    if len(axis) > max_points:
+        # Whole-second bucket width and origin keep the labels readable
+        second = 1_000_000_000
+        t0, t1 = t.min() // second * second, t.max()
+        width = max(-(-(t1 - t0) // (max_points * second)), 1) * second
+        # The range end falls exactly on the last bucket's upper edge
+        positions = np.minimum((t - t0) // width, max_points - 1)
+        axis = t0 + np.arange(max_points, dtype=np.int64) * width
+        bucket_seconds = width / 1e9
+
+    n_axis = len(axis)
+    key = zone_codes.astype(np.int64) * n_axis + positions
+    grouped = pd.DataFrame({"sum": sums, "n": counts, "min": mins, "max": maxs}).groupby(key).agg(
+        {"sum": "sum", "n": "sum", "min": "min", "max": "max"}
+    )
+    cells = {}
+    for stat, values in (
+        ("mean", grouped["sum"].to_numpy() / grouped["n"].to_numpy()),
+        ("min", grouped["min"].to_numpy()),
+        ("max", grouped["max"].to_numpy()),
+    ):
+        grid = np.full(len(zone_ids) * n_axis, np.nan)
+        grid[grouped.index.to_numpy()] = values
+        cells[stat] = grid.reshape(len(zone_ids), n_axis)
+
+    datasets = []
+    for i in range(len(zone_ids)):
+        datasets.append({
+            "label": metric.replace("_", " ").title() if single else f"Zone {int(zone_ids[i]):02d}",
+            "data": _nullable(cells["mean"][i]),
+            "min": _nullable(cells["min"][i]),
+            "max": _nullable(cells["max"][i]),
+            **_series_style(i, single),
+        })
+
+    return {
+        "labels": _iso_labels(axis),
+        "datasets": datasets,
+        "method": "bucket",
+        "bucket_seconds": bucket_seconds,
+    }
+
+
+# Heatmap metrics and the value treated as 100% risk
+HEATMAP_METRICS = ["stress", "rubber_mm", "cracks_mm", "water_mm", "fod_weight_g"]
+HEATMAP_LABELS = ["Stress %", "Rubber mm", "Cracks mm", "Water mm", "FOD g"]
+HEATMAP_RISK_MAX = {
+    "stress": 100,
+    "rubber_mm": 20,
+    "cracks_mm": 50,
+    "water_mm": 20,
+    "fod_weight_g": 500
+}
+
+
+def heatmap_from_aggregates(agg: pd.DataFrame) -> dict:
+    """
+    Build the zone × metric risk heatmap from per-zone aggregates.
     
     Args:
-        df (pd.DataFrame): Flight data
+        agg (pd.DataFrame): Per-zone aggregates (see summarize_zone_aggregates)
     
     Returns:
         dict: Heatmap matrix
     """
-    if df.empty:
+    if agg is None or agg.empty:
         return {"zones": [], "metrics": [], "data": []}
     
-    zones = sorted(df["zone"].unique())
-    metrics = ["stress", "rubber_mm", "cracks_mm", "water_mm", "fod_weight_g"]
-    
-    # Normalize metrics to 0-100 risk scale
-    risk_map = {
-        "stress": (0, 100),
-        "rubber_mm": (0, 20),
-        "cracks_mm": (0, 50),
-        "water_mm": (0, 20),
-        "fod_weight_g": (0, 500)
-    }
-    
+    zones = []
     data = []
-    for zone in zones:
-        zone_data = df[df["zone"] == zone]
-        row = []
-        for metric in metrics:
-            avg_val = zone_data[metric].mean()
-            min_val, max_val = risk_map[metric]
-            risk_pct = min(100, max(0, (avg_val / max_val) * 100))
-            row.append(round(risk_pct, 1))
-        data.append(row)
+    for row in agg.sort_values("zone").to_dict("records"):
+        zones.append(int(row["zone"]))
+        data.append([
+            round(min(100, max(0, (_aggregate_mean(row, m) / HEATMAP_RISK_MAX[m]) * 100)), 1)
+            for m in HEATMAP_METRICS
+        ])
+    
+    return {"zones": zones, "metrics": list(HEATMAP_LABELS), "data": data}
+
+
+def get_heatmap_data(df: pd.DataFrame) -> dict:
+    """
+    Get zone × metric heatmap data.
     
-    return {
-        "zones": [int(z) for z in zones],
-        "metrics": ["Stress %", "Rubber mm", "Cracks mm", "Water mm", "FOD g"],
-        "data": data
-    }
+    Args:
+        df (pd.DataFrame): Flight data
+    
+    Returns:
+        dict: Heatmap matrix
+    """
+    return heatmap_from_aggregates(compute_zone_aggregates(df))
 
 
 # Database connection helpers for WebSocket and other async operations
 from contextlib import contextmanager
 
 @contextmanager
-def get_db_connection(db_path=None):
-    """Context manager for database connections."""
+def get_db_connection(db_path=None, write=False):
+    """
+    Context manager for pooled database connections.
+    
+    Readers get their thread's long-lived connection; write=True checks out
+    the database's single writer connection (serialized across threads).
+    Connections stay open when the block exits.
+    """
     if db_path is None:
         db_path = DB_PATH
     
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    try:
+    pool = get_pool(db_path)
+    with (pool.writer() if write else pool.reader()) as conn:
         yield conn
-    finally:
-        conn.close()
 
 
 def execute_query(query: str, params=None, fetch_one=False, fetch_all=False, db_path=None):
@@ -394,8 +826,9 @@ def execute_query(query: str, params=None, fetch_one=False, fetch_all=False, db_
         db_path = DB_PATH
     
     try:
-        with get_db_connection(db_path) as conn:
+        with get_db_connection(db_path, write=not (fetch_one or fetch_all)) as conn:
             cursor = conn.cursor()
+            start = time.perf_counter()
             
             if params:
                 cursor.execute(query, params)
@@ -403,12 +836,142 @@ def execute_query(query: str, params=None, fetch_one=False, fetch_all=False, db_
                 cursor.execute(query)
             
             if fetch_one:
-                return cursor.fetchone()
+                result = cursor.fetchone()
+                rows = 0 if result is None else 1
             elif fetch_all:
-                return cursor.fetchall()
+                result = cursor.fetchall()
+                rows = len(result)
             else:
                 conn.commit()
-                return cursor.rowcount
+                result = rows = cursor.rowcount
+            elapsed = time.perf_counter() - start
+            query_seconds.observe(elapsed, ("read" if fetch_one or fetch_all else "write",))
+            slow_query_log.record(query, params, rows, elapsed)
+            return result
     except Exception as e:
         logger.error(f"Database error: {e}")
         return None if fetch_one or fetch_all else 0
+
+
+# SQL query layer: filtering, top-N and aggregates pushed down to SQLite
+
+# Shared with generate_data.py, which drops and rebuilds these around bulk loads
+RUNWAY_INDEXES = {
+    "idx_runway_data_zone_timestamp": "runway_data(zone, timestamp)",
+    "idx_runway_data_timestamp": "runway_data(timestamp)",
+}
+
+
+def sqlite_available(db_path=None) -> bool:
+    """Check whether the SQLite database file exists."""
+    return os.path.exists(db_path or DB_PATH)
+
+
+def ensure_indexes(db_path=None) -> bool:
+    """Create the indexes used by the SQL query layer if missing."""
+    if not sqlite_available(db_path):
+        return False
+    
+    try:
+        with get_db_connection(db_path, write=True) as conn:
+            for name, target in RUNWAY_INDEXES.items():
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+            conn.commit()
+        return True
+    except sqlite3.Error as e:
+        logger.warning(f"Could not create indexes: {e}")
+        return False
+
+
+def clipped_sql(col: str) -> str:
+    """SQL expression clipping a column to its valid range (as validate_data does)."""
+    min_val, max_val = VALID_RANGES[col]
+    return f"MIN(MAX({col}, {min_val}), {max_val})"
+
+
+_FLIGHT_SELECT = ", ".join(
+    ["timestamp", "flight_id", "aircraft", "zone"]
+    + [f"{clipped_sql(col)} AS {col}" for col in [
+        "rubber_mm", "cracks_mm", "water_mm", "stress", "fod_weight_g",
+        "temperature_C", "humidity_pct", "rain_mm"
+    ]]
+    + ["anomaly"]
+)
+
+_ZONE_AGGREGATE_QUERY = "SELECT " + ", ".join(
+    ["zone", "COUNT(*) AS flight_count", "SUM(anomaly) AS anomaly_count",
+     f"MAX({clipped_sql('stress')}) AS stress_max"]
+    + [f"SUM({clipped_sql(m)}) AS {m}_sum, COUNT({clipped_sql(m)}) AS {m}_n" for m in ZONE_METRICS]
+) + " FROM runway_data WHERE timestamp IS NOT NULL GROUP BY zone ORDER BY zone"
+
+
+def _flight_record(row) -> dict:
+    """Format a runway_data row as a flight dict."""
+    timestamp = row["timestamp"]
+    try:
+        timestamp = pd.Timestamp(timestamp).isoformat()
+    except (ValueError, TypeError):
+        timestamp = str(timestamp) if timestamp is not None else ""
+    
+    return {
+        "timestamp": timestamp,
+        "flight_id": str(row["flight_id"]),
+        "aircraft": str(row["aircraft"]),
+        "zone": int(row["zone"]),
+        "rubber_mm": round(float(row["rubber_mm"]), 2),
+        "cracks_mm": round(float(row["cracks_mm"]), 2),
+        "water_mm": round(float(row["water_mm"]), 2),
+        "stress": round(float(row["stress"]), 2),
+        "fod_weight_g": round(float(row["fod_weight_g"]), 2),
+        "temperature_C": round(float(row["temperature_C"]), 1),
+        "humidity_pct": round(float(row["humidity_pct"]), 1),
+        "rain_mm": round(float(row["rain_mm"]), 2),
+        "anomaly": int(row["anomaly"])
+    }
+
+
+def query_recent_flights(n: int = 50, zone: int = None) -> list:
+    """
+    Get the most recent flights with ORDER BY/LIMIT in SQLite.
+    
+    Args:
+        n (int): Number of flights
+        zone (int): Filter by zone (optional)
+    
+    Returns:
+        list: Recent flight dicts
+    """
+    if zone is None:
+        where, params = "", ()
+    else:
+        where, params = "WHERE zone = ?", (int(zone),)
+    
+    query = (
+        f"SELECT {_FLIGHT_SELECT} FROM runway_data {where} "
+        "ORDER BY timestamp DESC, id DESC LIMIT ?"
+    )
+    rows = execute_query(query, params + (int(n),), fetch_all=True)
+    return [_flight_record(row) for row in rows or []]
+
+
+def query_zone_aggregates() -> pd.DataFrame:
+    """
+    Get per-zone aggregates with a single GROUP BY query.
+    
+    Returns:
+        pd.DataFrame: One row per zone (see summarize_zone_aggregates)
+    """
+    rows = execute_query(_ZONE_AGGREGATE_QUERY, fetch_all=True)
+    if not rows:
+        return pd.DataFrame()
+    return pd.DataFrame([dict(row) for row in rows])
+
+
+def query_zone_summary() -> list:
+    """Get per-zone summaries aggregated in SQLite."""
+    return summarize_zone_aggregates(query_zone_aggregates())
+
+
+def query_heatmap_data() -> dict:
+    """Get the zone × metric heatmap aggregated in SQLite."""
+    return heatmap_from_aggregates(query_zone_aggregates())
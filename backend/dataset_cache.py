@@ -0,0 +1,265 @@
+"""
+Process-wide runway dataset cache for SmartZone-R.
+Loads runway_data once, then appends only rows newer than the last seen id.
+"""
+
+import os
+import time
+import threading
+import logging
+import pandas as pd
+from dotenv import load_dotenv
+
+import database
+import metrics
+import rollups
+from executor import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# Requests within this window are served from memory without touching SQLite
+DATASET_MIN_REFRESH_SECONDS = float(os.getenv("DATASET_MIN_REFRESH_SECONDS", "1"))
+# Full reload after this age to pick up updated/deleted rows
+DATASET_MAX_STALENESS_SECONDS = float(os.getenv("DATASET_MAX_STALENESS_SECONDS", "3600"))
+
+
+class DatasetCache:
+    """In-memory copy of runway_data with incremental refresh by id"""
+
+    def __init__(self, min_refresh_seconds: float = None, max_staleness_seconds: float = None):
+        self.min_refresh_seconds = (
+            DATASET_MIN_REFRESH_SECONDS if min_refresh_seconds is None else min_refresh_seconds
+        )
+        self.max_staleness_seconds = (
+            DATASET_MAX_STALENESS_SECONDS if max_staleness_seconds is None else max_staleness_seconds
+        )
+        self.df = pd.DataFrame()
+        self.last_id = None
+        self.version = 0
+        self.derived = {}
+        self.derived_flights = SingleFlight()
+        self.loaded_at = None
+        self.checked_at = None
+        self.lock = threading.Lock()
+
+        # Stats
+        self.hits = 0
+        self.refresh_checks = 0
+        self.incremental_refreshes = 0
+        self.full_reloads = 0
+        self.rows_appended = 0
+        self.last_refresh_ms = 0.0
+        self.derived_hits = 0
+        self.derived_misses = 0
+        self.derived_coalesced = 0
+
+    def get(self) -> pd.DataFrame:
+        """
+        Get the cached dataset, refreshing it if the staleness bounds allow.
+
+        The returned frame is shared between callers and must be treated as read-only.
+        """
+        return self._get_versioned()[0]
+
+    def _get_versioned(self) -> tuple:
+        """Get the dataset together with the version it belongs to"""
+        with self.lock:
+            now = time.monotonic()
+
+            if self.loaded_at is None or now - self.loaded_at >= self.max_staleness_seconds:
+                self._full_reload(now)
+            elif now - self.checked_at >= self.min_refresh_seconds:
+                self._incremental_refresh(now)
+            else:
+                self.hits += 1
+
+            return self.df, self.version
+
+    def get_version_tag(self) -> str:
+        """
+        Identify the data behind the current dataset version.
+
+        Stable across restarts for the same SQLite rows (highest id plus the
+        number of full reloads), falling back to the in-process version for CSV.
+        """
+        _, version = self._get_versioned()
+        with self.lock:
+            if self.last_id is None:
+                return f"v{version}"
+            return f"{self.last_id}.{self.full_reloads}"
+
+    def derive(self, key: str, compute):
+        """
+        Compute a value from the dataset once per dataset version.
+
+        Args:
+            key (str): Name of the derived value
+            compute (callable): Function taking the dataset and returning the value
+
+        Returns:
+            The value computed for the current dataset version
+        """
+        df, version = self._get_versioned()
+        with self.lock:
+            entry = self.derived.get(key)
+            if entry is not None and entry[0] == version:
+                self.derived_hits += 1
+                return entry[1]
+
+        # Concurrent misses on the same key wait for one computation
+        with self.derived_flights.hold(key):
+            with self.lock:
+                entry = self.derived.get(key)
+                if entry is not None and entry[0] == version:
+                    self.derived_coalesced += 1
+                    return entry[1]
+                self.derived_misses += 1
+
+            value = compute(df)
+            with self.lock:
+                # Keep the newest version if a concurrent refresh already stored one
+                current = self.derived.get(key)
+                if current is None or current[0] <= version:
+                    self.derived[key] = (version, value)
+        return value
+
+    def invalidate(self):
+        """Force a full reload on the next access"""
+        with self.lock:
+            self.loaded_at = None
+
+    def _full_reload(self, now: float):
+        """Reload the whole table from SQLite (or CSV fallback)"""
+        start = time.perf_counter()
+        df = database.load_data()
+
+        if df is None:
+            df = pd.DataFrame()
+
+        # Incremental refresh is only possible for SQLite rows carrying an id
+        if "id" in df.columns and database.get_max_row_id() is not None:
+            self.last_id = int(df["id"].max()) if not df.empty else 0
+        else:
+            self.last_id = None
+
+        self.df = df
+        self.version += 1
+        self.loaded_at = now
+        self.checked_at = now
+        self.full_reloads += 1
+        self.last_refresh_ms = (time.perf_counter() - start) * 1000
+        logger.info(f"Dataset loaded: {len(df)} rows in {self.last_refresh_ms:.1f}ms")
+
+    def _incremental_refresh(self, now: float):
+        """Append rows with id greater than the last seen id"""
+        self.checked_at = now
+        self.refresh_checks += 1
+
+        if self.last_id is None:
+            return
+
+        max_id = database.get_max_row_id()
+        if max_id is None or max_id < self.last_id:
+            # Table was recreated or removed underneath us
+            self._full_reload(now)
+            return
+        if max_id == self.last_id:
+            return
+
+        start = time.perf_counter()
+        try:
+            # Bounded by max_id: rows committed after it are picked up next time
+            delta = database.load_rows_after(self.last_id, max_id)
+        except Exception as e:
+            logger.warning(f"Incremental refresh failed: {e}")
+            return
+
+        if delta is not None and not delta.empty:
+            if self.df.empty:
+                self.df = delta.reset_index(drop=True)
+            else:
+                self.df = pd.concat([self.df, delta], ignore_index=True)
+            self.rows_appended += len(delta)
+            self.version += 1
+
+        self.last_id = max_id
+        self.incremental_refreshes += 1
+        self.last_refresh_ms = (time.perf_counter() - start) * 1000
+
+    def get_stats(self) -> dict:
+        """Get cache hit/refresh counters"""
+        with self.lock:
+            age = time.monotonic() - self.loaded_at if self.loaded_at is not None else None
+            return {
+                "rows": int(len(self.df)),
+                "last_id": self.last_id,
+                "version": self.version,
+                "hits": self.hits,
+                "refresh_checks": self.refresh_checks,
+                "incremental_refreshes": self.incremental_refreshes,
+                "full_reloads": self.full_reloads,
+                "rows_appended": self.rows_appended,
+                "derived_hits": self.derived_hits,
+                "derived_misses": self.derived_misses,
+                "derived_coalesced": self.derived_coalesced,
+                "last_refresh_ms": round(self.last_refresh_ms, 2),
+                "age_seconds": round(age, 2) if age is not None else None,
+                "min_refresh_seconds": self.min_refresh_seconds,
+                "max_staleness_seconds": self.max_staleness_seconds,
+            }
+
+
+# Global dataset cache
+dataset_cache = DatasetCache()
+
+
+def get_dataset() -> pd.DataFrame:
+    """Get the shared runway dataset (read-only)"""
+    return dataset_cache.get()
+
+
+def get_zone_aggregates() -> pd.DataFrame:
+    """
+    Per-zone aggregates shared by the summary, zones and heatmap endpoints.
+
+    Computed once per dataset version: from the day rollups when SQLite is
+    available, otherwise a single groupby over the cached frame.
+    """
+    def compute(df):
+        if database.sqlite_available():
+            return rollups.query_zone_aggregates()
+        return database.compute_zone_aggregates(df)
+
+    return dataset_cache.derive("zone_aggregates", compute)
+
+
+def get_dataset_version() -> str:
+    """Version tag of the shared dataset (changes when new rows are loaded)"""
+    return dataset_cache.get_version_tag()
+
+
+def warm_dataset_cache():
+    """Load the dataset at startup so the first request is served from memory"""
+    dataset_cache.get()
+
+
+def get_dataset_cache_stats() -> dict:
+    """Get dataset cache statistics"""
+    return dataset_cache.get_stats()
+
+
+def _collect_metrics():
+    stats = dataset_cache.get_stats()
+    derived = stats["derived_hits"] + stats["derived_misses"]
+    stats["derived_hit_ratio"] = round(stats["derived_hits"] / derived, 4) if derived else None
+    return metrics.stats_samples(
+        "smartzone_dataset_cache", stats,
+        counters=("hits", "refresh_checks", "incremental_refreshes", "full_reloads", "rows_appended",
+                  "derived_hits", "derived_misses", "derived_coalesced"),
+        gauges=("rows", "derived_hit_ratio", "age_seconds"),
+    )
+
+
+metrics.register_collector(_collect_metrics)
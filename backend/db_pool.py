@@ -0,0 +1,267 @@
+"""
+SQLite connection pool for SmartZone-R.
+Each thread keeps one long-lived read connection per database and all writes
+share a single writer connection behind a lock, so queries reuse open
+connections (and their prepared-statement caches) instead of reconnecting,
+and every connection is opened with the same tuned pragmas.
+"""
+
+import os
+import time
+import sqlite3
+import threading
+import logging
+from contextlib import contextmanager
+from dotenv import load_dotenv
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+# Negative values are KiB (SQLite convention): -65536 = 64MB page cache per connection
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))
+SQLITE_TEMP_STORE = os.getenv("SQLITE_TEMP_STORE", "MEMORY")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+# Prepared statements kept per connection (sqlite3's LRU keyed by SQL text)
+SQLITE_STATEMENT_CACHE = int(os.getenv("SQLITE_STATEMENT_CACHE", "256"))
+
+
+db_connection_hold_seconds = metrics.histogram(
+    "smartzone_db_connection_hold_seconds",
+    "Time a pooled connection is checked out, including caller work between statements", ("mode",)
+)
+db_writer_wait_seconds = metrics.histogram(
+    "smartzone_db_writer_wait_seconds", "Time spent waiting for the shared writer connection"
+)
+
+
+def connection_pragmas() -> dict:
+    """Pragmas applied to every connection (journal_mode only on the writer)"""
+    return {
+        "synchronous": SQLITE_SYNCHRONOUS,
+        "mmap_size": SQLITE_MMAP_SIZE,
+        "cache_size": SQLITE_CACHE_SIZE,
+        "temp_store": SQLITE_TEMP_STORE,
+        "busy_timeout": SQLITE_BUSY_TIMEOUT_MS,
+    }
+
+
+def connect(db_path: str, writer: bool = False, check_same_thread: bool = True) -> sqlite3.Connection:
+    """Open a standalone connection with the tuned pragmas applied"""
+    conn = sqlite3.connect(
+        db_path, check_same_thread=check_same_thread, cached_statements=SQLITE_STATEMENT_CACHE
+    )
+    try:
+        if writer:
+            conn.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+        for name, value in connection_pragmas().items():
+            conn.execute(f"PRAGMA {name}={value}")
+    except sqlite3.Error:
+        conn.close()
+        raise
+    return conn
+
+
+def _file_identity(db_path: str):
+    try:
+        stat = os.stat(db_path)
+    except OSError:
+        return None
+    return stat.st_dev, stat.st_ino
+
+
+class ConnectionPool:
+    """Per-thread read connections plus one shared writer for a database file"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.writer_lock = threading.RLock()
+        self.writer_conn = None
+        self.writer_identity = None
+        self.writer_depth = 0
+        self.readers = {}  # thread -> (connection, file identity)
+
+        # Stats
+        self.reader_checkouts = 0
+        self.writer_checkouts = 0
+        self.writer_wait_seconds = 0.0
+        self.writer_max_wait_seconds = 0.0
+        self.connects = 0
+        self.reconnects = 0
+
+    def _open(self, writer: bool) -> sqlite3.Connection:
+        # Pooled connections are only used by one thread at a time; cross-thread
+        # access is what lets close() and dead-thread cleanup run anywhere
+        conn = connect(self.db_path, writer=writer, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        with self.lock:
+            self.connects += 1
+        return conn
+
+    def _prune_dead_readers(self):
+        with self.lock:
+            dead = [thread for thread in self.readers if not thread.is_alive()]
+            stale = [self.readers.pop(thread)[0] for thread in dead]
+        for conn in stale:
+            conn.close()
+
+    def _reader(self) -> sqlite3.Connection:
+        thread = threading.current_thread()
+        identity = _file_identity(self.db_path)
+        with self.lock:
+            entry = self.readers.get(thread)
+        if entry is not None:
+            conn, opened_identity = entry
+            if opened_identity == identity:
+                return conn
+            # The database file was replaced (e.g. regenerated): drop the old handle
+            conn.close()
+            with self.lock:
+                self.reconnects += 1
+
+        self._prune_dead_readers()
+        conn = self._open(writer=False)
+        with self.lock:
+            self.readers[thread] = (conn, _file_identity(self.db_path))
+        return conn
+
+    @contextmanager
+    def reader(self):
+        """Check out this thread's read connection"""
+        depth = getattr(self.local, "depth", 0)
+        conn = self.local.conn if depth else self._reader()
+        self.local.conn = conn
+        self.local.depth = depth + 1
+        with self.lock:
+            self.reader_checkouts += 1
+        start = time.perf_counter()
+        try:
+            yield conn
+        finally:
+            self.local.depth = depth
+            if depth == 0:
+                db_connection_hold_seconds.observe(time.perf_counter() - start, ("read",))
+                if conn.in_transaction:
+                    # Never keep a stray transaction (and its snapshot) on a pooled connection
+                    conn.rollback()
+
+    @contextmanager
+    def writer(self):
+        """Check out the shared writer connection (re-entrant within a thread)"""
+        start = time.perf_counter()
+        self.writer_lock.acquire()
+        waited = time.perf_counter() - start
+        db_writer_wait_seconds.observe(waited)
+        try:
+            with self.lock:
+                self.writer_checkouts += 1
+                self.writer_wait_seconds += waited
+                self.writer_max_wait_seconds = max(self.writer_max_wait_seconds, waited)
+
+            if self.writer_depth == 0:
+                identity = _file_identity(self.db_path)
+                if self.writer_conn is not None and identity != self.writer_identity:
+                    self.writer_conn.close()
+                    self.writer_conn = None
+                    with self.lock:
+                        self.reconnects += 1
+                if self.writer_conn is None:
+                    self.writer_conn = self._open(writer=True)
+                    self.writer_identity = _file_identity(self.db_path)
+
+            conn = self.writer_conn
+            self.writer_depth += 1
+            held = time.perf_counter()
+            try:
+                yield conn
+            finally:
+                self.writer_depth -= 1
+                if self.writer_depth == 0:
+                    db_connection_hold_seconds.observe(time.perf_counter() - held, ("write",))
+                    if conn.in_transaction:
+                        # Uncommitted work is discarded, as closing a connection would
+                        conn.rollback()
+        finally:
+            self.writer_lock.release()
+
+    def close(self):
+        """Close every pooled connection (readers reopen lazily on next use)"""
+        with self.writer_lock:
+            if self.writer_conn is not None:
+                self.writer_conn.close()
+                self.writer_conn = None
+        with self.lock:
+            readers, self.readers = list(self.readers.values()), {}
+        for conn, _ in readers:
+            conn.close()
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            readers_open = len(self.readers)
+            return {
+                "db_path": self.db_path,
+                "open_connections": readers_open + (self.writer_conn is not None),
+                "readers_open": readers_open,
+                "writer_open": self.writer_conn is not None,
+                "reader_checkouts": self.reader_checkouts,
+                "writer_checkouts": self.writer_checkouts,
+                "writer_wait_ms_total": round(self.writer_wait_seconds * 1000, 2),
+                "writer_wait_ms_max": round(self.writer_max_wait_seconds * 1000, 2),
+                "writer_wait_ms_avg": round(self.writer_wait_seconds * 1000 / self.writer_checkouts, 3)
+                if self.writer_checkouts else None,
+                "connects": self.connects,
+                "reconnects": self.reconnects,
+            }
+
+
+# Pools by absolute database path
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: str) -> ConnectionPool:
+    """Get (or create) the pool for a database file"""
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(key)
+        return pool
+
+
+def close_pools():
+    """Close all pooled connections"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close()
+
+
+def get_pool_stats() -> dict:
+    """Get pragmas and per-database pool statistics"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    return {
+        "pragmas": {"journal_mode": SQLITE_JOURNAL_MODE, **connection_pragmas()},
+        "statement_cache_size": SQLITE_STATEMENT_CACHE,
+        "pools": [pool.get_stats() for pool in pools],
+    }
+
+
+def _collect_metrics():
+    for stats in get_pool_stats()["pools"]:
+        labels = {"db": os.path.basename(stats["db_path"])}
+        yield from metrics.stats_samples(
+            "smartzone_db_pool", stats, counters=("reader_checkouts", "writer_checkouts", "connects", "reconnects"),
+            gauges=("open_connections", "readers_open"), labels=labels,
+        )
+
+
+metrics.register_collector(_collect_metrics)
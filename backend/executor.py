@@ -0,0 +1,255 @@
+"""
+Blocking-work executor and event-loop lag monitor for SmartZone-R.
+SQLite queries and pandas work run on a dedicated, size-bounded thread pool
+so the asyncio loop keeps serving requests and WebSocket frames; the lag
+monitor measures how late the loop wakes up and counts stalls.
+"""
+
+import os
+import time
+import asyncio
+import threading
+import functools
+import logging
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from dotenv import load_dotenv
+
+import metrics
+from profiling import active_session
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", "4"))
+# Calls allowed in flight (running + queued) before callers wait for a slot
+DB_EXECUTOR_MAX_PENDING = int(os.getenv("DB_EXECUTOR_MAX_PENDING", "64"))
+LOOP_LAG_INTERVAL_SECONDS = float(os.getenv("LOOP_LAG_INTERVAL_SECONDS", "0.5"))
+LOOP_LAG_THRESHOLD_MS = float(os.getenv("LOOP_LAG_THRESHOLD_MS", "100"))
+
+
+class BlockingExecutor:
+    """Bounded thread pool for synchronous DB/DataFrame calls from async code"""
+
+    def __init__(self, workers: int = None, max_pending: int = None):
+        self.workers = DB_EXECUTOR_WORKERS if workers is None else workers
+        self.max_pending = DB_EXECUTOR_MAX_PENDING if max_pending is None else max_pending
+        self.pool = None
+        self.lock = threading.Lock()
+        self.semaphore = None
+        self.semaphore_loop = None
+
+        # Stats
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.pending = 0
+        self.max_pending_seen = 0
+        self.waited = 0
+        self.busy_seconds = 0.0
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self.lock:
+            if self.pool is None:
+                self.pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="smartzone-db")
+            return self.pool
+
+    def _get_semaphore(self, loop) -> asyncio.Semaphore:
+        # asyncio primitives belong to one loop; tests start a fresh loop per run
+        if self.semaphore is None or self.semaphore_loop is not loop:
+            self.semaphore = asyncio.Semaphore(self.max_pending)
+            self.semaphore_loop = loop
+        return self.semaphore
+
+    async def run(self, func, *args, **kwargs):
+        """Run func(*args, **kwargs) on the pool and await its result"""
+        loop = asyncio.get_running_loop()
+        semaphore = self._get_semaphore(loop)
+        if semaphore.locked():
+            self.waited += 1
+
+        call = functools.partial(func, *args, **kwargs)
+        session = active_session()
+        if session is not None:
+            # Profiled request: the worker thread runs the call under its own cProfile
+            call = functools.partial(session.run_call, call)
+
+        async with semaphore:
+            self.submitted += 1
+            self.pending += 1
+            self.max_pending_seen = max(self.max_pending_seen, self.pending)
+            start = time.perf_counter()
+            try:
+                result = await loop.run_in_executor(self._get_pool(), call)
+                self.completed += 1
+                return result
+            except Exception:
+                self.failed += 1
+                raise
+            finally:
+                self.pending -= 1
+                self.busy_seconds += time.perf_counter() - start
+
+    def shutdown(self):
+        """Stop the pool after in-flight calls finish"""
+        with self.lock:
+            pool, self.pool = self.pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    def get_stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "max_pending_seen": self.max_pending_seen,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "waited_for_slot": self.waited,
+            "busy_seconds": round(self.busy_seconds, 3),
+        }
+
+
+class SingleFlight:
+    """Per-key locks, so concurrent cache misses on one key compute it once"""
+
+    def __init__(self):
+        self.locks = {}  # key -> [lock, holders and waiters]
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def hold(self, key):
+        """
+        Run the block while holding `key`'s lock; other keys are not blocked.
+
+        Callers re-check their cache inside the block: a waiter usually finds
+        the value the first holder stored.
+        """
+        with self.lock:
+            entry = self.locks.get(key)
+            if entry is None:
+                entry = self.locks[key] = [threading.Lock(), 0]
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self.lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self.locks[key]
+
+
+class LoopLagMonitor:
+    """Sleeps a fixed interval and records how late the loop wakes up"""
+
+    def __init__(self, interval: float = None, threshold_ms: float = None):
+        self.interval = LOOP_LAG_INTERVAL_SECONDS if interval is None else interval
+        self.threshold_ms = LOOP_LAG_THRESHOLD_MS if threshold_ms is None else threshold_ms
+        self.task: Optional[asyncio.Task] = None
+
+        # Stats
+        self.samples = 0
+        self.stalls = 0
+        self.last_lag_ms = 0.0
+        self.max_lag_ms = 0.0
+        self.total_lag_ms = 0.0
+
+    async def run(self):
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            lag_ms = max(0.0, (time.perf_counter() - expected) * 1000)
+            self.record(lag_ms)
+
+    def record(self, lag_ms: float):
+        self.samples += 1
+        self.last_lag_ms = lag_ms
+        self.total_lag_ms += lag_ms
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+        if lag_ms >= self.threshold_ms:
+            self.stalls += 1
+            logger.warning(f"Event loop blocked for {lag_ms:.0f}ms (threshold {self.threshold_ms:.0f}ms)")
+
+    def start(self):
+        if self.task is None and self.interval > 0:
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def get_stats(self) -> dict:
+        return {
+            "interval_seconds": self.interval,
+            "threshold_ms": self.threshold_ms,
+            "samples": self.samples,
+            "stalls": self.stalls,
+            "last_lag_ms": round(self.last_lag_ms, 2),
+            "max_lag_ms": round(self.max_lag_ms, 2),
+            "avg_lag_ms": round(self.total_lag_ms / self.samples, 2) if self.samples else None,
+        }
+
+
+# Global executor and monitor
+blocking_executor = BlockingExecutor()
+loop_monitor = LoopLagMonitor()
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Await a blocking call on the shared DB executor"""
+    return await blocking_executor.run(func, *args, **kwargs)
+
+
+async def iterate_blocking(iterator):
+    """Drive a blocking iterator (e.g. a cursor-backed generator) from the executor"""
+    sentinel = object()
+    try:
+        while True:
+            item = await run_blocking(next, iterator, sentinel)
+            if item is sentinel:
+                break
+            yield item
+    finally:
+        # Client went away mid-stream: release the cursor now, not at GC time
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            await run_blocking(close)
+
+
+def start_loop_monitor():
+    """Start measuring event-loop lag"""
+    loop_monitor.start()
+
+
+async def stop_executor():
+    """Stop the lag monitor and the DB executor"""
+    await loop_monitor.stop()
+    blocking_executor.shutdown()
+
+
+def get_executor_stats() -> dict:
+    """Get executor queue and loop lag statistics"""
+    return {"executor": blocking_executor.get_stats(), "loop": loop_monitor.get_stats()}
+
+
+def _collect_metrics():
+    yield from metrics.stats_samples(
+        "smartzone_executor", blocking_executor.get_stats(),
+        counters=("submitted", "completed", "failed", "waited_for_slot"), gauges=("pending", "max_pending", "workers"),
+    )
+    yield from metrics.stats_samples(
+        "smartzone_loop", loop_monitor.get_stats(),
+        counters=("samples", "stalls"), gauges=("last_lag_ms", "max_lag_ms"),
+    )
+
+
+metrics.register_collector(_collect_metrics)
@@ -0,0 +1,70 @@
+"""
+Fast JSON responses for SmartZone-R bulk list endpoints.
+Routes that already build plain, correctly typed dicts return a
+FastJSONResponse directly, which skips FastAPI's per-item response_model
+validation; the route's response_model is still published in OpenAPI.
+"""
+
+import json
+import logging
+from datetime import date, datetime
+import numpy as np
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional: fall back to the standard library encoder
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+def _default(obj):
+    """Encode NumPy and pandas values that JSON has no native type for."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _finite(obj):
+    """Copy of obj with NaN/inf replaced by None, matching orjson's output."""
+    if isinstance(obj, (float, np.floating)):
+        return float(obj) if np.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(value) for value in obj]
+    if isinstance(obj, np.ndarray):
+        return _finite(obj.tolist())
+    return obj
+
+
+def _json_dumps(content) -> str:
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default
+    )
+
+
+def dumps(content) -> bytes:
+    """Serialize content to compact UTF-8 JSON; NaN and inf become null with either encoder."""
+    if orjson is not None:
+        return orjson.dumps(
+            content, default=_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+        )
+    try:
+        return _json_dumps(content).encode("utf-8")
+    except ValueError:
+        # Only payloads that actually hold non-finite floats pay for the copy
+        return _json_dumps(_finite(content)).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson (NumPy-aware) when available."""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -9,9 +9,17 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import os
+import math
+import shutil
+import argparse
+import tempfile
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 import logging
 
+from database import RUNWAY_INDEXES
+from rollups import drop_rollup_tables, ensure_rollup_tables, update_rollups
+
 logger = logging.getLogger(__name__)
 
 # Configuration
@@ -19,6 +27,8 @@ AIRPORT_CODE = "MAA"  # Chennai airport
 DB_PATH = os.path.join(os.path.dirname(__file__), "smartzone_r.db")
 NUM_FLIGHTS = 150  # Realistic daily flight count
 NUM_ZONES = 10
+CHUNK_SIZE = 50_000  # Rows generated and inserted per executemany call
+MAX_WORKERS = 10  # SQLite attaches at most 10 partition databases at once
 
 # Indian Airlines
 AIRLINES = [
@@ -31,6 +41,26 @@ AIRCRAFT = [
     "A380", "B789", "A330", "E190", "B738"
 ]
 
+# Realistic physics: heavier aircraft = higher stress
+AIRCRAFT_WEIGHT_FACTORS = {
+    "B787": 3.5, "A380": 4.0, "B777": 3.8, "A330": 3.6,
+    "A321": 2.5, "B738": 2.2, "A320": 2.0, "B737": 2.1,
+    "Q400": 1.5, "ATR72": 1.2, "ATR42": 1.0,
+    "A350": 3.7, "E190": 1.8, "B789": 3.6
+}
+
+RUNWAY_COLUMNS = [
+    "timestamp", "flight_id", "aircraft", "zone",
+    "rubber_mm", "cracks_mm", "water_mm", "stress",
+    "fod_weight_g", "temperature_C", "humidity_pct",
+    "rain_mm", "anomaly",
+]
+
+INSERT_SQL = (
+    f"INSERT INTO runway_data ({', '.join(RUNWAY_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in RUNWAY_COLUMNS)})"
+)
+
 # Generate realistic flight IDs
 def generate_flight_id():
     airline = np.random.choice(AIRLINES)
@@ -38,8 +68,8 @@ def generate_flight_id():
     return f"{airline}{number:04d}"
 
 # Create database schema
-def create_database():
-    conn = sqlite3.connect(DB_PATH)
+def create_database(db_path: str = None):
+    conn = sqlite3.connect(db_path or DB_PATH)
     cursor = conn.cursor()
     
     # Drop existing table if present
@@ -65,91 +95,214 @@ def create_database():
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     """)
+    create_indexes(conn)
+    
+    # Rollups describe the old table's rows; start them over
+    drop_rollup_tables(conn)
+    ensure_rollup_tables(conn)
     
     conn.commit()
     conn.close()
-    logger.info(f"Database created: {DB_PATH}")
+    logger.info(f"Database created: {db_path or DB_PATH}")
+
+def create_indexes(conn):
+    """Create the runway_data indexes (after bulk loads, so rows are indexed once)"""
+    for name, target in RUNWAY_INDEXES.items():
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+
+def drop_indexes(conn):
+    """Drop the runway_data indexes before a bulk load"""
+    for name in RUNWAY_INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
 
 # Generate realistic runway data
 def generate_flight_data():
     """Generate realistic runway monitoring data for flights"""
-    data = []
-    
-    # Start from 24 hours ago
-    base_time = datetime.now() - timedelta(hours=24)
-    
-    for _ in range(NUM_FLIGHTS):
-        # Random timestamp within last 24 hours
-        flight_time = base_time + timedelta(
-            hours=np.random.randint(0, 24),
-            minutes=np.random.randint(0, 60),
-            seconds=np.random.randint(0, 60)
-        )
-        
-        flight_id = generate_flight_id()
-        aircraft = np.random.choice(AIRCRAFT)
-        zone = np.random.randint(1, NUM_ZONES + 1)
-        
-        # Realistic physics: heavier aircraft = higher stress
-        aircraft_weight_factor = {
-            "B787": 3.5, "A380": 4.0, "B777": 3.8, "A330": 3.6,
-            "A321": 2.5, "B738": 2.2, "A320": 2.0, "B737": 2.1,
-            "Q400": 1.5, "ATR72": 1.2, "ATR42": 1.0,
-            "A350": 3.7, "E190": 1.8, "B789": 3.6
-        }.get(aircraft, 2.5)
-        
-        # Stress increases with zone position (higher at landing zone)
-        zone_factor = 0.5 + (zone / NUM_ZONES) * 1.5
-        
-        # Base stress with realistic variation
-        base_stress = 50 * aircraft_weight_factor * zone_factor
-        stress = base_stress + np.random.normal(0, 10)
-        stress = max(0, min(100, stress))  # Clamp 0-100
-        
-        # Rubber depth decreases with use
-        rubber_base = 12 - (zone / NUM_ZONES) * 8
-        rubber_mm = rubber_base + np.random.normal(0, 1)
-        rubber_mm = max(0.5, min(20, rubber_mm))
-        
-        # Cracks increase with stress
-        cracks_mm = (stress / 100) * 15 + np.random.normal(0, 2)
-        cracks_mm = max(0, min(50, cracks_mm))
-        
-        # Water presence (monsoon effect in India)
-        water_mm = np.random.exponential(scale=2) if np.random.random() < 0.3 else 0
-        water_mm = max(0, min(200, water_mm))
-        
-        # FOD (Foreign Object Debris) - random but correlated with zone
-        fod_weight_g = np.random.exponential(scale=50) if np.random.random() < 0.4 else 0
-        fod_weight_g = max(0, min(5000, fod_weight_g))
-        
-        # Weather
-        temperature_C = 25 + np.random.normal(0, 5)
-        humidity_pct = 70 + np.random.normal(0, 15)
-        humidity_pct = max(0, min(100, humidity_pct))
-        
-        rain_mm = water_mm * 0.3  # Correlation
-        
-        # Anomaly detection: stress > 75 or rubber < 2 or cracks > 20
-        anomaly = 1 if (stress > 75 or rubber_mm < 2 or cracks_mm > 20 or fod_weight_g > 1000) else 0
-        
-        data.append({
-            'timestamp': flight_time.isoformat(),
-            'flight_id': flight_id,
-            'aircraft': aircraft,
-            'zone': zone,
-            'rubber_mm': round(rubber_mm, 2),
-            'cracks_mm': round(cracks_mm, 2),
-            'water_mm': round(water_mm, 2),
-            'stress': round(stress, 2),
-            'fod_weight_g': round(fod_weight_g, 2),
-            'temperature_C': round(temperature_C, 1),
-            'humidity_pct': round(humidity_pct, 1),
-            'rain_mm': round(rain_mm, 2),
-            'anomaly': anomaly
-        })
-    
-    return pd.DataFrame(data)
+    end = datetime.now()
+    return generate_flight_batch(NUM_FLIGHTS, end - timedelta(hours=24), end, np.random.default_rng())
+
+def generate_flight_batch(n: int, start: datetime, end: datetime, rng: np.random.Generator) -> pd.DataFrame:
+    """
+    Generate n flights between start and end with vectorized draws.
+
+    Same physics as the original per-flight loop: stress from aircraft weight
+    and zone position, rubber/cracks/water/FOD/weather derived per row.
+    Rows are sorted by timestamp so consecutive batches stay in time order.
+    """
+    span = max(int((end - start).total_seconds()), 1)
+    offsets = np.sort(rng.integers(0, span, n)).astype("timedelta64[s]")
+    timestamps = np.datetime_as_string(np.datetime64(start, "s") + offsets, unit="s")
+
+    airlines = np.array(AIRLINES)[rng.integers(0, len(AIRLINES), n)]
+    numbers = np.char.zfill(rng.integers(1, 9999, n).astype(str), 4)
+    flight_ids = np.char.add(airlines, numbers)
+
+    aircraft_idx = rng.integers(0, len(AIRCRAFT), n)
+    aircraft = np.array(AIRCRAFT)[aircraft_idx]
+    weight_factors = np.array([AIRCRAFT_WEIGHT_FACTORS.get(a, 2.5) for a in AIRCRAFT])[aircraft_idx]
+    zone = rng.integers(1, NUM_ZONES + 1, n)
+
+    # Stress increases with zone position (higher at landing zone)
+    zone_factor = 0.5 + (zone / NUM_ZONES) * 1.5
+    stress = np.clip(50 * weight_factors * zone_factor + rng.normal(0, 10, n), 0, 100)
+
+    # Rubber depth decreases with use
+    rubber_mm = np.clip(12 - (zone / NUM_ZONES) * 8 + rng.normal(0, 1, n), 0.5, 20)
+
+    # Cracks increase with stress
+    cracks_mm = np.clip((stress / 100) * 15 + rng.normal(0, 2, n), 0, 50)
+
+    # Water presence (monsoon effect in India)
+    water_mm = np.clip(np.where(rng.random(n) < 0.3, rng.exponential(2, n), 0), 0, 200)
+
+    # FOD (Foreign Object Debris)
+    fod_weight_g = np.clip(np.where(rng.random(n) < 0.4, rng.exponential(50, n), 0), 0, 5000)
+
+    # Weather
+    temperature_C = 25 + rng.normal(0, 5, n)
+    humidity_pct = np.clip(70 + rng.normal(0, 15, n), 0, 100)
+    rain_mm = water_mm * 0.3  # Correlation
+
+    # Anomaly detection: stress > 75 or rubber < 2 or cracks > 20
+    anomaly = ((stress > 75) | (rubber_mm < 2) | (cracks_mm > 20) | (fod_weight_g > 1000)).astype(int)
+
+    return pd.DataFrame({
+        'timestamp': timestamps,
+        'flight_id': flight_ids,
+        'aircraft': aircraft,
+        'zone': zone,
+        'rubber_mm': np.round(rubber_mm, 2),
+        'cracks_mm': np.round(cracks_mm, 2),
+        'water_mm': np.round(water_mm, 2),
+        'stress': np.round(stress, 2),
+        'fod_weight_g': np.round(fod_weight_g, 2),
+        'temperature_C': np.round(temperature_C, 1),
+        'humidity_pct': np.round(humidity_pct, 1),
+        'rain_mm': np.round(rain_mm, 2),
+        'anomaly': anomaly
+    })
+
+def iter_flight_batches(rows: int, start: datetime, end: datetime, rng: np.random.Generator,
+                        chunk_size: int = CHUNK_SIZE):
+    """Yield batches of at most chunk_size rows, each covering the next slice of [start, end)"""
+    num_chunks = max(1, math.ceil(rows / chunk_size))
+    slice_span = (end - start) / num_chunks
+    for i in range(num_chunks):
+        n = min(chunk_size, rows - i * chunk_size)
+        slice_start = start + slice_span * i
+        yield generate_flight_batch(n, slice_start, slice_start + slice_span, rng)
+
+def write_flight_rows(db_path: str, rows: int, start: datetime, end: datetime, seed=None,
+                      chunk_size: int = CHUNK_SIZE, durable: bool = True) -> int:
+    """
+    Stream generated rows into db_path with chunked executemany in one transaction.
+
+    Memory stays bounded by chunk_size regardless of rows.
+    """
+    rng = np.random.default_rng(seed)
+    conn = sqlite3.connect(db_path)
+    if durable:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+    else:
+        # Scratch partition files: no journal, no fsync
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+
+    written = 0
+    try:
+        with conn:
+            for batch in iter_flight_batches(rows, start, end, rng, chunk_size):
+                conn.executemany(INSERT_SQL, zip(*(batch[col].tolist() for col in RUNWAY_COLUMNS)))
+                written += len(batch)
+    finally:
+        conn.close()
+    return written
+
+def _write_partition(args) -> str:
+    """Worker: generate one time partition into its own scratch database"""
+    path, rows, start, end, seed, chunk_size = args
+    create_database(path)
+    conn = sqlite3.connect(path)
+    drop_indexes(conn)
+    conn.close()
+    write_flight_rows(path, rows, start, end, seed, chunk_size, durable=False)
+    return path
+
+def generate_history(rows: int, start: datetime, end: datetime, seed=None, workers: int = 1,
+                     chunk_size: int = CHUNK_SIZE, db_path: str = None) -> int:
+    """
+    Append rows generated between start and end to the runway database.
+
+    The range is split into one time partition per worker, each drawn from
+    its own child seed of `seed`, so output is reproducible for a given
+    (seed, workers) pair. Workers write scratch databases in parallel; the
+    partitions are then copied in time order in a single transaction.
+    Indexes are dropped during the load and rebuilt once at the end, even
+    if the load fails.
+    """
+    db_path = db_path or DB_PATH
+    if workers > MAX_WORKERS:
+        logger.warning(f"Limiting workers to {MAX_WORKERS}")
+        workers = MAX_WORKERS
+
+    conn = sqlite3.connect(db_path)
+    drop_indexes(conn)
+    conn.close()
+
+    try:
+        if workers <= 1:
+            written = write_flight_rows(db_path, rows, start, end, seed, chunk_size)
+        else:
+            seeds = np.random.SeedSequence(seed).spawn(workers)
+            counts = [len(part) for part in np.array_split(np.arange(rows), workers)]
+            span = (end - start) / workers
+            scratch = tempfile.mkdtemp(prefix="smartzone_gen_", dir=os.path.dirname(os.path.abspath(db_path)))
+            jobs = [
+                (os.path.join(scratch, f"part_{i}.db"), counts[i], start + span * i, start + span * (i + 1),
+                 seeds[i], chunk_size)
+                for i in range(workers)
+            ]
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    paths = list(pool.map(_write_partition, jobs))
+                written = _merge_partitions(db_path, paths)
+            finally:
+                shutil.rmtree(scratch, ignore_errors=True)
+    finally:
+        # A failed or interrupted load must not leave the live database unindexed
+        conn = sqlite3.connect(db_path)
+        try:
+            create_indexes(conn)
+            conn.commit()
+        finally:
+            conn.close()
+
+    conn = sqlite3.connect(db_path)
+    update_rollups(conn)
+    conn.close()
+    return written
+
+def _merge_partitions(db_path: str, paths: list) -> int:
+    """Copy partition databases into db_path, in order, in one transaction"""
+    columns = ", ".join(RUNWAY_COLUMNS)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    try:
+        for i, path in enumerate(paths):
+            conn.execute(f"ATTACH DATABASE ? AS part_{i}", (path,))
+        written = 0
+        with conn:
+            for i in range(len(paths)):
+                cursor = conn.execute(
+                    f"INSERT INTO runway_data ({columns}) SELECT {columns} FROM part_{i}.runway_data ORDER BY id"
+                )
+                written += cursor.rowcount
+        for i in range(len(paths)):
+            conn.execute(f"DETACH DATABASE part_{i}")
+    finally:
+        conn.close()
+    return written
 
 # Insert data into database
 def insert_data_to_db(df):
@@ -157,6 +310,7 @@ def insert_data_to_db(df):
     conn = sqlite3.connect(DB_PATH)
     df.to_sql('runway_data', conn, if_exists='append', index=False)
     conn.commit()
+    update_rollups(conn)
     
     # Get stats
     cursor = conn.cursor()
@@ -174,12 +328,57 @@ def insert_data_to_db(df):
         logger.info(f"  Zone {zone}: {flights} flights")
 
 # Main execution
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate SmartZone-R runway data")
+    parser.add_argument("--rows", type=int, default=None,
+                        help=f"Rows to generate (default: {NUM_FLIGHTS} flights over the last 24h)")
+    parser.add_argument("--start", type=datetime.fromisoformat, default=None,
+                        help="Range start, ISO date/time (default: --days before --end)")
+    parser.add_argument("--end", type=datetime.fromisoformat, default=None,
+                        help="Range end, ISO date/time (default: now)")
+    parser.add_argument("--days", type=float, default=1.0, help="Range length when --start is omitted")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible output")
+    parser.add_argument("--workers", type=int, default=1, help=f"Generator processes (max {MAX_WORKERS})")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows per executemany batch")
+    parser.add_argument("--append", action="store_true", help="Keep existing rows instead of recreating the table")
+    parser.add_argument("--db", default=None, help="Database path (default: backend/smartzone_r.db)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    global DB_PATH
+    args = parse_args(argv)
+    if args.db:
+        DB_PATH = args.db
+
     logger.info("=" * 60)
     logger.info("SmartZone-R Data Generator")
     logger.info("Chennai Airport (MAA) Runway Monitoring")
     logger.info("=" * 60)
-    
+
+    if args.rows is None and args.seed is None and args.start is None and args.end is None:
+        generate_daily_sample()
+        return
+
+    end = args.end or datetime.now()
+    start = args.start or end - timedelta(days=args.days)
+    rows = args.rows if args.rows is not None else NUM_FLIGHTS
+
+    logger.info(f"Configuration:")
+    logger.info(f"  Rows: {rows:,} from {start.isoformat()} to {end.isoformat()}")
+    logger.info(f"  Seed: {args.seed}, workers: {args.workers}, chunk size: {args.chunk_size:,}")
+    logger.info(f"  Database: {DB_PATH}")
+
+    if not args.append or not os.path.exists(DB_PATH):
+        create_database()
+
+    started = datetime.now()
+    written = generate_history(rows, start, end, seed=args.seed, workers=args.workers,
+                               chunk_size=args.chunk_size)
+    elapsed = (datetime.now() - started).total_seconds()
+    logger.info(f"Inserted {written:,} rows in {elapsed:.1f}s ({written / max(elapsed, 1e-9):,.0f} rows/s)")
+
+def generate_daily_sample():
+    """Original mode: one day of NUM_FLIGHTS flights, with a sample printout"""
     logger.info(f"Configuration:")
     logger.info(f"  Airport: {AIRPORT_CODE} (Chennai - Meenambakkam)")
     logger.info(f"  Flights to generate: {NUM_FLIGHTS}")
@@ -207,4 +406,5 @@ def main():
     logger.info("Visit: http://localhost:8000")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     main()
@@ -9,8 +9,7 @@ import logging
 from typing import Optional
 from fastapi import FastAPI, WebSocket, Query, Body, Depends, HTTPException, status, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-from pathlib import Path
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
 
 # Setup logging
@@ -23,10 +22,23 @@ logger = logging.getLogger(__name__)
 # Ensure backend directory is in path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from routes import status, flights, analytics, alerts
-from serial_listener import start_serial_listener, stop_serial_listener, get_listener_status
+from routes import status as status_routes, flights, analytics, alerts, runway, diagnostics
+from serial_listener import (
+    start_serial_listener, stop_serial_listener, get_listener_status, add_ingest_listener
+)
 from auth import Authentication, AuthToken
-from websocket import websocket_endpoint, start_websocket_broadcaster, stop_websocket_broadcaster
+from websocket import (
+    websocket_endpoint, start_websocket_broadcaster, stop_websocket_broadcaster, notify_new_data
+)
+from dataset_cache import warm_dataset_cache
+from database import ensure_indexes
+from rollups import refresh_rollups
+from archive import start_archiver, stop_archiver
+from executor import start_loop_monitor, stop_executor
+from db_pool import close_pools
+from static_assets import load_static_assets, serve_static
+from metrics import MetricsMiddleware, render_metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from profiling import ProfilingMiddleware
 
 # Pydantic models for request/response validation
 class LoginRequest(BaseModel):
@@ -77,12 +89,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+async def authorize_profiling(request: Request):
+    """Only admins may profile a request (same check as admin-only routes)."""
+    return await require_role("admin")(await get_current_user(request))
+
+# Opt-in per-request profiling (X-Profile: 1 or ?profile=1)
+app.add_middleware(ProfilingMiddleware, authorize=authorize_profiling)
+
+# Per-route request counts and latency histograms for /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Startup event - start background services
 @app.on_event("startup")
 async def startup_event():
     """Start background services on app startup."""
     logger.info("Starting SmartZone-R services...")
+    start_loop_monitor()
+    load_static_assets()
+    ensure_indexes()
+    refresh_rollups()
+    warm_dataset_cache()
+    add_ingest_listener(notify_new_data)
     start_serial_listener()
+    start_archiver()
     await start_websocket_broadcaster()
     logger.info("Services started successfully")
 
@@ -92,13 +121,16 @@ async def shutdown_event():
     """Stop background services on app shutdown."""
     logger.info("Stopping SmartZone-R services...")
     stop_serial_listener()
+    await stop_archiver()
     await stop_websocket_broadcaster()
+    await stop_executor()
+    close_pools()
     logger.info("Services stopped")
 
 # Include API route modules FIRST (priority)
 # Apply role-based access control to routers
 app.include_router(
-    status.router,
+    status_routes.router,
     dependencies=[Depends(require_role("admin", "maintenance"))]
 )
 app.include_router(
@@ -113,6 +145,18 @@ app.include_router(
     alerts.router,
     dependencies=[Depends(require_role("viewer", "maintenance", "admin"))]
 )
+app.include_router(
+    alerts.download_router,
+    dependencies=[Depends(require_role("maintenance", "admin"))]
+)
+app.include_router(
+    runway.router,
+    dependencies=[Depends(require_role("maintenance", "admin"))]
+)
+app.include_router(
+    diagnostics.router,
+    dependencies=[Depends(require_role("admin"))]
+)
 
 # Authentication Endpoints
 @app.post("/api/auth/login")
@@ -135,6 +179,13 @@ async def refresh_token(token_data: RefreshRequest):
     except HTTPException:
         raise
 
+@app.post("/api/auth/logout")
+async def logout(current_user: dict = Depends(get_current_user)):
+    """Revoke the caller's token and drop it from the verified-token cache."""
+    Authentication.logout(current_user["token"])
+    logger.info(f"User {current_user['username']} logged out")
+    return {"status": "logged_out"}
+
 @app.get("/api/auth/me")
 async def get_user_info(current_user: dict = Depends(get_current_user)):
     """Get current authenticated user info."""
@@ -158,6 +209,12 @@ async def health():
         "service": "SmartZone-R API"
     }
 
+# Prometheus metrics (admin only)
+@app.get("/metrics", dependencies=[Depends(require_role("admin"))])
+async def prometheus_metrics():
+    """Expose counters and latency histograms in Prometheus text format."""
+    return PlainTextResponse(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
 # Hardware status endpoint (admin + maintenance only)
 @app.get("/api/hardware/status")
 async def hardware_status(current_user: dict = Depends(require_role("admin", "maintenance"))):
@@ -168,34 +225,32 @@ async def hardware_status(current_user: dict = Depends(require_role("admin", "ma
         "port": status_info["port"],
         "last_reading": status_info["last_reading"],
         "total_inserted": status_info["total_inserted"],
+        "ingest": status_info["ingest"],
+        "devices": status_info["devices"],
         "service": "Serial Listener"
     }
 
-# Determine frontend path
-frontend_path = os.path.join(os.path.dirname(__file__), "..", "frontend")
-frontend_dir = Path(frontend_path)
-
-# Serve index.html at root
+# Frontend assets are served from memory (see static_assets.py)
 @app.get("/")
-async def root():
+async def root(request: Request):
     """Serve main dashboard."""
-    index_file = frontend_dir / "index.html"
-    if index_file.exists():
-        return FileResponse(index_file, media_type="text/html")
+    response = serve_static(request, "index.html")
+    if response is not None:
+        return response
     return {"error": "Frontend files not found"}
 
 # Serve login.html
 @app.get("/login")
-async def serve_login():
+async def serve_login(request: Request):
     """Serve login page."""
-    login_file = frontend_dir / "login.html"
-    if login_file.exists():
-        return FileResponse(login_file, media_type="text/html")
+    response = serve_static(request, "login.html")
+    if response is not None:
+        return response
     return {"error": "Login page not found"}
 
 # Serve all other files (LAST - catch-all for frontend files)
 @app.get("/{path:path}")
-async def serve_frontend(path: str):
+async def serve_frontend(path: str, request: Request):
     """Serve frontend files. Skip /api routes (handled by routers above)."""
     # Skip API routes - they're handled by the routers
     if path.startswith("api/"):
@@ -205,24 +260,13 @@ async def serve_frontend(path: str):
     if path.startswith("ws/"):
         return {"error": "WebSocket endpoint not found"}
     
-    # Try exact file first
-    file_path = frontend_dir / path
-    if file_path.exists() and file_path.is_file():
-        return FileResponse(file_path)
-    
-    # Try with .html
-    html_path = frontend_dir / f"{path}.html"
-    if html_path.exists() and html_path.is_file():
-        return FileResponse(html_path, media_type="text/html")
-    
-    # Default to index.html for unknown routes
-    index_path = frontend_dir / "index.html"
-    if index_path.exists():
-        return FileResponse(index_path, media_type="text/html")
+    # Exact file, then <path>.html, then index.html for unknown routes
+    response = serve_static(request, path)
+    if response is not None:
+        return response
     
     return {"error": "File not found"}
 
-
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
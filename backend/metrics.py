@@ -0,0 +1,243 @@
+"""
+Prometheus metrics for SmartZone-R.
+Hot paths record into counters and fixed-bucket histograms (one small lock
+per metric, no allocation per observation); subsystems that already keep
+their own counters register collectors that are read only at scrape time.
+Rendered in the Prometheus text exposition format by render_metrics().
+"""
+
+import time
+import bisect
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers sub-millisecond SQLite reads up to multi-second exports
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_value(value) -> str:
+    if value is None:
+        return "NaN"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, float):
+        if value == float("inf"):
+            return "+Inf"
+        return repr(value)
+    return str(value)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonic counter, optionally labelled"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, labels: tuple = (), amount: float = 1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def get(self, labels: tuple = ()):
+        return self.values.get(labels, 0)
+
+    def samples(self):
+        with self.lock:
+            items = list(self.values.items())
+        for labels, value in items:
+            yield self.name, _format_labels(self.labelnames, labels), value
+
+
+class Histogram:
+    """Fixed-bucket histogram, optionally labelled"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.series = {}  # labels -> [bucket counts..., +Inf count, sum]
+        self.lock = threading.Lock()
+
+    def observe(self, value: float, labels: tuple = ()):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def time(self, labels: tuple = ()):
+        """Context manager observing the elapsed wall time of its block"""
+        return _Timer(self, labels)
+
+    def get_count(self, labels: tuple = ()) -> int:
+        series = self.series.get(labels)
+        return sum(series[:-1]) if series else 0
+
+    def samples(self):
+        with self.lock:
+            items = [(labels, list(series)) for labels, series in self.series.items()]
+        for labels, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = 'le="' + _format_value(float(bound)) + '"'
+                yield f"{self.name}_bucket", _format_labels(self.labelnames, labels, le), cumulative
+            yield f"{self.name}_sum", _format_labels(self.labelnames, labels), series[-1]
+            yield f"{self.name}_count", _format_labels(self.labelnames, labels), cumulative
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: Histogram, labels: tuple):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, self.labels)
+        return False
+
+
+# Registry
+
+_metrics = []
+_collectors = []
+
+
+def counter(name: str, help: str, labelnames: tuple = ()) -> Counter:
+    """Create and register a counter"""
+    metric = Counter(name, help, labelnames)
+    _metrics.append(metric)
+    return metric
+
+
+def histogram(name: str, help: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+    """Create and register a histogram"""
+    metric = Histogram(name, help, labelnames, buckets)
+    _metrics.append(metric)
+    return metric
+
+
+def register_collector(collect):
+    """
+    Register a scrape-time collector.
+
+    collect() returns an iterable of (name, kind, help, value) or
+    (name, kind, help, value, labels_dict) tuples, where kind is
+    "counter" or "gauge". None values are skipped.
+    """
+    _collectors.append(collect)
+
+
+def stats_samples(prefix: str, stats: dict, counters: tuple = (), gauges: tuple = (), labels: dict = None) -> list:
+    """Collector samples from a get_stats() dict"""
+    samples = []
+    for key in counters:
+        base = key[6:] if key.startswith("total_") else key
+        name = f"{prefix}_{base}_total"
+        samples.append((name, "counter", f"{prefix} {key}", stats.get(key), labels))
+    for key in gauges:
+        samples.append((f"{prefix}_{key}", "gauge", f"{prefix} {key}", stats.get(key), labels))
+    return samples
+
+
+def render_metrics() -> str:
+    """Render every metric and collector in Prometheus text format"""
+    lines = []
+    for metric in _metrics:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for name, labels, value in metric.samples():
+            lines.append(f"{name}{labels} {_format_value(value)}")
+
+    families = {}
+    for collect in _collectors:
+        try:
+            samples = list(collect())
+        except Exception as e:
+            logger.warning(f"Metrics collector failed: {e}")
+            continue
+        for name, kind, help, value, *rest in samples:
+            if value is None:
+                continue
+            labels = rest[0] if rest and rest[0] else {}
+            family = families.setdefault(name, (kind, help, []))
+            family[2].append((_format_labels(tuple(labels), tuple(labels.values())), value))
+
+    for name, (kind, help, samples) in families.items():
+        lines.append(f"# HELP {name} {help}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            lines.append(f"{name}{labels} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# HTTP
+
+http_requests = counter(
+    "smartzone_http_requests_total", "HTTP requests by route template and status",
+    ("method", "route", "status"),
+)
+http_duration = histogram(
+    "smartzone_http_request_duration_seconds", "HTTP request latency until the last body chunk",
+    ("method", "route"),
+)
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing HTTP requests by their matched route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Templates (/api/flights/zone/{zone_id}) keep label cardinality bounded
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            http_duration.observe(time.perf_counter() - start, (method, path))
+            http_requests.inc((method, path, str(status[0])))
@@ -92,6 +92,9 @@ class TimeSeriesData(BaseModel):
     """Time series data for charting."""
     labels: List[str]
     datasets: List[dict]
+    method: Optional[str] = None
+    bucket_seconds: Optional[float] = None
+    rollup_grain: Optional[str] = None
 
 
 class HeatmapData(BaseModel):
@@ -0,0 +1,258 @@
+"""
+On-demand request profiling and slow-query log for SmartZone-R.
+An admin can profile a single request by sending `X-Profile: 1` (or
+`?profile=1`): the request runs under cProfile on the event loop thread and
+in every DB executor call it makes, and the merged profile is kept in a
+small history. Queries slower than SLOW_QUERY_MS are recorded in a bounded
+ring buffer. Both are served by routes/diagnostics.py.
+"""
+
+import io
+import os
+import time
+import uuid
+import pstats
+import marshal
+import cProfile
+import threading
+import contextvars
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException, Request
+from fastapi.responses import JSONResponse
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", "100"))
+PROFILE_HISTORY = int(os.getenv("PROFILE_HISTORY", "20"))
+PROFILE_TOP_FUNCTIONS = int(os.getenv("PROFILE_TOP_FUNCTIONS", "40"))
+
+PROFILE_HEADER = "x-profile"
+PROFILE_QUERY_FLAG = "profile"
+_TRUTHY = ("1", "true", "yes", "on")
+
+# Params beyond this many items (e.g. executemany batches) are elided
+MAX_LOGGED_PARAMS = 20
+
+
+# Slow-query log
+
+class SlowQueryLog:
+    """Bounded ring buffer of queries slower than a threshold"""
+
+    def __init__(self, threshold_ms: float = None, size: int = None):
+        self.threshold_ms = SLOW_QUERY_MS if threshold_ms is None else threshold_ms
+        self.entries = deque(maxlen=SLOW_QUERY_LOG_SIZE if size is None else size)
+        self.lock = threading.Lock()
+        self.recorded = 0
+
+    def record(self, sql: str, params, rows: Optional[int], duration_s: float, source: str = "execute_query"):
+        """Keep the query if it took at least threshold_ms"""
+        duration_ms = duration_s * 1000
+        if duration_ms < self.threshold_ms:
+            return False
+        entry = {
+            "timestamp": datetime.now().isoformat(),
+            "source": source,
+            "sql": " ".join(sql.split()),
+            "params": _loggable_params(params),
+            "rows": rows,
+            "duration_ms": round(duration_ms, 2),
+        }
+        with self.lock:
+            self.entries.append(entry)
+            self.recorded += 1
+        logger.warning(f"Slow query ({duration_ms:.0f}ms, {rows} rows): {entry['sql'][:200]}")
+        return True
+
+    def get_entries(self) -> list:
+        """Recorded queries, newest first"""
+        with self.lock:
+            return list(reversed(self.entries))
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            return {
+                "threshold_ms": self.threshold_ms,
+                "capacity": self.entries.maxlen,
+                "entries": len(self.entries),
+                "recorded": self.recorded,
+            }
+
+
+def _loggable_params(params):
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: repr(value) for key, value in list(params.items())[:MAX_LOGGED_PARAMS]}
+    values = [repr(value) for value in list(params)[:MAX_LOGGED_PARAMS]]
+    if len(params) > MAX_LOGGED_PARAMS:
+        values.append(f"... {len(params) - MAX_LOGGED_PARAMS} more")
+    return values
+
+
+# Global slow-query log
+slow_query_log = SlowQueryLog()
+
+
+# Request profiling
+
+class ProfileSession:
+    """cProfile data for one request, merged from the loop and executor threads"""
+
+    def __init__(self, method: str, path: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.method = method
+        self.path = path
+        self.started = datetime.now()
+        self.loop_profiler = cProfile.Profile()
+        self.thread_profiles = []
+        self.executor_calls = 0
+        self.duration_ms = None
+        self.status = None
+        self.lock = threading.Lock()
+
+    def run_call(self, func):
+        """Run an executor call under its own profiler (cProfile is per thread)"""
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(func)
+        finally:
+            with self.lock:
+                self.thread_profiles.append(profiler)
+                self.executor_calls += 1
+
+    def stats(self) -> pstats.Stats:
+        stats = pstats.Stats(self.loop_profiler)
+        with self.lock:
+            for profiler in self.thread_profiles:
+                stats.add(profiler)
+        return stats
+
+    def report(self, sort: str = "cumulative", limit: int = None) -> str:
+        """Text report of the top functions"""
+        output = io.StringIO()
+        stats = self.stats()
+        stats.stream = output
+        stats.sort_stats(sort).print_stats(limit or PROFILE_TOP_FUNCTIONS)
+        return output.getvalue()
+
+    def dump(self) -> bytes:
+        """Binary pstats data (loadable by pstats/snakeviz)"""
+        return marshal.dumps(self.stats().stats)
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "started": self.started.isoformat(),
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "executor_calls": self.executor_calls,
+        }
+
+
+_active_session: contextvars.ContextVar = contextvars.ContextVar("profile_session", default=None)
+_profiles = deque(maxlen=PROFILE_HISTORY)
+_profiles_lock = threading.Lock()
+# The loop thread can only run one cProfile at a time
+_loop_profiling = threading.Lock()
+
+
+def active_session() -> Optional[ProfileSession]:
+    """The profile session of the current request, if any"""
+    return _active_session.get()
+
+
+def get_profile(profile_id: str) -> Optional[ProfileSession]:
+    with _profiles_lock:
+        return next((session for session in _profiles if session.id == profile_id), None)
+
+
+def list_profiles() -> list:
+    """Stored profile summaries, newest first"""
+    with _profiles_lock:
+        return [session.summary() for session in reversed(_profiles)]
+
+
+def _profiling_requested(scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == PROFILE_HEADER.encode() and value.decode().lower() in _TRUTHY:
+            return True
+    query = scope.get("query_string", b"").decode()
+    return any(
+        pair.partition("=")[0] == PROFILE_QUERY_FLAG and pair.partition("=")[2].lower() in _TRUTHY
+        for pair in query.split("&")
+    )
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles requests carrying the profile flag.
+
+    `authorize(request)` must raise HTTPException unless the caller may
+    profile (main.py passes the require_role("admin") check). The response
+    carries X-Profile-Id; the report is fetched from /api/diagnostics.
+    Coroutines of other requests that run on the loop while this one awaits
+    are included in the loop-thread part of the profile.
+    """
+
+    def __init__(self, app, authorize):
+        self.app = app
+        self.authorize = authorize
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _profiling_requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.authorize(Request(scope))
+            if not _loop_profiling.acquire(blocking=False):
+                raise HTTPException(status_code=409, detail="Another request is being profiled")
+        except HTTPException as e:
+            response = JSONResponse({"detail": e.detail}, status_code=e.status_code, headers=e.headers)
+            await response(scope, receive, send)
+            return
+
+        session = ProfileSession(scope["method"], scope["path"])
+        token = _active_session.set(session)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                session.status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", session.id.encode())
+                ]
+            await send(message)
+
+        start = time.perf_counter()
+        session.loop_profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            session.loop_profiler.disable()
+            _loop_profiling.release()
+            _active_session.reset(token)
+            session.duration_ms = round((time.perf_counter() - start) * 1000, 2)
+            with _profiles_lock:
+                _profiles.append(session)
+            logger.info(f"Profiled {session.method} {session.path} in {session.duration_ms}ms [{session.id}]")
+
+
+def get_diagnostics_stats() -> dict:
+    """Get slow-query log and profile history sizes"""
+    with _profiles_lock:
+        profiles = len(_profiles)
+    return {"slow_queries": slow_query_log.get_stats(), "profiles": profiles, "profile_history": PROFILE_HISTORY}
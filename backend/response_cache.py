@@ -0,0 +1,196 @@
+"""
+Dataset-versioned response cache for SmartZone-R.
+Serialized responses are kept per endpoint, query string and dataset
+version, so screens polling between sensor inserts are answered from memory
+(or with 304 Not Modified) instead of recomputing the same aggregates.
+"""
+
+import os
+import json
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+from typing import Callable
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from dotenv import load_dotenv
+
+import metrics
+from dataset_cache import get_dataset_version
+from executor import run_blocking, SingleFlight
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "512"))
+
+_ADAPTERS = {}
+
+
+def _adapter(model) -> TypeAdapter:
+    adapter = _ADAPTERS.get(model)
+    if adapter is None:
+        adapter = _ADAPTERS[model] = TypeAdapter(model)
+    return adapter
+
+
+def config_digest(config) -> str:
+    """Short stable digest of a config dict (e.g. alert thresholds)"""
+    if config is None:
+        return "-"
+    encoded = json.dumps(config, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha1(encoded).hexdigest()[:12]
+
+
+class ResponseCache:
+    """LRU of serialized JSON bodies bounded by entry count and total bytes"""
+
+    def __init__(self, max_bytes: int = None, max_entries: int = None):
+        self.max_bytes = RESPONSE_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.max_entries = RESPONSE_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self.entries = OrderedDict()  # key -> (etag, body)
+        self.bytes = 0
+        self.lock = threading.Lock()
+        self.flights = SingleFlight()
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.not_modified = 0
+        self.evictions = 0
+
+    def get(self, key: tuple):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def get_coalesced(self, key: tuple):
+        """Entry another request stored while this one waited on the key"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.coalesced += 1
+            return entry
+
+    def put(self, key: tuple, etag: str, body: bytes):
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= len(previous[1])
+            if len(body) > self.max_bytes:
+                return
+            self.entries[key] = (etag, body)
+            self.bytes += len(body)
+            while self.bytes > self.max_bytes or len(self.entries) > self.max_entries:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.bytes -= len(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "not_modified": self.not_modified,
+                "evictions": self.evictions,
+            }
+
+
+# Global response cache
+response_cache = ResponseCache()
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def _lookup_or_compute(path: str, query: str, compute: Callable, model, config) -> tuple:
+    """Cached (etag, body) for the current dataset version, computing it on a miss"""
+    key = (path, query, get_dataset_version(), config_digest(config))
+    entry = response_cache.get(key)
+    if entry is not None:
+        return entry
+
+    # Concurrent misses on the same key wait for one computation
+    with response_cache.flights.hold(key):
+        entry = response_cache.get_coalesced(key)
+        if entry is not None:
+            return entry
+
+        adapter = _adapter(model)
+        body = adapter.dump_json(adapter.validate_python(compute()))
+        etag = f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+        response_cache.put(key, etag, body)
+        return etag, body
+
+
+async def cached_response(request: Request, compute: Callable, model, config=None) -> Response:
+    """
+    Serve `compute()` from the response cache for the current dataset version.
+
+    The body is validated against `model` and serialized once per
+    (path, query string, dataset version, config) key; later requests get
+    the stored bytes, or 304 when their If-None-Match carries its ETag.
+    The version check and any computation run on the DB executor.
+
+    Args:
+        request (Request): Incoming request (path, query and If-None-Match)
+        compute (callable): Builds the response value on a miss
+        model: The route's response_model
+        config (dict): Extra inputs the result depends on (optional)
+
+    Returns:
+        Response: 200 with JSON body, or 304 Not Modified
+    """
+    etag, body = await run_blocking(
+        _lookup_or_compute, request.url.path, str(request.query_params), compute, model, config
+    )
+
+    # no-cache: browsers may store the body but must revalidate with the ETag
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request, etag):
+        with response_cache.lock:
+            response_cache.not_modified += 1
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def get_response_cache_stats() -> dict:
+    """Get response cache hit/miss counters"""
+    return response_cache.get_stats()
+
+
+def _collect_metrics():
+    return metrics.stats_samples(
+        "smartzone_response_cache", get_response_cache_stats(),
+        counters=("hits", "misses", "coalesced", "not_modified", "evictions"), gauges=("entries", "bytes", "hit_ratio"),
+    )
+
+
+metrics.register_collector(_collect_metrics)
@@ -0,0 +1,346 @@
+"""
+Per-zone rollup tables for SmartZone-R.
+Keeps count/sum/min/max per metric for each zone and minute, hour and day,
+updated incrementally from runway_data ids and rebuildable from raw rows.
+"""
+
+import os
+import sqlite3
+import argparse
+import logging
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+import database
+from database import ZONE_METRICS, clipped_sql, bucket_time_series
+
+logger = logging.getLogger(__name__)
+
+# Grain -> (strftime bucket format, bucket width in seconds), finest first
+ROLLUP_GRAINS = {
+    "minute": ("%Y-%m-%dT%H:%M:00", 60),
+    "hour": ("%Y-%m-%dT%H:00:00", 3600),
+    "day": ("%Y-%m-%dT00:00:00", 86400),
+}
+ROLLUP_METRICS = ZONE_METRICS
+ROLLUP_STATE_TABLE = "runway_rollup_state"
+
+
+def rollup_table(grain: str) -> str:
+    return f"runway_rollup_{grain}"
+
+
+def _metric_columns(metric: str) -> list:
+    return [f"{metric}_sum", f"{metric}_n", f"{metric}_min", f"{metric}_max"]
+
+
+_COLUMNS = ["bucket", "zone", "reading_count", "anomaly_count"] + [
+    col for metric in ROLLUP_METRICS for col in _metric_columns(metric)
+]
+
+
+def _create_sql(grain: str) -> str:
+    metric_defs = ", ".join(
+        f"{m}_sum REAL, {m}_n INTEGER NOT NULL, {m}_min REAL, {m}_max REAL" for m in ROLLUP_METRICS
+    )
+    return (
+        f"CREATE TABLE IF NOT EXISTS {rollup_table(grain)} ("
+        "bucket TEXT NOT NULL, zone INTEGER NOT NULL, "
+        "reading_count INTEGER NOT NULL, anomaly_count INTEGER NOT NULL, "
+        f"{metric_defs}, PRIMARY KEY (bucket, zone))"
+    )
+
+
+def _upsert_sql(grain: str, source: str = "runway_data") -> str:
+    """Fold raw rows with id in (?, ?] into one grain's buckets"""
+    fmt = ROLLUP_GRAINS[grain][0]
+    bucket = f"strftime('{fmt}', timestamp)"
+    selects = [bucket, "zone", "COUNT(*)", "SUM(anomaly)"]
+    updates = [
+        "reading_count = reading_count + excluded.reading_count",
+        "anomaly_count = anomaly_count + excluded.anomaly_count",
+    ]
+    for m in ROLLUP_METRICS:
+        value = clipped_sql(m)
+        selects += [f"SUM({value})", f"COUNT({value})", f"MIN({value})", f"MAX({value})"]
+        # Two-argument MIN/MAX and + return NULL if either side is NULL
+        updates += [
+            f"{m}_sum = COALESCE({m}_sum + excluded.{m}_sum, {m}_sum, excluded.{m}_sum)",
+            f"{m}_n = {m}_n + excluded.{m}_n",
+            f"{m}_min = COALESCE(MIN({m}_min, excluded.{m}_min), {m}_min, excluded.{m}_min)",
+            f"{m}_max = COALESCE(MAX({m}_max, excluded.{m}_max), {m}_max, excluded.{m}_max)",
+        ]
+    return (
+        f"INSERT INTO {rollup_table(grain)} ({', '.join(_COLUMNS)}) "
+        f"SELECT {', '.join(selects)} FROM {source} "
+        f"WHERE id > ? AND id <= ? AND {bucket} IS NOT NULL "
+        f"GROUP BY 1, 2 "
+        f"ON CONFLICT (bucket, zone) DO UPDATE SET {', '.join(updates)}"
+    )
+
+
+_UPSERT_SQL = {grain: _upsert_sql(grain) for grain in ROLLUP_GRAINS}
+_FOLD_SOURCE = "temp.rollup_source"
+_FOLD_SQL = {grain: _upsert_sql(grain, _FOLD_SOURCE) for grain in ROLLUP_GRAINS}
+
+
+def ensure_rollup_tables(conn):
+    """Create the rollup and watermark tables if missing"""
+    for grain in ROLLUP_GRAINS:
+        conn.execute(_create_sql(grain))
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {ROLLUP_STATE_TABLE} ("
+        "id INTEGER PRIMARY KEY CHECK (id = 1), last_id INTEGER NOT NULL)"
+    )
+    conn.execute(f"INSERT OR IGNORE INTO {ROLLUP_STATE_TABLE} (id, last_id) VALUES (1, 0)")
+
+
+def drop_rollup_tables(conn):
+    """Drop rollups (when runway_data itself is recreated)"""
+    for grain in ROLLUP_GRAINS:
+        conn.execute(f"DROP TABLE IF EXISTS {rollup_table(grain)}")
+    conn.execute(f"DROP TABLE IF EXISTS {ROLLUP_STATE_TABLE}")
+
+
+def _watermark(conn) -> int:
+    row = conn.execute(f"SELECT last_id FROM {ROLLUP_STATE_TABLE} WHERE id = 1").fetchone()
+    return row[0] if row else 0
+
+
+def _max_row_id(conn) -> int:
+    return conn.execute(database.MAX_ROW_ID_QUERY).fetchone()[0] or 0
+
+
+def apply_pending_rollups(conn) -> int:
+    """
+    Fold raw rows newer than the watermark into every grain.
+
+    Runs inside the caller's write transaction (the ingest writer calls it
+    right after its INSERT so rows and rollups commit together).
+
+    Returns:
+        int: Number of raw rows folded in
+    """
+    last_id = _watermark(conn)
+    max_id = _max_row_id(conn)
+    if max_id < last_id:
+        # runway_data was recreated or rows deleted: start over from raw data
+        for grain in ROLLUP_GRAINS:
+            conn.execute(f"DELETE FROM {rollup_table(grain)}")
+        last_id = 0
+    if max_id == last_id:
+        return 0
+
+    for grain in ROLLUP_GRAINS:
+        conn.execute(_UPSERT_SQL[grain], (last_id, max_id))
+    conn.execute(f"UPDATE {ROLLUP_STATE_TABLE} SET last_id = ? WHERE id = 1", (max_id,))
+    return max_id - last_id
+
+
+def update_rollups(conn) -> int:
+    """Bring rollups up to date in their own write transaction"""
+    ensure_rollup_tables(conn)
+    conn.commit()
+    if _watermark(conn) == _max_row_id(conn):
+        return 0
+
+    # IMMEDIATE takes the write lock before reading the watermark, so two
+    # updaters can never fold the same id range twice
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        applied = apply_pending_rollups(conn)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return applied
+
+
+def fold_frame(conn, df: pd.DataFrame) -> int:
+    """Fold rows that are not in runway_data (e.g. archived days) into every grain"""
+    if df.empty:
+        return 0
+    columns = ["id", "timestamp", "zone", "anomaly"] + ROLLUP_METRICS
+    conn.execute(
+        f"CREATE TEMP TABLE IF NOT EXISTS rollup_source (id INTEGER, timestamp TEXT, zone INTEGER, "
+        f"anomaly INTEGER, {', '.join(f'{m} REAL' for m in ROLLUP_METRICS)})"
+    )
+    rows = df[columns].copy()
+    rows["timestamp"] = pd.to_datetime(rows["timestamp"]).dt.strftime("%Y-%m-%dT%H:%M:%S")
+    conn.executemany(
+        f"INSERT INTO {_FOLD_SOURCE} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+        rows.itertuples(index=False, name=None),
+    )
+    for grain in ROLLUP_GRAINS:
+        conn.execute(_FOLD_SQL[grain], (-1, int(rows["id"].max())))
+    conn.execute(f"DELETE FROM {_FOLD_SOURCE}")
+    return len(rows)
+
+
+def rebuild_rollups(conn, archive_path=None) -> int:
+    """Recompute every rollup from archived days and the raw runway_data table"""
+    from archive import iter_archive_days  # archive imports this module
+
+    drop_rollup_tables(conn)
+    ensure_rollup_tables(conn)
+    conn.commit()
+
+    folded = 0
+    for day in iter_archive_days(["id", "timestamp", "zone", "anomaly"] + ROLLUP_METRICS,
+                                 archive_path=archive_path):
+        with conn:
+            folded += fold_frame(conn, day)
+    return folded + update_rollups(conn)
+
+
+def rollups_behind(conn) -> bool:
+    """Read-only check whether rows exist that the rollups have not folded in"""
+    try:
+        return _watermark(conn) != _max_row_id(conn)
+    except sqlite3.OperationalError:
+        # Rollup tables not created yet
+        return True
+
+
+def refresh_rollups(db_path=None) -> bool:
+    """
+    Catch up on rows written without rollup maintenance (e.g. external tools).
+
+    The ingest writer, startup and the archiver keep rollups current, so the
+    watermark is normally checked on this thread's reader and the writer is
+    only taken when rows are actually missing.
+    """
+    if not database.sqlite_available(db_path):
+        return False
+    try:
+        with database.get_db_connection(db_path) as conn:
+            if not rollups_behind(conn):
+                return True
+        with database.get_db_connection(db_path, write=True) as conn:
+            update_rollups(conn)
+        return True
+    except sqlite3.Error as e:
+        logger.warning(f"Rollup refresh failed: {e}")
+        return False
+
+
+# Readers
+
+_ZONE_AGGREGATE_QUERY = "SELECT " + ", ".join(
+    ["zone", "SUM(reading_count) AS flight_count", "SUM(anomaly_count) AS anomaly_count",
+     "MAX(stress_max) AS stress_max"]
+    + [f"SUM({m}_sum) AS {m}_sum, SUM({m}_n) AS {m}_n" for m in ROLLUP_METRICS]
+) + f" FROM {rollup_table('day')} GROUP BY zone ORDER BY zone"
+
+
+def query_zone_aggregates(db_path=None) -> pd.DataFrame:
+    """
+    Per-zone aggregates read from the day rollup.
+
+    Same columns as database.query_zone_aggregates(), at a cost proportional
+    to zone-days instead of raw rows.
+    """
+    if not refresh_rollups(db_path):
+        return database.query_zone_aggregates()
+    rows = database.execute_query(_ZONE_AGGREGATE_QUERY, fetch_all=True, db_path=db_path)
+    if not rows:
+        return pd.DataFrame()
+    return pd.DataFrame([dict(row) for row in rows])
+
+
+def window_zone_rows(conn, since: str) -> list:
+    """Per-zone stats over minute buckets at or after `since` (ISO, minute-aligned)"""
+    stats = ", ".join(
+        f"SUM({m}_sum) AS {m}_sum, SUM({m}_n) AS {m}_n, MAX({m}_max) AS {m}_max"
+        for m in ROLLUP_METRICS
+    )
+    return conn.execute(
+        f"SELECT zone, SUM(reading_count) AS reading_count, SUM(anomaly_count) AS anomaly_count, "
+        f"{stats} FROM {rollup_table('minute')} WHERE bucket >= ? GROUP BY zone ORDER BY zone",
+        (since,),
+    ).fetchall()
+
+
+def pick_grain(span_seconds: float, max_points: int):
+    """Coarsest grain that still fits at least one bucket per output point, or None"""
+    chosen = None
+    for grain, (_, width) in ROLLUP_GRAINS.items():
+        if width * max_points <= span_seconds:
+            chosen = grain
+    return chosen
+
+
+def get_time_series(metric: str, zone: int = None, start=None, end=None,
+                    max_points: int = None, db_path=None):
+    """
+    Bucketed time series read from rollups, or None if the window is too
+    short for the minute grain (callers then fall back to raw rows).
+
+    Args:
+        metric (str): One of ROLLUP_METRICS
+        zone (int): Filter by zone (optional)
+        start, end (datetime): Time range (optional)
+        max_points (int): Points per series
+
+    Returns:
+        dict | None: Same shape as database.get_time_series(method="bucket")
+    """
+    if metric not in ROLLUP_METRICS or not refresh_rollups(db_path):
+        return None
+    max_points = min(max_points or database.TIMESERIES_DEFAULT_POINTS, database.TIMESERIES_POINTS_LIMIT)
+
+    with database.get_db_connection(db_path) as conn:
+        bounds = conn.execute(f"SELECT MIN(bucket), MAX(bucket) FROM {rollup_table('minute')}").fetchone()
+        if bounds[0] is None:
+            return None
+        lo = database.naive_utc(start) if start is not None else pd.Timestamp(bounds[0])
+        hi = database.naive_utc(end) if end is not None else pd.Timestamp(bounds[1]) + pd.Timedelta(minutes=1)
+        grain = pick_grain((hi - lo).total_seconds(), max_points)
+        if grain is None:
+            return None
+
+        fmt, width = ROLLUP_GRAINS[grain]
+        where, params = ["bucket >= ?", "bucket <= ?"], [
+            (lo.floor(f"{width}s")).strftime(fmt), hi.strftime(fmt)
+        ]
+        if zone is not None:
+            where.append("zone = ?")
+            params.append(int(zone))
+        rows = conn.execute(
+            f"SELECT bucket, zone, {metric}_sum, {metric}_n, {metric}_min, {metric}_max "
+            f"FROM {rollup_table(grain)} WHERE {' AND '.join(where)} AND {metric}_n > 0",
+            params,
+        ).fetchall()
+
+    if not rows:
+        return {"labels": [], "datasets": [], "method": "bucket", "bucket_seconds": None}
+
+    columns = list(zip(*rows))
+    t = pd.to_datetime(pd.Series(columns[0])).to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    data = bucket_time_series(
+        metric, t, np.array(columns[1]),
+        np.array(columns[2], dtype=float), np.array(columns[3], dtype=float),
+        np.array(columns[4], dtype=float), np.array(columns[5], dtype=float),
+        max_points, single=zone is not None,
+    )
+    data["rollup_grain"] = grain
+    return data
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintain SmartZone-R rollup tables")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute every rollup from raw rows")
+    parser.add_argument("--db", default=None, help="Database path (default: DB_PATH)")
+    args = parser.parse_args(argv)
+
+    started = datetime.now()
+    with database.get_db_connection(args.db, write=True) as conn:
+        applied = rebuild_rollups(conn) if args.rebuild else update_rollups(conn)
+    elapsed = (datetime.now() - started).total_seconds()
+    logger.info(f"Folded {applied:,} rows into rollups in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    main()
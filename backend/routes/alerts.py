@@ -2,12 +2,20 @@
 Alert endpoints for SmartZone-R API.
 """
 
-from typing import List
-from fastapi import APIRouter
+from typing import List, Optional
+from datetime import datetime
+from fastapi import APIRouter, Query, HTTPException, Request
 from models import AlertRecord, AlertSummary
-from database import load_data, get_active_alerts
+from database import get_active_alerts, get_alert_counts, get_alert_counts_by_zone, sqlite_available
+from dataset_cache import get_dataset
+from response_cache import cached_response
+from fast_json import FastJSONResponse
+from executor import run_blocking
+from csv_export import iter_alert_csv, csv_response, export_filename
 
 router = APIRouter(prefix="/api/alerts", tags=["alerts"])
+# Exports are mounted separately so they can require the maintenance role
+download_router = APIRouter(prefix="/api/alerts", tags=["alerts"])
 
 # Default thresholds
 DEFAULT_THRESHOLDS = {
@@ -19,55 +27,58 @@ DEFAULT_THRESHOLDS = {
 }
 
 
-@router.get("", response_model=List[AlertRecord])
-async def get_alerts(severity: str = None):
-    """Get alerts, optionally filtered by severity."""
-    df = load_data()
-    alerts = get_active_alerts(df, DEFAULT_THRESHOLDS)
-    
-    if severity:
-        alerts = [a for a in alerts if a["severity"] == severity]
-    
-    return alerts
+# Bulk lists are built as typed dicts already; FastJSONResponse skips revalidation
+@router.get("", response_model=List[AlertRecord], response_class=FastJSONResponse)
+async def get_alerts(
+    severity: str = None,
+    limit: Optional[int] = Query(None, ge=1),
+    offset: int = Query(0, ge=0)
+):
+    """Get alerts, optionally filtered by severity and paginated."""
+    def compute():
+        return get_active_alerts(get_dataset(), DEFAULT_THRESHOLDS, severity=severity, limit=limit, offset=offset)
+    return FastJSONResponse(await run_blocking(compute))
 
 
-@router.get("/critical", response_model=List[AlertRecord])
-async def get_critical_alerts():
+@router.get("/critical", response_model=List[AlertRecord], response_class=FastJSONResponse)
+async def get_critical_alerts(
+    limit: Optional[int] = Query(None, ge=1),
+    offset: int = Query(0, ge=0)
+):
     """Get only critical severity alerts."""
-    df = load_data()
-    alerts = get_active_alerts(df, DEFAULT_THRESHOLDS)
-    return [a for a in alerts if a["severity"] == "critical"]
+    def compute():
+        return get_active_alerts(get_dataset(), DEFAULT_THRESHOLDS, severity="critical", limit=limit, offset=offset)
+    return FastJSONResponse(await run_blocking(compute))
 
 
 @router.get("/summary", response_model=AlertSummary)
-async def get_alerts_summary():
+async def get_alerts_summary(request: Request):
     """Get count of alerts by severity."""
-    df = load_data()
-    alerts = get_active_alerts(df, DEFAULT_THRESHOLDS)
-    
-    critical_count = len([a for a in alerts if a["severity"] == "critical"])
-    high_count = len([a for a in alerts if a["severity"] == "high"])
-    medium_count = len([a for a in alerts if a["severity"] == "medium"])
-    normal_count = len([a for a in alerts if a["severity"] == "normal"])
-    
-    return AlertSummary(
-        critical=critical_count,
-        high=high_count,
-        medium=medium_count,
-        normal=normal_count,
-        total=len(alerts)
-    )
+    def compute():
+        return AlertSummary(**get_alert_counts(get_dataset(), DEFAULT_THRESHOLDS))
+    return await cached_response(request, compute, AlertSummary, config=DEFAULT_THRESHOLDS)
 
 
 @router.get("/zones", response_model=dict)
-async def get_alerts_by_zone():
+async def get_alerts_by_zone(request: Request):
     """Get alert count per zone."""
-    df = load_data()
-    alerts = get_active_alerts(df, DEFAULT_THRESHOLDS)
-    
-    zone_counts = {}
-    for zone in sorted(df["zone"].unique()):
-        zone_alerts = [a for a in alerts if a["zone"] == zone]
-        zone_counts[int(zone)] = len(zone_alerts)
+    def compute():
+        return get_alert_counts_by_zone(get_dataset(), DEFAULT_THRESHOLDS)
+    return await cached_response(request, compute, dict, config=DEFAULT_THRESHOLDS)
+
+
+@download_router.get("/download")
+async def download_alerts(
+    zone: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    severity: Optional[str] = Query(None, pattern="^(critical|high|medium|normal)$"),
+    gzip: bool = False
+):
+    """Download alerting readings as CSV, streamed from SQLite in chunks."""
+    if not sqlite_available():
+        raise HTTPException(status_code=503, detail="Export requires the SQLite database")
     
-    return zone_counts
+    prefix = f"alerts_zone_{zone}" if zone is not None else "alerts"
+    chunks = iter_alert_csv(zone, start, end, severity=severity, thresholds=DEFAULT_THRESHOLDS)
+    return csv_response(chunks, export_filename(prefix, start, end, gzip), gzip)
@@ -3,24 +3,28 @@ Analytics endpoints for SmartZone-R API.
 """
 
 from typing import List, Optional
-from fastapi import APIRouter
+from datetime import datetime
+from fastapi import APIRouter, Query, Request
 from models import (
     AnalyticsSummary, ZoneSummary, TimeSeriesData, HeatmapData
 )
 from database import (
-    load_data, get_zone_summary, get_time_series, get_heatmap_data,
-    get_active_alerts
+    get_time_series, summarize_zone_aggregates, summarize_overall,
+    heatmap_from_aggregates, TIMESERIES_DEFAULT_POINTS, TIMESERIES_POINTS_LIMIT
 )
+from dataset_cache import get_dataset, get_zone_aggregates
+from response_cache import cached_response
+from executor import run_blocking
+import rollups
 
 router = APIRouter(prefix="/api/analytics", tags=["analytics"])
 
 
-@router.get("/summary", response_model=AnalyticsSummary)
-async def get_analytics_summary():
-    """Get high-level analytics overview."""
-    df = load_data()
+def _analytics_summary() -> AnalyticsSummary:
+    """Build the analytics overview from the per-zone aggregates."""
+    agg = get_zone_aggregates()
     
-    if df.empty:
+    if agg.empty:
         return AnalyticsSummary(
             total_flights=0,
             anomaly_rate=0.0,
@@ -34,17 +38,13 @@ async def get_analytics_summary():
             maintenance_inspect_zones=[]
         )
     
-    total_flights = len(df)
-    anomaly_rate = (df["anomaly"].sum() / total_flights * 100) if total_flights > 0 else 0
+    overall = summarize_overall(agg)
+    total_flights = overall["total_flights"]
+    anomaly_rate = (overall["anomaly_count"] / total_flights * 100) if total_flights > 0 else 0
     
-    zone_summaries = get_zone_summary(df)
+    zone_summaries = summarize_zone_aggregates(agg)
     worst_zone = max(zone_summaries, key=lambda x: x["avg_stress"])
     
-    avg_stress = df["stress"].mean()
-    avg_rubber = df["rubber_mm"].mean()
-    avg_temp = df["temperature_C"].mean()
-    avg_humidity = df["humidity_pct"].mean()
-    
     # Maintenance recommendations
     urgent_zones = [z["zone"] for z in zone_summaries if z["status"] == "critical"]
     inspect_zones = [z["zone"] for z in zone_summaries if z["status"] == "high"]
@@ -54,34 +54,54 @@ async def get_analytics_summary():
         anomaly_rate=round(anomaly_rate, 2),
         worst_zone=worst_zone["zone"],
         worst_zone_status=worst_zone["status"],
-        avg_stress=round(avg_stress, 2),
-        avg_rubber=round(avg_rubber, 2),
-        avg_temperature=round(avg_temp, 1),
-        avg_humidity=round(avg_humidity, 1),
+        avg_stress=round(overall["avg_stress"], 2),
+        avg_rubber=round(overall["avg_rubber_mm"], 2),
+        avg_temperature=round(overall["avg_temperature_C"], 1),
+        avg_humidity=round(overall["avg_humidity_pct"], 1),
         maintenance_urgent_zones=urgent_zones,
         maintenance_inspect_zones=inspect_zones
     )
 
 
+@router.get("/summary", response_model=AnalyticsSummary)
+async def get_analytics_summary(request: Request):
+    """Get high-level analytics overview."""
+    return await cached_response(request, _analytics_summary, AnalyticsSummary)
+
+
 @router.get("/zones", response_model=List[ZoneSummary])
-async def get_zones():
+async def get_zones(request: Request):
     """Get summary for all zones."""
-    df = load_data()
-    summaries = get_zone_summary(df)
-    return [ZoneSummary(**s) for s in summaries]
+    def compute():
+        return [ZoneSummary(**s) for s in summarize_zone_aggregates(get_zone_aggregates())]
+    return await cached_response(request, compute, List[ZoneSummary])
 
 
 @router.get("/timeseries", response_model=TimeSeriesData)
-async def get_timeseries(metric: str, zone: Optional[int] = None):
-    """Get time series data for a metric."""
-    df = load_data()
-    data = get_time_series(df, metric, zone)
-    return TimeSeriesData(**data)
+async def get_timeseries(
+    metric: str,
+    zone: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    max_points: int = Query(TIMESERIES_DEFAULT_POINTS, ge=3, le=TIMESERIES_POINTS_LIMIT),
+    method: str = Query("bucket", pattern="^(bucket|lttb)$")
+):
+    """Get time series data for a metric, downsampled to max_points per series."""
+    def compute():
+        # Long windows read pre-aggregated rollup buckets instead of raw rows
+        if method == "bucket":
+            data = rollups.get_time_series(metric, zone, start=start, end=end, max_points=max_points)
+            if data is not None:
+                return data
+        df = get_dataset()
+        return get_time_series(df, metric, zone, start=start, end=end, max_points=max_points, method=method)
+    
+    return TimeSeriesData(**await run_blocking(compute))
 
 
 @router.get("/heatmap", response_model=HeatmapData)
-async def get_heatmap():
+async def get_heatmap(request: Request):
     """Get zone × metric heatmap."""
-    df = load_data()
-    data = get_heatmap_data(df)
-    return HeatmapData(**data)
+    def compute():
+        return HeatmapData(**heatmap_from_aggregates(get_zone_aggregates()))
+    return await cached_response(request, compute, HeatmapData)
@@ -0,0 +1,55 @@
+"""
+Diagnostics endpoints for SmartZone-R API (admin only).
+"""
+
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.responses import PlainTextResponse
+from profiling import slow_query_log, list_profiles, get_profile, get_diagnostics_stats
+
+router = APIRouter(prefix="/api/diagnostics", tags=["diagnostics"])
+
+
+@router.get("", response_model=dict)
+async def get_diagnostics():
+    """Get slow-query log and profile history sizes."""
+    return get_diagnostics_stats()
+
+
+@router.get("/slow-queries", response_model=list)
+async def get_slow_queries(limit: int = Query(100, ge=1, le=1000)):
+    """Get recorded slow queries, newest first."""
+    return slow_query_log.get_entries()[:limit]
+
+
+@router.delete("/slow-queries", response_model=dict)
+async def clear_slow_queries():
+    """Empty the slow-query log."""
+    slow_query_log.clear()
+    return {"status": "cleared"}
+
+
+@router.get("/profiles", response_model=list)
+async def get_profiles():
+    """Get stored request profiles, newest first."""
+    return list_profiles()
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile_report(
+    profile_id: str,
+    sort: str = Query("cumulative", pattern="^(cumulative|tottime|calls|ncalls)$"),
+    limit: int = Query(None, ge=1, le=1000),
+    format: str = Query("text", pattern="^(text|pstats)$")
+):
+    """Get a request profile as a text report, or as pstats data for snakeviz."""
+    session = get_profile(profile_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+
+    if format == "pstats":
+        return Response(
+            session.dump(),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="profile_{profile_id}.pstats"'},
+        )
+    return PlainTextResponse(session.report(sort, limit))
@@ -5,35 +5,42 @@ Flight data endpoints for SmartZone-R API.
 from typing import List, Optional
 from fastapi import APIRouter
 from models import FlightRecord
-from database import load_data, get_recent_flights, get_flights_by_zone
+from database import (
+    get_recent_flights, get_flights_by_zone, query_recent_flights, sqlite_available
+)
+from dataset_cache import get_dataset
+from fast_json import FastJSONResponse
+from executor import run_blocking
 
 router = APIRouter(prefix="/api/flights", tags=["flights"])
 
 
-@router.get("", response_model=List[FlightRecord])
-async def get_flights(zone: Optional[int] = None):
-    """Get recent flights, optionally filtered by zone."""
-    df = load_data()
+def _recent_flights(n: int, zone: Optional[int] = None) -> list:
+    """Read recent flights from SQLite, or the cached dataset when only CSV is available."""
+    if sqlite_available():
+        return query_recent_flights(n=n, zone=zone)
     
+    df = get_dataset()
     if zone is not None:
-        flights = get_flights_by_zone(df, zone, n=50)
-    else:
-        flights = get_recent_flights(df, n=50)
-    
-    return flights
+        return get_flights_by_zone(df, zone, n=n)
+    return get_recent_flights(df, n=n)
+
+
+# Bulk lists are built as typed dicts already; FastJSONResponse skips revalidation
+@router.get("", response_model=List[FlightRecord], response_class=FastJSONResponse)
+async def get_flights(zone: Optional[int] = None):
+    """Get recent flights, optionally filtered by zone."""
+    return FastJSONResponse(await run_blocking(_recent_flights, 50, zone))
 
 
-@router.get("/zone/{zone}", response_model=List[FlightRecord])
+@router.get("/zone/{zone}", response_model=List[FlightRecord], response_class=FastJSONResponse)
 async def get_flights_for_zone(zone: int):
     """Get recent flights for a specific zone."""
-    df = load_data()
-    flights = get_flights_by_zone(df, zone, n=20)
-    return flights
+    return FastJSONResponse(await run_blocking(_recent_flights, 20, zone))
 
 
 @router.get("/latest", response_model=Optional[FlightRecord])
 async def get_latest_flight():
     """Get the most recent flight record."""
-    df = load_data()
-    flights = get_recent_flights(df, n=1)
+    flights = await run_blocking(_recent_flights, 1)
     return flights[0] if flights else None
@@ -0,0 +1,29 @@
+"""
+Runway zone endpoints for SmartZone-R API.
+"""
+
+from typing import Optional
+from datetime import datetime
+from fastapi import APIRouter, HTTPException
+from database import sqlite_available
+from csv_export import iter_flight_csv, zone_has_rows, csv_response, export_filename
+from executor import run_blocking
+
+router = APIRouter(prefix="/api/runway", tags=["runway"])
+
+
+@router.get("/zones/{zone}/export")
+async def export_zone(
+    zone: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    gzip: bool = False
+):
+    """Download a zone's readings as CSV, streamed from SQLite in chunks."""
+    if not sqlite_available():
+        raise HTTPException(status_code=503, detail="Export requires the SQLite database")
+    if not await run_blocking(zone_has_rows, zone):
+        raise HTTPException(status_code=404, detail=f"Zone {zone} not found")
+    
+    filename = export_filename(f"zone_{zone}", start, end, gzip)
+    return csv_response(iter_flight_csv(zone, start, end), filename, gzip)
@@ -6,18 +6,39 @@ import os
 from datetime import datetime
 from fastapi import APIRouter
 from models import SystemStatus
-from database import load_data, get_recent_flights, get_active_alerts
+from database import get_recent_flights, get_alert_counts
+from dataset_cache import dataset_cache, get_dataset_cache_stats
+from response_cache import get_response_cache_stats
+from archive import get_archive_stats
+from auth import get_token_cache_stats
+from executor import run_blocking, get_executor_stats
+from db_pool import get_pool_stats
+from static_assets import get_static_stats
 
 router = APIRouter(prefix="/api/status", tags=["status"])
 
 START_TIME = datetime.now()
 
 
+def _dataset_status(df) -> dict:
+    """Last update, zone/flight totals and active alert count for the dataset."""
+    last_update = ""
+    if not df.empty and "timestamp" in df.columns:
+        last_update = df["timestamp"].max().isoformat()
+    
+    # Count active alerts
+    alert_counts = get_alert_counts(df)
+    return {
+        "last_update": last_update,
+        "total_zones": int(df["zone"].max()) if not df.empty else 0,
+        "total_flights": len(df),
+        "active_alerts": alert_counts["critical"] + alert_counts["high"],
+    }
+
+
 @router.get("", response_model=SystemStatus)
 async def get_status():
     """Get system health and statistics."""
-    df = load_data()
-    
     db_path = os.getenv("DB_PATH", "../software/data/smartzone_r.db")
     csv_path = os.getenv("CSV_PATH", "../software/data/runway_data.csv")
     
@@ -29,16 +50,8 @@ async def get_status():
     db_connected = os.path.exists(db_path)
     csv_connected = os.path.exists(csv_path)
     
-    last_update = ""
-    if not df.empty and "timestamp" in df.columns:
-        last_update = df["timestamp"].max().isoformat()
-    
-    total_zones = int(df["zone"].max()) if not df.empty else 0
-    total_flights = len(df)
-    
-    # Count active alerts
-    alerts = get_active_alerts(df)
-    active_alerts = len([a for a in alerts if a["severity"] in ["critical", "high"]])
+    # Dataset-wide figures only change when new rows are loaded
+    stats = await run_blocking(dataset_cache.derive, "status", _dataset_status)
     
     uptime = (datetime.now() - START_TIME).total_seconds()
     airport_code = os.getenv("AIRPORT_CODE", "MAA")
@@ -46,10 +59,52 @@ async def get_status():
     return SystemStatus(
         db_connected=db_connected,
         csv_connected=csv_connected,
-        last_update=last_update,
-        total_zones=total_zones,
-        total_flights=total_flights,
-        active_alerts=active_alerts,
+        last_update=stats["last_update"],
+        total_zones=stats["total_zones"],
+        total_flights=stats["total_flights"],
+        active_alerts=stats["active_alerts"],
         uptime_seconds=uptime,
         airport_code=airport_code
     )
+
+
+@router.get("/cache", response_model=dict)
+async def get_cache_stats():
+    """Get dataset cache hit/refresh statistics."""
+    return get_dataset_cache_stats()
+
+
+@router.get("/responses", response_model=dict)
+async def get_response_cache_status():
+    """Get response cache hit/miss and memory statistics."""
+    return get_response_cache_stats()
+
+
+@router.get("/auth", response_model=dict)
+async def get_auth_cache_stats():
+    """Get verified-token cache hit/miss statistics."""
+    return get_token_cache_stats()
+
+
+@router.get("/archive", response_model=dict)
+async def get_archive_status():
+    """Get Parquet archive size and day range."""
+    return await run_blocking(get_archive_stats)
+
+
+@router.get("/db", response_model=dict)
+async def get_db_pool_status():
+    """Get SQLite pragmas and connection pool statistics."""
+    return get_pool_stats()
+
+
+@router.get("/static", response_model=dict)
+async def get_static_status():
+    """Get in-memory frontend asset sizes and response counts."""
+    return get_static_stats()
+
+
+@router.get("/loop", response_model=dict)
+async def get_loop_status():
+    """Get DB executor queue and event-loop lag statistics."""
+    return get_executor_stats()
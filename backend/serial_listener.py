@@ -8,14 +8,21 @@ import serial
 import json
 import sqlite3
 import os
+import glob
 import time
+import queue
 import threading
 import logging
+from collections import deque
 from datetime import datetime
 from dotenv import load_dotenv
 import random
 import string
 
+import metrics
+from database import get_db_connection
+from rollups import ensure_rollup_tables, apply_pending_rollups
+
 # Setup logging
 logger = logging.getLogger(__name__)
 
@@ -23,40 +30,287 @@ load_dotenv()
 
 # Configuration
 SERIAL_PORT = os.getenv("SERIAL_PORT", "/dev/ttyUSB0")
+# Comma-separated ports and/or globs (e.g. "/dev/ttyUSB*,/dev/ttyACM0"); defaults to SERIAL_PORT
+SERIAL_PORTS = os.getenv("SERIAL_PORTS", SERIAL_PORT)
 SERIAL_BAUDRATE = int(os.getenv("SERIAL_BAUDRATE", "115200"))
 DB_PATH = os.getenv("DB_PATH", "smartzone_r.db")
 RECONNECT_INTERVAL = 10  # seconds
+RATE_WINDOW_SECONDS = 60  # window for per-device throughput
+
+# Ingest pipeline: bounded queue drained by one batching writer
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "10000"))
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "200"))
+INGEST_FLUSH_INTERVAL = float(os.getenv("INGEST_FLUSH_INTERVAL", "0.5"))  # seconds
+INGEST_ENQUEUE_TIMEOUT = float(os.getenv("INGEST_ENQUEUE_TIMEOUT", "0.5"))  # seconds before dropping
+INGEST_OPEN_RETRY_MAX = float(os.getenv("INGEST_OPEN_RETRY_MAX", "30"))  # max backoff opening the DB
 
 # Ensure absolute DB path
 if not os.path.isabs(DB_PATH):
     DB_PATH = os.path.join(os.path.dirname(__file__), DB_PATH)
 
 
+INSERT_COLUMNS = [
+    "timestamp", "flight_id", "aircraft", "zone",
+    "rubber_mm", "cracks_mm", "water_mm", "stress",
+    "fod_weight_g", "temperature_C", "humidity_pct",
+    "rain_mm", "anomaly",
+]
+
+INSERT_SQL = (
+    f"INSERT INTO runway_data ({', '.join(INSERT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in INSERT_COLUMNS)})"
+)
+
+
+ingest_flush_seconds = metrics.histogram(
+    "smartzone_ingest_flush_seconds", "Time to insert one ingest batch and its rollups"
+)
+
+
+class IngestWriter:
+    """Drains parsed readings from a bounded queue into SQLite in batches"""
+
+    def __init__(self, db_path: str = None, queue_size: int = INGEST_QUEUE_SIZE,
+                 batch_size: int = INGEST_BATCH_SIZE, flush_interval: float = INGEST_FLUSH_INTERVAL,
+                 enqueue_timeout: float = INGEST_ENQUEUE_TIMEOUT):
+        self.db_path = db_path
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.running = False
+        self.thread = None
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.flush_listeners = []
+        self.opened = False
+        self.last_error = None
+
+        # Counters
+        self.enqueued = 0
+        self.blocked = 0
+        self.dropped = 0
+        self.total_inserted = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.max_queue_depth = 0
+        self.last_batch_size = 0
+        self.last_flush_ms = 0.0
+        self.open_failures = 0
+
+    def submit(self, record: dict) -> bool:
+        """Queue a mapped record; blocks up to enqueue_timeout when full, then drops"""
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self.lock:
+                self.blocked += 1
+            try:
+                self.queue.put(record, timeout=self.enqueue_timeout)
+            except queue.Full:
+                with self.lock:
+                    self.dropped += 1
+                logger.warning("Ingest queue full, dropping reading")
+                return False
+
+        with self.lock:
+            self.enqueued += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+        return True
+
+    def _open(self):
+        """Make sure the rollup tables exist (opens the pooled writer in WAL mode)"""
+        with get_db_connection(self.db_path or DB_PATH, write=True) as conn:
+            ensure_rollup_tables(conn)
+            conn.commit()
+
+    def flush(self, batch: list) -> bool:
+        """Insert a batch of records in a single transaction"""
+        if not batch:
+            return True
+
+        start = time.perf_counter()
+        rows = [tuple(record[col] for col in INSERT_COLUMNS) for record in batch]
+        try:
+            with get_db_connection(self.db_path or DB_PATH, write=True) as conn:
+                with conn:
+                    conn.executemany(INSERT_SQL, rows)
+                    # Rollups commit atomically with the rows they summarize
+                    apply_pending_rollups(conn)
+        except sqlite3.Error as e:
+            logger.error(f"Database error, dropping batch of {len(batch)}: {e}")
+            with self.lock:
+                self.failed_batches += 1
+                self.dropped += len(batch)
+            return False
+
+        elapsed = time.perf_counter() - start
+        ingest_flush_seconds.observe(elapsed)
+        with self.lock:
+            self.total_inserted += len(batch)
+            self.batches += 1
+            self.last_batch_size = len(batch)
+            self.last_flush_ms = elapsed * 1000
+
+        logger.debug(f"Inserted batch of {len(batch)} [Total: {self.total_inserted}]")
+
+        for callback in list(self.flush_listeners):
+            try:
+                callback(len(batch))
+            except Exception as e:
+                logger.warning(f"Flush listener error: {e}")
+        return True
+
+    def add_flush_listener(self, callback):
+        """Register callback(batch_size) invoked from the writer thread after each commit"""
+        self.flush_listeners.append(callback)
+
+    def _open_with_retry(self) -> bool:
+        """Open the database, retrying with backoff until it works or the writer stops"""
+        delay = 1.0
+        while self.running:
+            try:
+                self._open()
+                with self.lock:
+                    self.opened = True
+                    self.last_error = None
+                return True
+            except Exception as e:
+                with self.lock:
+                    self.open_failures += 1
+                    self.last_error = f"open failed: {e}"
+                logger.error(f"Ingest writer could not open database, retrying in {delay:.0f}s: {e}")
+                self.stop_event.wait(delay)
+                delay = min(delay * 2, INGEST_OPEN_RETRY_MAX)
+        return False
+
+    def run(self):
+        """Writer loop: flush on batch size or flush interval (runs in background thread)"""
+        if not self._open_with_retry():
+            logger.warning(f"Ingest writer stopped before the database opened ({self.queue.qsize()} queued)")
+            return
+        batch = []
+        deadline = None
+
+        while self.running or not self.queue.empty():
+            timeout = self.flush_interval if not batch else max(0.0, deadline - time.monotonic())
+            try:
+                batch.append(self.queue.get(timeout=timeout))
+                if len(batch) == 1:
+                    deadline = time.monotonic() + self.flush_interval
+                # Drain whatever is already waiting, up to the batch size
+                while len(batch) < self.batch_size:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            if batch and (len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self.flush(batch)
+                batch = []
+
+        self.flush(batch)
+
+    def start(self):
+        """Start the writer as a background daemon thread"""
+        if self.running:
+            return
+        self.running = True
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout: float = 5):
+        """Stop the writer after flushing queued records"""
+        self.running = False
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout)
+            self.thread = None
+
+    def get_stats(self) -> dict:
+        """Get queue and backpressure counters"""
+        with self.lock:
+            return {
+                "running": self.running,
+                "database_open": self.opened,
+                "open_failures": self.open_failures,
+                "last_error": self.last_error,
+                "queue_depth": self.queue.qsize(),
+                "queue_capacity": self.queue.maxsize,
+                "max_queue_depth": self.max_queue_depth,
+                "enqueued": self.enqueued,
+                "blocked": self.blocked,
+                "dropped": self.dropped,
+                "total_inserted": self.total_inserted,
+                "batches": self.batches,
+                "failed_batches": self.failed_batches,
+                "last_batch_size": self.last_batch_size,
+                "last_flush_ms": round(self.last_flush_ms, 2),
+            }
+
+
+class RateMeter:
+    """Events per second over a sliding window of one-second buckets"""
+
+    def __init__(self, window: int = RATE_WINDOW_SECONDS):
+        self.window = window
+        self.buckets = deque()
+
+    def mark(self, now: float = None):
+        second = int(now if now is not None else time.monotonic())
+        if self.buckets and self.buckets[-1][0] == second:
+            self.buckets[-1][1] += 1
+        else:
+            self.buckets.append([second, 1])
+        self._expire(second)
+
+    def rate(self, now: float = None) -> float:
+        second = int(now if now is not None else time.monotonic())
+        self._expire(second)
+        return sum(count for _, count in self.buckets) / self.window
+
+    def _expire(self, second: int):
+        while self.buckets and self.buckets[0][0] <= second - self.window:
+            self.buckets.popleft()
+
+
 class SerialListener:
-    """Manages serial connection and data ingestion from ESP32"""
+    """Manages one serial connection and data ingestion from an ESP32"""
 
-    def __init__(self):
+    def __init__(self, port: str = SERIAL_PORT, writer: IngestWriter = None,
+                 reconnect_interval: int = RECONNECT_INTERVAL):
+        self.port = port
         self.serial_conn = None
         self.running = False
         self.connected = False
+        self.thread = None
+        self.reconnect_interval = reconnect_interval
         self.last_reading = None
-        self.total_inserted = 0
+        self.last_reading_at = None
+        self.writer = writer or IngestWriter()
         self.lock = threading.Lock()
 
+        # Per-device counters
+        self.lines_read = 0
+        self.readings = 0
+        self.parse_errors = 0
+        self.reconnects = 0
+        self.rate = RateMeter()
+
     def connect(self):
         """Attempt to connect to serial port"""
         try:
             self.serial_conn = serial.Serial(
-                port=SERIAL_PORT,
+                port=self.port,
                 baudrate=SERIAL_BAUDRATE,
                 timeout=1,
                 write_timeout=1,
             )
             self.connected = True
-            logger.info(f"Serial connected: {SERIAL_PORT} @ {SERIAL_BAUDRATE} baud")
+            logger.info(f"Serial connected: {self.port} @ {SERIAL_BAUDRATE} baud")
             return True
         except (serial.SerialException, FileNotFoundError) as e:
-            logger.error(f"Serial error: {e}")
+            logger.error(f"Serial error ({self.port}): {e}")
             self.connected = False
             return False
 
@@ -107,53 +361,36 @@ class SerialListener:
             return 1
         return 0
 
-    def insert_into_db(self, data: dict) -> bool:
-        """Insert validated data into SQLite database"""
-        try:
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                INSERT INTO runway_data (
-                    timestamp, flight_id, aircraft, zone,
-                    rubber_mm, cracks_mm, water_mm, stress,
-                    fod_weight_g, temperature_C, humidity_pct,
-                    rain_mm, anomaly
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                data["timestamp"],
-                data["flight_id"],
-                data["aircraft"],
-                data["zone"],
-                data["rubber_mm"],
-                data["cracks_mm"],
-                data["water_mm"],
-                data["stress"],
-                data["fod_weight_g"],
-                data["temperature_C"],
-                data["humidity_pct"],
-                data["rain_mm"],
-                data["anomaly"],
-            ))
-            
-            conn.commit()
-            conn.close()
-            
+    def enqueue(self, data: dict) -> bool:
+        """Hand a mapped record to the shared batching writer"""
+        if not self.writer.submit(data):
+            return False
+
+        with self.lock:
+            self.readings += 1
+            self.last_reading = datetime.now().isoformat()
+            self.last_reading_at = time.monotonic()
+            self.rate.mark(self.last_reading_at)
+        return True
+
+    def handle_line(self, line: str) -> bool:
+        """Parse, map and queue one line from the device"""
+        with self.lock:
+            self.lines_read += 1
+
+        esp_data = self.parse_json(line)
+        db_data = None
+        if esp_data:
+            try:
+                db_data = self.map_to_schema(esp_data)
+            except (ValueError, TypeError) as e:
+                logger.warning(f"Invalid reading from {self.port}: {e}")
+
+        if db_data is None:
             with self.lock:
-                self.total_inserted += 1
-                self.last_reading = datetime.now().isoformat()
-            
-            logger.info(
-                f"Inserted: Zone {data['zone']}, "
-                f"Stress {data['stress']:.1f}%, "
-                f"Temp {data['temperature_C']:.1f}C "
-                f"[Total: {self.total_inserted}]"
-            )
-            return True
-            
-        except sqlite3.Error as e:
-            logger.error(f"Database error: {e}")
+                self.parse_errors += 1
             return False
+        return self.enqueue(db_data)
 
     def read_loop(self):
         """Main serial reading loop (runs in background thread)"""
@@ -163,11 +400,11 @@ class SerialListener:
             # Attempt connection if not connected
             if not self.connected:
                 if reconnect_timer <= 0:
-                    logger.info(f"Attempting to connect to {SERIAL_PORT}...")
+                    logger.info(f"Attempting to connect to {self.port}...")
                     if self.connect():
                         reconnect_timer = 0
                     else:
-                        reconnect_timer = RECONNECT_INTERVAL
+                        reconnect_timer = self.reconnect_interval
                         time.sleep(1)
                         continue
                 else:
@@ -181,66 +418,199 @@ class SerialListener:
                     line = self.serial_conn.readline().decode("utf-8").strip()
                     
                     if line:
-                        # Parse JSON
-                        esp_data = self.parse_json(line)
-                        if esp_data:
-                            # Map to schema
-                            db_data = self.map_to_schema(esp_data)
-                            # Insert into database
-                            self.insert_into_db(db_data)
+                        self.handle_line(line)
                 else:
                     time.sleep(0.1)
                     
-            except (serial.SerialException, UnicodeDecodeError) as e:
-                logger.error(f"Serial read error: {e}")
+            except (serial.SerialException, OSError, UnicodeDecodeError) as e:
+                logger.error(f"Serial read error ({self.port}): {e}")
+                self._close()
                 self.connected = False
-                reconnect_timer = RECONNECT_INTERVAL
+                with self.lock:
+                    self.reconnects += 1
+                reconnect_timer = self.reconnect_interval
                 time.sleep(1)
 
+    def _close(self):
+        """Close the serial port, ignoring errors from a vanished device"""
+        try:
+            if self.serial_conn and self.serial_conn.is_open:
+                self.serial_conn.close()
+        except (serial.SerialException, OSError):
+            pass
+
     def start(self):
-        """Start serial listener as background daemon thread"""
-        if not os.path.exists(DB_PATH):
-            logger.error(f"Database not found: {DB_PATH}")
-            return False
-        
+        """Start this device's reader as a background daemon thread"""
         self.running = True
-        thread = threading.Thread(target=self.read_loop, daemon=True)
-        thread.start()
-        logger.info("Serial Listener started as background daemon")
+        self.thread = threading.Thread(target=self.read_loop, daemon=True)
+        self.thread.start()
+        logger.info(f"Serial reader started for {self.port}")
         return True
 
-    def stop(self):
-        """Stop the serial listener"""
+    def stop(self, timeout: float = 2):
+        """Stop this device's reader"""
         self.running = False
-        if self.serial_conn and self.serial_conn.is_open:
-            self.serial_conn.close()
-        logger.info("Serial Listener stopped")
+        if self.thread:
+            self.thread.join(timeout)
+            self.thread = None
+        self._close()
+        self.connected = False
 
     def get_status(self) -> dict:
-        """Get current listener status"""
+        """Get per-device status"""
         with self.lock:
+            now = time.monotonic()
             return {
+                "port": self.port,
                 "connected": self.connected,
-                "port": SERIAL_PORT,
                 "last_reading": self.last_reading,
-                "total_inserted": self.total_inserted,
+                "last_reading_age_seconds": (
+                    round(now - self.last_reading_at, 3) if self.last_reading_at is not None else None
+                ),
+                "lines_read": self.lines_read,
+                "readings": self.readings,
+                "parse_errors": self.parse_errors,
+                "parse_error_rate": round(self.parse_errors / self.lines_read, 4) if self.lines_read else 0.0,
+                "readings_per_second": round(self.rate.rate(now), 3),
+                "reconnects": self.reconnects,
             }
 
 
-# Global listener instance
-serial_listener = SerialListener()
+def resolve_ports(spec: str) -> list:
+    """Expand a comma-separated list of ports/globs into concrete port paths"""
+    ports = []
+    for entry in (part.strip() for part in spec.split(",")):
+        if not entry:
+            continue
+        if glob.has_magic(entry):
+            matches = sorted(glob.glob(entry))
+        else:
+            matches = [entry]
+        for port in matches:
+            if port not in ports:
+                ports.append(port)
+    return ports
+
+
+class DeviceManager:
+    """Runs one SerialListener per ESP32 port, all feeding a shared ingest writer"""
+
+    def __init__(self, ports_spec: str = None, writer: IngestWriter = None,
+                 reconnect_interval: int = RECONNECT_INTERVAL):
+        self.ports_spec = ports_spec if ports_spec is not None else SERIAL_PORTS
+        self.writer = writer or IngestWriter()
+        self.reconnect_interval = reconnect_interval
+        self.listeners = {}
+        self.running = False
+        self.scan_thread = None
+        self.lock = threading.Lock()
+
+    def rescan(self) -> list:
+        """Start readers for ports that appeared since the last scan (glob entries)"""
+        added = []
+        with self.lock:
+            for port in resolve_ports(self.ports_spec):
+                if port in self.listeners:
+                    continue
+                listener = SerialListener(port, writer=self.writer, reconnect_interval=self.reconnect_interval)
+                self.listeners[port] = listener
+                if self.running:
+                    listener.start()
+                added.append(port)
+        return added
+
+    def _scan_loop(self):
+        """Periodically pick up newly plugged devices"""
+        while self.running:
+            time.sleep(self.reconnect_interval)
+            if self.running:
+                for port in self.rescan():
+                    logger.info(f"New serial device detected: {port}")
+
+    def start(self):
+        """Start the shared writer and one reader per device"""
+        if not os.path.exists(self.writer.db_path or DB_PATH):
+            logger.error(f"Database not found: {self.writer.db_path or DB_PATH}")
+            return False
+
+        self.writer.start()
+        self.running = True
+        self.rescan()
+        with self.lock:
+            for listener in self.listeners.values():
+                if not listener.running:
+                    listener.start()
+
+        if glob.has_magic(self.ports_spec):
+            self.scan_thread = threading.Thread(target=self._scan_loop, daemon=True)
+            self.scan_thread.start()
+
+        logger.info(f"Serial Listener started for {len(self.listeners)} device(s)")
+        return True
+
+    def stop(self):
+        """Stop every reader, then flush and stop the writer"""
+        self.running = False
+        with self.lock:
+            listeners = list(self.listeners.values())
+        for listener in listeners:
+            listener.stop()
+        self.writer.stop()
+        logger.info("Serial Listener stopped")
+
+    def get_status(self) -> dict:
+        """Get aggregate and per-device status"""
+        with self.lock:
+            devices = [listener.get_status() for listener in self.listeners.values()]
+
+        readings = [d["last_reading"] for d in devices if d["last_reading"]]
+        return {
+            "connected": any(d["connected"] for d in devices),
+            "port": ", ".join(d["port"] for d in devices) or self.ports_spec,
+            "last_reading": max(readings) if readings else None,
+            "total_inserted": self.writer.total_inserted,
+            "ingest": self.writer.get_stats(),
+            "devices": devices,
+        }
+
+
+# Global device manager
+device_manager = DeviceManager()
 
 
 def start_serial_listener():
-    """Initialize and start the serial listener"""
-    serial_listener.start()
+    """Initialize and start the serial readers"""
+    device_manager.start()
 
 
 def stop_serial_listener():
-    """Stop the serial listener"""
-    serial_listener.stop()
+    """Stop the serial readers"""
+    device_manager.stop()
+
+
+def add_ingest_listener(callback):
+    """Register callback(batch_size) to run after each committed ingest batch"""
+    device_manager.writer.add_flush_listener(callback)
 
 
 def get_listener_status() -> dict:
-    """Get seriallistener status"""
-    return serial_listener.get_status()
+    """Get serial listener status"""
+    return device_manager.get_status()
+
+
+def _collect_metrics():
+    status = get_listener_status()
+    yield from metrics.stats_samples(
+        "smartzone_ingest", status["ingest"],
+        counters=("enqueued", "blocked", "dropped", "total_inserted", "batches", "failed_batches"),
+        gauges=("queue_depth", "queue_capacity", "max_queue_depth"),
+    )
+    for device in status["devices"]:
+        yield from metrics.stats_samples(
+            "smartzone_serial", device, counters=("lines_read", "readings", "parse_errors", "reconnects"),
+            gauges=("connected", "readings_per_second", "last_reading_age_seconds"),
+            labels={"port": device["port"]},
+        )
+
+
+metrics.register_collector(_collect_metrics)
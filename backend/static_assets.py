@@ -0,0 +1,224 @@
+"""
+In-memory static frontend assets for SmartZone-R.
+The frontend directory is read once into a manifest with precompressed
+gzip (and brotli, when installed) variants and content-hash ETags. Pages
+reference CSS/JS with a ?v=<hash> query, so those URLs can be cached as
+immutable; unknown routes are answered from the cached index.html.
+"""
+
+import os
+import re
+import gzip
+import hashlib
+import logging
+import mimetypes
+import threading
+from pathlib import Path
+from typing import Optional
+from fastapi import Request, Response
+from dotenv import load_dotenv
+
+import metrics
+
+try:
+    import brotli
+except ImportError:  # optional: serve gzip only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+FRONTEND_PATH = os.getenv("FRONTEND_PATH", "../frontend")
+if not os.path.isabs(FRONTEND_PATH):
+    FRONTEND_PATH = os.path.join(os.path.dirname(__file__), FRONTEND_PATH)
+
+# Max age for versioned (?v=<hash>) asset URLs
+STATIC_IMMUTABLE_MAX_AGE = int(os.getenv("STATIC_IMMUTABLE_MAX_AGE", str(365 * 24 * 3600)))
+STATIC_MIN_COMPRESS_BYTES = int(os.getenv("STATIC_MIN_COMPRESS_BYTES", "256"))
+# Development: rebuild the manifest on every request so edits show up without a restart
+STATIC_RELOAD = os.getenv("STATIC_RELOAD", "false").lower() in ("1", "true", "yes")
+
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+
+# Encodings in order of preference
+ENCODINGS = ("br", "gzip")
+
+
+class StaticAsset:
+    """One file held in memory with its compressed variants"""
+
+    def __init__(self, path: str, body: bytes, media_type: str):
+        self.path = path
+        self.media_type = media_type
+        self.hash = hashlib.blake2b(body, digest_size=8).hexdigest()
+        self.variants = {"identity": body}
+        if media_type.startswith(COMPRESSIBLE_TYPES) and len(body) >= STATIC_MIN_COMPRESS_BYTES:
+            compressed = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                compressed["br"] = brotli.compress(body, quality=11)
+            for encoding, data in compressed.items():
+                if len(data) < len(body):
+                    self.variants[encoding] = data
+
+    def etag(self, encoding: str) -> str:
+        # Each representation gets its own strong ETag
+        return f'"{self.hash}"' if encoding == "identity" else f'"{self.hash}-{encoding}"'
+
+    def is_html(self) -> bool:
+        return self.media_type == "text/html"
+
+
+def _media_type(path: str) -> str:
+    media_type, _ = mimetypes.guess_type(path)
+    if path.endswith(".js"):
+        return "application/javascript"
+    return media_type or "application/octet-stream"
+
+
+def _version_references(html: str, assets: dict) -> str:
+    """Append ?v=<hash> to quoted references of local assets (css/main.css, ./js/api.js)"""
+    def replace(match):
+        quote, prefix, path = match.group(1), match.group(2) or "", match.group(3)
+        asset = assets.get(path)
+        if asset is None:
+            return match.group(0)
+        return f"{quote}{prefix}{path}?v={asset.hash}{quote}"
+
+    return re.sub(r"""(["'])(\./|/)?([\w./-]+\.(?:css|js))\1""", replace, html)
+
+
+class StaticManifest:
+    """Path -> StaticAsset map built from the frontend directory"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.assets = {}
+
+    def build(self) -> "StaticManifest":
+        root = Path(self.root)
+        files = sorted(p for p in root.rglob("*") if p.is_file()) if root.is_dir() else []
+        pages = []
+        for file in files:
+            path = file.relative_to(root).as_posix()
+            if path.endswith(".html"):
+                pages.append((path, file))
+            else:
+                self.assets[path] = StaticAsset(path, file.read_bytes(), _media_type(path))
+
+        # Pages are built last so they can embed the other assets' hashes
+        for path, file in pages:
+            html = _version_references(file.read_text(encoding="utf-8"), self.assets)
+            self.assets[path] = StaticAsset(path, html.encode("utf-8"), "text/html")
+
+        logger.info(f"Loaded {len(self.assets)} frontend assets from {self.root}")
+        return self
+
+    def resolve(self, path: str) -> Optional[StaticAsset]:
+        """Exact file, then <path>.html, then index.html (SPA fallback)"""
+        path = path.strip("/")
+        return (
+            (self.assets.get(path) if path else None)
+            or self.assets.get(f"{path}.html")
+            or self.assets.get("index.html")
+        )
+
+    def get_stats(self) -> dict:
+        sizes = {}
+        for asset in self.assets.values():
+            for encoding, body in asset.variants.items():
+                sizes[encoding] = sizes.get(encoding, 0) + len(body)
+        return {"root": self.root, "assets": len(self.assets), "bytes": sizes}
+
+
+_manifest: Optional[StaticManifest] = None
+_manifest_lock = threading.Lock()
+
+# Stats
+_served = {"identity": 0, "gzip": 0, "br": 0}
+_not_modified = 0
+
+
+def load_static_assets(root: str = None) -> StaticManifest:
+    """Build (or rebuild) the in-memory manifest"""
+    global _manifest
+    manifest = StaticManifest(root or FRONTEND_PATH).build()
+    with _manifest_lock:
+        _manifest = manifest
+    return manifest
+
+
+def get_manifest() -> StaticManifest:
+    """The current manifest, built on first use"""
+    if _manifest is None or STATIC_RELOAD:
+        return load_static_assets()
+    return _manifest
+
+
+def _choose_encoding(request: Request, asset: StaticAsset) -> str:
+    accepted = {
+        token.split(";")[0].strip().lower()
+        for token in request.headers.get("accept-encoding", "").split(",")
+    }
+    for encoding in ENCODINGS:
+        if encoding in accepted and encoding in asset.variants:
+            return encoding
+    return "identity"
+
+
+def _etag_matches(request: Request, asset: StaticAsset) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = (tag.strip() for tag in header.split(","))
+    candidates = {tag[2:] if tag.startswith("W/") else tag for tag in tags}
+    return "*" in candidates or any(asset.etag(encoding) in candidates for encoding in asset.variants)
+
+
+def asset_response(request: Request, asset: StaticAsset) -> Response:
+    """Serve an asset with ETag, cache headers and the best accepted encoding"""
+    global _not_modified
+    encoding = _choose_encoding(request, asset)
+    headers = {"ETag": asset.etag(encoding), "Vary": "Accept-Encoding"}
+    if not asset.is_html() and request.query_params.get("v") == asset.hash:
+        headers["Cache-Control"] = f"public, max-age={STATIC_IMMUTABLE_MAX_AGE}, immutable"
+    else:
+        # Pages and unversioned URLs: cache, but revalidate with the ETag
+        headers["Cache-Control"] = "no-cache"
+
+    if _etag_matches(request, asset):
+        _not_modified += 1
+        return Response(status_code=304, headers=headers)
+
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    _served[encoding] += 1
+    return Response(content=asset.variants[encoding], media_type=asset.media_type, headers=headers)
+
+
+def serve_static(request: Request, path: str) -> Optional[Response]:
+    """Response for a frontend path, or None when no frontend is available"""
+    asset = get_manifest().resolve(path)
+    if asset is None:
+        return None
+    return asset_response(request, asset)
+
+
+def get_static_stats() -> dict:
+    """Get manifest sizes and per-encoding response counts"""
+    stats = get_manifest().get_stats()
+    stats["served"] = dict(_served)
+    stats["not_modified"] = _not_modified
+    stats["brotli_available"] = brotli is not None
+    return stats
+
+
+def _collect_metrics():
+    samples = [("smartzone_static_not_modified_total", "counter", "Static 304 responses", _not_modified)]
+    for encoding, count in _served.items():
+        samples.append(("smartzone_static_responses_total", "counter", "Static responses by encoding",
+                        count, {"encoding": encoding}))
+    return samples
+
+
+metrics.register_collector(_collect_metrics)
@@ -3,26 +3,143 @@ WebSocket real-time updates for SmartZone-R
 Broadcasts zone status, alerts, and KPIs to connected clients
 """
 
+import os
+import time
 import asyncio
 import json
 import logging
-from typing import Set, Optional
-from datetime import datetime
+from typing import Dict, Optional
+from datetime import datetime, timedelta
 from fastapi import WebSocket, WebSocketDisconnect, status
-from database import get_db_connection, execute_query
+import metrics
+from database import get_db_connection, get_max_row_id
+from executor import run_blocking
+from rollups import ROLLUP_GRAINS, refresh_rollups, rollups_behind, update_rollups, window_zone_rows
 
 logger = logging.getLogger(__name__)
 
-MAX_CONNECTIONS = 50
-PUSH_INTERVAL_SECONDS = 2
+MAX_CONNECTIONS = int(os.getenv("WS_MAX_CONNECTIONS", "2000"))
+# A client that cannot take one frame within this time is disconnected
+SEND_TIMEOUT_SECONDS = float(os.getenv("WS_SEND_TIMEOUT_SECONDS", "5"))
+# Frames queued per client; when full the oldest frame is dropped (newer updates supersede it)
+OUTBOX_SIZE = int(os.getenv("WS_OUTBOX_SIZE", "4"))
+# Idle keep-alive when no new data arrives (client drops the socket after 30s of silence)
+HEARTBEAT_INTERVAL_SECONDS = float(os.getenv("WS_HEARTBEAT_INTERVAL_SECONDS", "15"))
+# Bursts of ingest events within this window collapse into one update
+COALESCE_WINDOW_SECONDS = float(os.getenv("WS_COALESCE_WINDOW_SECONDS", "0.1"))
+# Poll max(id) for rows written by other processes; 0 disables
+CHANGE_POLL_INTERVAL_SECONDS = float(os.getenv("WS_CHANGE_POLL_INTERVAL_SECONDS", "5"))
+
+
+ws_build_seconds = metrics.histogram(
+    "smartzone_ws_build_seconds", "Time to build a live update (rollup catch-up and reads)"
+)
+ws_fanout_seconds = metrics.histogram(
+    "smartzone_ws_fanout_seconds", "Time to encode a frame and queue it for every client"
+)
+ws_send_seconds = metrics.histogram(
+    "smartzone_ws_send_seconds", "Time to send one frame to one client"
+)
+
+
+def encode_message(message: dict) -> str:
+    """Encode a message once for every client (same format as send_json)"""
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+
+def diff_live_update(previous: dict, current: dict) -> dict:
+    """
+    Fields of current that differ from previous.
+
+    Dict fields (zones, kpis) are diffed per key: changed entries are kept and
+    keys that disappeared are listed under "removed".
+    """
+    delta = {}
+    removed = {}
+    for key, value in current.items():
+        if key in ("type", "timestamp", "seq"):
+            continue
+        old = previous.get(key)
+        if isinstance(value, dict) and isinstance(old, dict):
+            changed = {k: v for k, v in value.items() if old.get(k) != v}
+            gone = [k for k in old if k not in value]
+            if changed:
+                delta[key] = changed
+            if gone:
+                removed[key] = gone
+        elif value != old:
+            delta[key] = value
+    if removed:
+        delta["removed"] = removed
+    return delta
+
+
+class ClientConnection:
+    """One WebSocket client with a bounded outbox drained by its own sender task"""
+
+    def __init__(self, websocket: WebSocket, outbox_size: int = None):
+        self.websocket = websocket
+        self.outbox: asyncio.Queue = asyncio.Queue(maxsize=outbox_size or OUTBOX_SIZE)
+        self.sender_task: Optional[asyncio.Task] = None
+        self.frames_sent = 0
+        self.frames_dropped = 0
+
+    def offer(self, text: str) -> bool:
+        """Queue a frame without blocking; drop the oldest queued frame if full"""
+        dropped = False
+        if self.outbox.full():
+            try:
+                self.outbox.get_nowait()
+                self.frames_dropped += 1
+                dropped = True
+            except asyncio.QueueEmpty:
+                pass
+        self.outbox.put_nowait(text)
+        return not dropped
+
+    async def run_sender(self, on_failure):
+        """Send queued frames in order; a failed or timed-out send ends the client"""
+        try:
+            while True:
+                text = await self.outbox.get()
+                start = time.perf_counter()
+                await asyncio.wait_for(self.websocket.send_text(text), timeout=SEND_TIMEOUT_SECONDS)
+                ws_send_seconds.observe(time.perf_counter() - start)
+                self.frames_sent += 1
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            logger.warning(f"Client send timed out after {SEND_TIMEOUT_SECONDS}s, disconnecting")
+            await on_failure(self)
+        except Exception as e:
+            logger.warning(f"Error sending to client: {e}")
+            await on_failure(self)
 
 
 class ConnectionManager:
     """Manage WebSocket connections and broadcasting"""
 
     def __init__(self):
-        self.active_connections: Set[WebSocket] = set()
+        self.active_connections: Dict[WebSocket, ClientConnection] = {}
         self.broadcast_task: Optional[asyncio.Task] = None
+        self.change_task: Optional[asyncio.Task] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.data_event: Optional[asyncio.Event] = None
+        self.last_broadcast_id: Optional[int] = None
+        self.last_seen_id: Optional[int] = None
+        # Latest full live update; deltas are sequenced against it
+        self.seq = 0
+        self.snapshot: Optional[dict] = None
+        self.snapshot_text: Optional[str] = None
+
+        # Counters
+        self.updates_sent = 0
+        self.updates_skipped = 0
+        self.heartbeats_sent = 0
+        self.deltas_sent = 0
+        self.snapshots_sent = 0
+        self.frames_dropped = 0
+        self.slow_disconnects = 0
 
     async def connect(self, websocket: WebSocket) -> bool:
         """Accept new WebSocket connection"""
@@ -30,171 +147,295 @@ class ConnectionManager:
             return False
 
         await websocket.accept()
-        self.active_connections.add(websocket)
+        client = ClientConnection(websocket)
+        client.sender_task = asyncio.create_task(client.run_sender(self._drop_client))
+        self.active_connections[websocket] = client
         logger.info(f"Client connected. Total: {len(self.active_connections)}")
+
+        # New clients start from the current snapshot; deltas follow from its seq
+        if self.snapshot is not None:
+            self.send_snapshot(websocket)
+        self.notify_new_data()
         return True
 
+    def send_snapshot(self, websocket: WebSocket) -> bool:
+        """Queue the latest full snapshot for one client (on connect or resync)"""
+        client = self.active_connections.get(websocket)
+        if client is None or self.snapshot_text is None:
+            return False
+        client.offer(self.snapshot_text)
+        self.snapshots_sent += 1
+        return True
+
+    async def publish(self, message: dict):
+        """Broadcast a live update as a delta against the last snapshot"""
+        previous = self.snapshot
+        self.seq += 1
+        self.snapshot = {**message, "seq": self.seq}
+        self.snapshot_text = encode_message(self.snapshot)
+
+        if previous is None:
+            await self.broadcast(self.snapshot)
+            self.snapshots_sent += len(self.active_connections)
+            return
+
+        delta = diff_live_update(previous, self.snapshot)
+        await self.broadcast({
+            "timestamp": message.get("timestamp"),
+            "type": "live_delta",
+            "seq": self.seq,
+            **delta,
+        })
+        self.deltas_sent += 1
+
     async def disconnect(self, websocket: WebSocket):
         """Remove disconnected client"""
-        self.active_connections.discard(websocket)
+        client = self.active_connections.pop(websocket, None)
+        if client is None:
+            return
+        if client.sender_task and client.sender_task is not asyncio.current_task():
+            client.sender_task.cancel()
         logger.info(f"Client disconnected. Total: {len(self.active_connections)}")
 
-    async def broadcast(self, message: dict):
-        """Send message to all connected clients"""
-        disconnected = set()
-
-        for connection in self.active_connections.copy():
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.warning(f"Error sending to client: {e}")
-                disconnected.add(connection)
-                try:
-                    await connection.close(code=status.WS_1011_SERVER_ERROR)
-                except Exception:
-                    pass
+    async def _drop_client(self, client: ClientConnection):
+        """Close and remove a client whose sender failed or timed out"""
+        self.slow_disconnects += 1
+        await self.disconnect(client.websocket)
+        try:
+            await client.websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+        except Exception:
+            pass
 
-        # Clean up disconnected clients
-        for conn in disconnected:
-            await self.disconnect(conn)
+    async def broadcast(self, message: dict):
+        """Encode once and hand the frame to every client's outbox without waiting on sends"""
+        with ws_fanout_seconds.time():
+            text = encode_message(message)
+            for client in list(self.active_connections.values()):
+                if not client.offer(text):
+                    self.frames_dropped += 1
+
+    def notify_new_data(self):
+        """Signal that new rows were written (safe to call from any thread)"""
+        if self.loop is None or self.data_event is None:
+            return
+        try:
+            self.loop.call_soon_threadsafe(self.data_event.set)
+        except RuntimeError:
+            # Event loop already closed during shutdown
+            pass
 
     async def start_broadcast(self):
-        """Start periodic broadcast of zone status and KPIs"""
+        """Push live updates when new data arrives, with a slow heartbeat when idle"""
+        self.loop = asyncio.get_running_loop()
+        self.data_event = asyncio.Event()
+
         while True:
             try:
-                # Wait for next push interval
-                await asyncio.sleep(PUSH_INTERVAL_SECONDS)
+                try:
+                    await asyncio.wait_for(self.data_event.wait(), timeout=HEARTBEAT_INTERVAL_SECONDS)
+                    triggered = True
+                except asyncio.TimeoutError:
+                    triggered = False
+
+                if triggered:
+                    # Coalesce a burst of ingest events into one update
+                    await asyncio.sleep(COALESCE_WINDOW_SECONDS)
+                    self.data_event.clear()
 
                 # Skip if no connected clients
                 if not self.active_connections:
                     continue
 
-                # Fetch current data from database
-                message = await self._build_live_update()
+                if not triggered:
+                    # Carries seq so clients notice a dropped delta while idle
+                    await self.broadcast({
+                        "timestamp": datetime.utcnow().isoformat(),
+                        "type": "heartbeat",
+                        "seq": self.seq,
+                    })
+                    self.heartbeats_sent += 1
+                    continue
+
+                # Nothing new since the last update: skip the rebuild entirely
+                max_id = await run_blocking(get_max_row_id)
+                if max_id is not None and max_id == self.last_broadcast_id:
+                    self.updates_skipped += 1
+                    continue
 
-                # Broadcast to all clients
+                message = await self._build_live_update()
                 if message:
-                    await self.broadcast(message)
+                    self.last_broadcast_id = max_id
+                    if self.snapshot is not None and not diff_live_update(self.snapshot, message):
+                        self.updates_skipped += 1
+                        continue
+                    await self.publish(message)
+                    self.updates_sent += 1
 
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"Broadcast error: {e}")
-                await asyncio.sleep(PUSH_INTERVAL_SECONDS)
+                await asyncio.sleep(1)
 
-    async def stop_broadcast(self):
-        """Stop periodic broadcasts"""
-        if self.broadcast_task:
-            self.broadcast_task.cancel()
+    async def watch_changes(self):
+        """Detect rows written outside this process by polling max(id)"""
+        while True:
+            await asyncio.sleep(CHANGE_POLL_INTERVAL_SECONDS)
             try:
-                await self.broadcast_task
-            except asyncio.CancelledError:
-                pass
+                max_id = await run_blocking(get_max_row_id)
+                if max_id is not None and max_id != self.last_seen_id:
+                    if self.last_seen_id is not None:
+                        self.notify_new_data()
+                    self.last_seen_id = max_id
+            except Exception as e:
+                logger.error(f"Change detector error: {e}")
+
+    async def stop_broadcast(self):
+        """Stop broadcasting, change detection and per-client senders"""
+        senders = [client.sender_task for client in self.active_connections.values()]
+        for task in (self.broadcast_task, self.change_task, *senders):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+
+    def get_stats(self) -> dict:
+        """Get broadcaster counters"""
+        return {
+            "clients": len(self.active_connections),
+            "updates_sent": self.updates_sent,
+            "updates_skipped": self.updates_skipped,
+            "heartbeats_sent": self.heartbeats_sent,
+            "deltas_sent": self.deltas_sent,
+            "snapshots_sent": self.snapshots_sent,
+            "seq": self.seq,
+            "frames_dropped": self.frames_dropped,
+            "slow_disconnects": self.slow_disconnects,
+            "max_connections": MAX_CONNECTIONS,
+            "last_broadcast_id": self.last_broadcast_id,
+        }
 
     async def _build_live_update(self) -> Optional[dict]:
         """Build live update message with current zone status and KPIs"""
         try:
-            with get_db_connection() as conn:
-                # Get latest readings by zone from runway_data
-                zones_query = """
-                SELECT DISTINCT zone FROM runway_data ORDER BY zone
-                """
-                zone_ids = execute_query(zones_query, fetch_all=True)
-                
-                zones_status = {}
-                for zone_row in zone_ids:
-                    zone_id = zone_row[0] if isinstance(zone_row, tuple) else zone_row.get('zone', 0)
-                    
-                    # Get latest data for this zone
-                    zone_query = """
-                    SELECT zone, 
-                           AVG(stress) as avg_stress,
-                           AVG(rubber_mm) as avg_rubber,
-                           MAX(temperature_C) as max_temp,
-                           COUNT(*) as reading_count,
-                           COUNT(CASE WHEN anomaly = 1 THEN 1 END) as anomaly_count
-                    FROM runway_data
-                    WHERE zone = ? AND timestamp > datetime('now', '-1 hour')
-                    GROUP BY zone
-                    """
-                    zone_data = execute_query(zone_query, (zone_id,), fetch_one=True)
-                    
-                    if zone_data:
-                        zone_dict = dict(zone_data) if not isinstance(zone_data, dict) else zone_data
-                        status_str = "NORMAL"
-
-                        if zone_dict.get("avg_stress", 0) > 80:
-                            status_str = "CRITICAL"
-                        elif zone_dict.get("avg_stress", 0) > 60:
-                            status_str = "WARNING"
-                        elif zone_dict.get("anomaly_count", 0) > 0:
-                            status_str = "ANOMALY"
-
-                        zones_status[zone_id] = {
-                            "name": f"Zone {zone_id}",
-                            "status": status_str,
-                            "avg_stress": round(zone_dict.get("avg_stress", 0), 2),
-                            "avg_rubber": round(zone_dict.get("avg_rubber", 0), 2),
-                        "max_temp": zone_dict.get("max_temp", 0),
-                        "max_humidity": zone_dict.get("max_humidity", 0),
-                        "anomalies": zone_dict.get("anomaly_count", 0),
-                    }
-
-                # Get active alerts count
-                alerts_query = """
-                SELECT resolved,
-                       COUNT(*) as count
-                FROM alerts
-                WHERE timestamp > datetime('now', '-24 hours')
-                GROUP BY resolved
-                """
-                alerts_result = execute_query(alerts_query, fetch_all=True)
-                active_alerts = 0
-                for alert in alerts_result:
-                    if dict(alert).get("resolved") == 0:
-                        active_alerts = dict(alert).get("count", 0)
-
-                # Get overall KPIs
-                kpis_query = """
-                SELECT COUNT(DISTINCT flight_id) as total_flights,
-                       COUNT(CASE WHEN anomaly = 1 THEN 1 END) as anomalies,
-                       AVG(stress) as avg_stress,
-                       AVG(rubber_mm) as avg_rubber,
-                       MAX(stress) as max_stress
-                FROM runway_data
-                WHERE timestamp > datetime('now', '-1 hour')
-                """
-                kpis = dict(execute_query(kpis_query, fetch_one=True))
-
-                # Find worst zone
-                worst_zone = "Zone-01"
-                worst_stress = 0
-                for zone_id, zone_data in zones_status.items():
-                    if zone_data["avg_stress"] > worst_stress:
-                        worst_stress = zone_data["avg_stress"]
-                        worst_zone = zone_data["name"]
-
-                # Build message
-                message = {
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "type": "live_update",
-                    "zones": zones_status,
-                    "active_alerts": active_alerts,
-                    "kpis": {
-                        "flights": kpis.get("total_flights", 0),
-                        "anomalies": kpis.get("anomalies", 0),
-                        "worst_zone": worst_zone,
-                        "avg_stress": round(kpis.get("avg_stress", 0), 2),
-                        "avg_rubber": round(kpis.get("avg_rubber", 0), 2),
-                        "max_stress": round(kpis.get("max_stress", 0), 2),
-                    },
-                }
-
-                return message
-
+            with ws_build_seconds.time():
+                return await run_blocking(build_live_update)
         except Exception as e:
             logger.error(f"Error building live update: {e}")
             return None
 
 
+# KPIs cover the last hour of minute rollups, so a tick reads at most
+# 60 buckets per zone instead of every raw reading in the window
+LIVE_WINDOW = timedelta(hours=1)
+
+
+ACTIVE_ALERTS_QUERY = """
+SELECT COUNT(*) AS count
+FROM alerts
+WHERE resolved = 0 AND timestamp > datetime('now', '-24 hours')
+"""
+
+# The range on the raw column uses idx_runway_data_timestamp; ' ' sorts before 'T', so
+# it admits both stored separators and strftime() makes the cut exact
+LIVE_FLIGHTS_QUERY = f"""
+SELECT COUNT(DISTINCT flight_id) AS count
+FROM runway_data
+WHERE timestamp >= ? AND strftime('{ROLLUP_GRAINS["minute"][0]}', timestamp) >= ?
+"""
+
+
+def _zone_live_status(avg_stress: float, anomaly_count: int) -> str:
+    """Classify a zone from its live-window aggregates"""
+    if avg_stress > 80:
+        return "CRITICAL"
+    elif avg_stress > 60:
+        return "WARNING"
+    elif anomaly_count > 0:
+        return "ANOMALY"
+    return "NORMAL"
+
+
+def _mean(row, metric: str) -> float:
+    count = row[f"{metric}_n"] or 0
+    return (row[f"{metric}_sum"] or 0) / count if count else 0
+
+
+def _count_active_alerts(conn) -> int:
+    """Unresolved alerts in the last 24h (0 when no alerts table exists)"""
+    has_table = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'alerts'"
+    ).fetchone()
+    if not has_table:
+        return 0
+    return conn.execute(ACTIVE_ALERTS_QUERY).fetchone()["count"]
+
+
+def build_live_update(conn=None) -> dict:
+    """Build the live update from the minute rollups (on `conn` when given)"""
+    if conn is None:
+        # Ingest keeps rollups current; the writer is only taken to catch up
+        # on rows written behind their back
+        refresh_rollups()
+        with get_db_connection() as conn:
+            return _live_update_from(conn)
+
+    if rollups_behind(conn):
+        update_rollups(conn)
+    return _live_update_from(conn)
+
+
+def _live_update_from(conn) -> dict:
+    since = (datetime.utcnow() - LIVE_WINDOW).strftime(ROLLUP_GRAINS["minute"][0])
+    rows = window_zone_rows(conn, since)
+
+    zones_status = {}
+    worst_zone = "Zone-01"
+    worst_stress = 0
+    for row in rows:
+        zone_id = row["zone"]
+        avg_stress = _mean(row, "stress")
+        anomalies = row["anomaly_count"] or 0
+        zone_data = {
+            "name": f"Zone {zone_id}",
+            "status": _zone_live_status(avg_stress, anomalies),
+            "avg_stress": round(avg_stress, 2),
+            "avg_rubber": round(_mean(row, "rubber_mm"), 2),
+            "max_temp": row["temperature_C_max"] or 0,
+            "max_humidity": row["humidity_pct_max"] or 0,
+            "anomalies": anomalies,
+        }
+        zones_status[zone_id] = zone_data
+
+        # Find worst zone
+        if zone_data["avg_stress"] > worst_stress:
+            worst_stress = zone_data["avg_stress"]
+            worst_zone = zone_data["name"]
+
+    # Whole-window KPIs combine the per-zone sums and counts
+    def total(column):
+        return sum(row[column] or 0 for row in rows)
+
+    stress_n, rubber_n = total("stress_n"), total("rubber_mm_n")
+    flights = conn.execute(LIVE_FLIGHTS_QUERY, (since.replace("T", " "), since)).fetchone()["count"]
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "type": "live_update",
+        "zones": zones_status,
+        "active_alerts": _count_active_alerts(conn),
+        "kpis": {
+            "flights": flights,
+            "anomalies": total("anomaly_count"),
+            "worst_zone": worst_zone,
+            "avg_stress": round(total("stress_sum") / stress_n, 2) if stress_n else 0,
+            "avg_rubber": round(total("rubber_mm_sum") / rubber_n, 2) if rubber_n else 0,
+            "max_stress": round(max((row["stress_max"] or 0 for row in rows), default=0), 2),
+        },
+    }
+
+
 # Global connection manager
 manager = ConnectionManager()
 
@@ -221,8 +462,8 @@ async def websocket_endpoint(websocket: WebSocket, token: str):
         # Keep connection alive and handle incoming messages
         while True:
             data = await websocket.receive_text()
-            # Echo back or handle commands if needed
             logger.debug(f"WebSocket message: {data}")
+            handle_client_message(websocket, data)
 
     except WebSocketDisconnect:
         await manager.disconnect(websocket)
@@ -231,9 +472,27 @@ async def websocket_endpoint(websocket: WebSocket, token: str):
         await manager.disconnect(websocket)
 
 
+def handle_client_message(websocket: WebSocket, data: str):
+    """Handle a client command; {"type": "resync"} re-sends the full snapshot"""
+    try:
+        command = json.loads(data)
+    except ValueError:
+        return
+    if isinstance(command, dict) and command.get("type") == "resync":
+        logger.info(f"Client requested resync from seq {command.get('seq')}")
+        manager.send_snapshot(websocket)
+
+
+def notify_new_data(*_):
+    """Wake the broadcaster after an ingest commit (thread-safe)"""
+    manager.notify_new_data()
+
+
 async def start_websocket_broadcaster():
-    """Start the background broadcast task"""
+    """Start the background broadcast and change-detection tasks"""
     manager.broadcast_task = asyncio.create_task(manager.start_broadcast())
+    if CHANGE_POLL_INTERVAL_SECONDS > 0:
+        manager.change_task = asyncio.create_task(manager.watch_changes())
     logger.info("WebSocket broadcaster started")
 
 
@@ -241,3 +500,15 @@ async def stop_websocket_broadcaster():
     """Stop the background broadcast task"""
     await manager.stop_broadcast()
     logger.info("WebSocket broadcaster stopped")
+
+
+def _collect_metrics():
+    yield from metrics.stats_samples(
+        "smartzone_ws", manager.get_stats(),
+        counters=("updates_sent", "updates_skipped", "heartbeats_sent", "deltas_sent", "snapshots_sent",
+                  "frames_dropped", "slow_disconnects"),
+        gauges=("clients", "max_connections", "seq"),
+    )
+
+
+metrics.register_collector(_collect_metrics)
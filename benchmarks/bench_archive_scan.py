@@ -0,0 +1,96 @@
+"""
+Microbenchmark: long-range scans over SQLite vs the Parquet archive.
+
+Seeds a history, then times a per-zone stress scan over the whole range
+with a row-wise SQLite read (as load_data() did) and with a pruned,
+filtered archive read after moving every day into Parquet.
+
+Usage:
+    python benchmarks/bench_archive_scan.py --rows 1000000 --days 365
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+import argparse
+import logging
+import pandas as pd
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+
+import archive
+import database
+import generate_data
+
+logger = logging.getLogger(__name__)
+
+
+def sqlite_scan(path: str, zone: int) -> float:
+    """Previous path: read every row and column, then filter in pandas"""
+    conn = sqlite3.connect(path)
+    try:
+        df = pd.read_sql("SELECT * FROM runway_data", conn, parse_dates=["timestamp"])
+    finally:
+        conn.close()
+    return float(df.loc[df["zone"] == zone, "stress"].mean())
+
+
+def archive_scan(zone: int) -> float:
+    """Archive path: two columns of one zone's partitions"""
+    df = archive.read_archive(["id", "stress"], zone=zone)
+    return float(df["stress"].mean())
+
+
+def best_of(func, repeat: int) -> float:
+    """Best wall time in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--zone", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logging.getLogger("generate_data").setLevel(logging.WARNING)
+    logging.getLogger("archive").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "history.db")
+        end = datetime(2026, 1, 1)
+        generate_data.DB_PATH = path
+        database.DB_PATH = path
+        archive.ARCHIVE_PATH = os.path.join(tmp, "archive")
+        generate_data.create_database()
+        generate_data.generate_history(args.rows, end - timedelta(days=args.days), end, seed=42)
+
+        legacy = best_of(lambda: sqlite_scan(path, args.zone), args.repeat)
+        expected = sqlite_scan(path, args.zone)
+
+        started = time.perf_counter()
+        moved = archive.archive_old_data(older_than_days=0, now=end + timedelta(days=1))
+        archived_s = time.perf_counter() - started
+        assert abs(archive_scan(args.zone) - expected) < 1e-9
+        pruned = best_of(lambda: archive_scan(args.zone), args.repeat)
+
+        stats = archive.get_archive_stats()
+        logger.info(f"archived {moved:,} rows in {archived_s:.1f}s ({stats['files']} files, "
+                    f"{stats['bytes'] / 1e6:.1f} MB, SQLite was {os.path.getsize(path) / 1e6:.1f} MB)")
+        logger.info(f"{'rows':>9} {'sqlite ms':>10} {'archive ms':>11} {'speedup':>8}")
+        logger.info(f"{args.rows:>9} {legacy:>10.1f} {pruned:>11.1f} {legacy / pruned:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Microbenchmark: small queries on a fresh connection vs the connection pool.
+
+Runs the queries a dashboard poll and a WebSocket tick issue (max row id,
+latest flight, zone aggregates from rollups) with the previous
+connect-per-query pattern and through database.get_db_connection().
+
+Usage:
+    python benchmarks/bench_db_pool.py --rows 100000 --calls 2000
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+import argparse
+import logging
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+
+import database
+import generate_data
+import rollups
+from database import MAX_ROW_ID_QUERY
+
+logger = logging.getLogger(__name__)
+
+LATEST_FLIGHT_QUERY = "SELECT * FROM runway_data ORDER BY timestamp DESC, id DESC LIMIT 1"
+
+
+def legacy_query(path: str, sql: str):
+    """Previous pattern: connect, query, close"""
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+def pooled_query(path: str, sql: str):
+    """Current pattern: this thread's pooled reader"""
+    with database.get_db_connection(path) as conn:
+        return conn.execute(sql).fetchall()
+
+
+def per_call_us(func, path: str, sql: str, calls: int) -> float:
+    """Mean wall time per call in microseconds"""
+    func(path, sql)
+    start = time.perf_counter()
+    for _ in range(calls):
+        func(path, sql)
+    return (time.perf_counter() - start) * 1e6 / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        generate_data.DB_PATH = path
+        generate_data.create_database()
+        end = datetime.utcnow()
+        generate_data.generate_history(args.rows, end - timedelta(days=30), end, seed=42)
+        database.ensure_indexes(path)
+        rollups.refresh_rollups(path)
+
+        queries = {
+            "max row id": MAX_ROW_ID_QUERY,
+            "latest flight": LATEST_FLIGHT_QUERY,
+            "zone rollups": rollups._ZONE_AGGREGATE_QUERY,
+        }
+        logger.info(f"{args.rows:,} rows, {args.calls:,} calls per query")
+        logger.info(f"{'query':>14} {'connect/query':>14} {'pooled':>10} {'speedup':>8}")
+        for name, sql in queries.items():
+            legacy = per_call_us(legacy_query, path, sql, args.calls)
+            pooled = per_call_us(pooled_query, path, sql, args.calls)
+            logger.info(f"{name:>14} {legacy:>11.1f} us {pooled:>7.1f} us {legacy / pooled:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Microbenchmark: bulk list responses with and without response_model validation.
+
+Serves the same list of alert dicts from two routes: one returning the
+list and letting FastAPI validate and serialize it against
+List[AlertRecord], one returning FastJSONResponse directly.
+
+Usage:
+    python benchmarks/bench_json_response.py --items 1000 10000 100000
+"""
+
+import os
+import sys
+import time
+import argparse
+import logging
+from typing import List
+import numpy as np
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+
+import fast_json
+from fast_json import FastJSONResponse
+from models import AlertRecord
+
+logger = logging.getLogger(__name__)
+
+
+def sample_alerts(count: int, seed: int = 42) -> list:
+    """Alert dicts shaped like database.get_active_alerts() output"""
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            "timestamp": f"2026-01-01T{i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}",
+            "flight_id": f"AI{i % 10000:04d}", "aircraft": "A320", "zone": int(i % 10) + 1,
+            "severity": "critical", "reasons": ["High stress (91%)", "Anomaly detected"],
+            "stress": round(float(stress), 2), "rubber_mm": 7.25, "cracks_mm": 3.1,
+            "water_mm": 0.4, "fod_weight_g": 12.0,
+        }
+        for i, stress in enumerate(rng.uniform(85, 100, count))
+    ]
+
+
+def make_app(items: list) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/validated", response_model=List[AlertRecord])
+    async def validated():
+        return items
+
+    @app.get("/fast", response_model=List[AlertRecord], response_class=FastJSONResponse)
+    async def fast():
+        return FastJSONResponse(items)
+
+    return app
+
+
+def best_of(client: TestClient, path: str, repeat: int) -> float:
+    """Best wall time in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(path)
+        timings.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    encoder = "orjson" if fast_json.orjson is not None else "json"
+    logger.info(f"{'items':>8} {'validated ms':>13} {'fast ms':>9} {'speedup':>8}   (encoder: {encoder})")
+
+    for count in args.items:
+        items = sample_alerts(count)
+        client = TestClient(make_app(items))
+        assert client.get("/fast").json() == client.get("/validated").json()
+
+        validated = best_of(client, "/validated", args.repeat)
+        fast = best_of(client, "/fast", args.repeat)
+        logger.info(f"{count:>8} {validated:>13.1f} {fast:>9.1f} {validated / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Microbenchmark: per-tick cost of building the WebSocket live update.
+
+Compares the previous N+1 pattern (DISTINCT zone, then one aggregate query
+per zone on its own connection) with the minute-rollup read, as the
+number of zones grows.
+
+Usage:
+    python benchmarks/bench_live_update.py --rows 100000 --zones 10 50 200
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+import argparse
+import logging
+import numpy as np
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+
+import generate_data
+from websocket import build_live_update
+
+logger = logging.getLogger(__name__)
+
+
+def seed_database(path: str, rows: int, zones: int, seed: int = 42):
+    """Create a runway_data table with rows spread over the last two hours"""
+    generate_data.DB_PATH = path
+    generate_data.create_database()
+
+    rng = np.random.default_rng(seed)
+    now = datetime.utcnow()
+    offsets = rng.uniform(0, 7200, rows)
+    records = [
+        (
+            (now - timedelta(seconds=float(offset))).strftime("%Y-%m-%d %H:%M:%S"),
+            f"FL{i:06d}", "A320", int(zone),
+            float(rubber), 5.0, 0.0, float(stress), 0.0, 25.0, 70.0, 0.0, int(stress > 75),
+        )
+        for i, (offset, zone, stress, rubber) in enumerate(zip(
+            offsets, rng.integers(1, zones + 1, rows),
+            rng.uniform(0, 100, rows), rng.uniform(0, 20, rows)
+        ))
+    ]
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.executemany(
+            "INSERT INTO runway_data (timestamp, flight_id, aircraft, zone, rubber_mm, cracks_mm, "
+            "water_mm, stress, fod_weight_g, temperature_C, humidity_pct, rain_mm, anomaly) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            records,
+        )
+    conn.close()
+
+
+def legacy_live_update(path: str):
+    """Previous implementation: DISTINCT zone, then one query + connection per zone"""
+    def query(sql, params=(), one=False):
+        conn = sqlite3.connect(path)
+        conn.row_factory = sqlite3.Row
+        try:
+            cursor = conn.execute(sql, params)
+            return cursor.fetchone() if one else cursor.fetchall()
+        finally:
+            conn.close()
+
+    for zone_row in query("SELECT DISTINCT zone FROM runway_data ORDER BY zone"):
+        query(
+            """
+            SELECT zone, AVG(stress), AVG(rubber_mm), MAX(temperature_C), COUNT(*),
+                   COUNT(CASE WHEN anomaly = 1 THEN 1 END)
+            FROM runway_data
+            WHERE zone = ? AND timestamp > datetime('now', '-1 hour')
+            GROUP BY zone
+            """,
+            (zone_row[0],), one=True,
+        )
+    query(
+        """
+        SELECT COUNT(DISTINCT flight_id), COUNT(CASE WHEN anomaly = 1 THEN 1 END),
+               AVG(stress), AVG(rubber_mm), MAX(stress)
+        FROM runway_data WHERE timestamp > datetime('now', '-1 hour')
+        """,
+        one=True,
+    )
+
+
+def grouped_live_update(path: str):
+    """Current implementation: minute rollups read on one connection"""
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    try:
+        return build_live_update(conn)
+    finally:
+        conn.close()
+
+
+def best_of(func, path: str, repeat: int) -> float:
+    """Best wall time in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(path)
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--zones", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logging.getLogger("generate_data").setLevel(logging.WARNING)
+    logger.info(f"{'zones':>6} {'rows':>9} {'N+1 ms':>9} {'rollup ms':>11} {'speedup':>8}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for zones in args.zones:
+            path = os.path.join(tmp, f"live_{zones}.db")
+            seed_database(path, args.rows, zones)
+
+            assert len(grouped_live_update(path)["zones"]) == zones
+
+            legacy = best_of(legacy_live_update, path, args.repeat)
+            grouped = best_of(grouped_live_update, path, args.repeat)
+            logger.info(f"{zones:>6} {args.rows:>9} {legacy:>9.1f} {grouped:>11.1f} {legacy / grouped:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
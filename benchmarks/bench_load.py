@@ -0,0 +1,393 @@
+"""
+Load test: REST polling, /ws/live subscribers and serial ingest at once.
+
+Starts the API with uvicorn in a subprocess on a seeded scratch database,
+with SERIAL_PORTS pointing at a pseudo-terminal the harness writes
+simulated ESP32 JSON lines into. Then, for --duration seconds:
+
+  * --rest-clients loops log in via /api/auth/login and poll the endpoints
+    frontend/js/api.js calls, picked by the weights in --mix, waiting
+    --poll-interval between requests;
+  * --ws-clients subscribers hold /ws/live open and measure delivery
+    latency (receive time minus the server timestamp in each frame; the
+    snapshot sent on connect is skipped);
+  * one simulated ESP32 sends --serial-rate readings per second over the
+    pty, and the harness polls max(id) in SQLite to time each reading from
+    the serial write until its row is committed.
+
+Reports throughput and p50/p95/p99 latency per path, and writes them as
+JSON with --output. All clients share one event loop in this process,
+so at high client counts part of the measured latency is the harness's.
+
+Usage:
+    python benchmarks/bench_load.py --rest-clients 20 --ws-clients 200 --serial-rate 50 --duration 60
+    python benchmarks/bench_load.py --mix status:1,flights:4,alerts_summary:4 --poll-interval 0
+"""
+
+import os
+import pty
+import sys
+import tty
+import json
+import time
+import random
+import socket
+import asyncio
+import sqlite3
+import tempfile
+import argparse
+import logging
+import subprocess
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import httpx
+import numpy as np
+import websockets
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+sys.path.insert(0, BACKEND_DIR)
+
+import generate_data
+
+logger = logging.getLogger(__name__)
+
+USERNAME = "maintenance"
+PASSWORD = "load-test-password"
+NUM_ZONES = generate_data.NUM_ZONES
+
+# Calls made by frontend/js/api.js, keyed by a short name for --mix
+ENDPOINTS = {
+    "status": "/api/status",
+    "flights": "/api/flights",
+    "flights_zone": "/api/flights/zone/{zone}",
+    "latest": "/api/flights/latest",
+    "summary": "/api/analytics/summary",
+    "zones": "/api/analytics/zones",
+    "timeseries": "/api/analytics/timeseries?metric=stress",
+    "heatmap": "/api/analytics/heatmap",
+    "alerts": "/api/alerts?limit=50",
+    "critical": "/api/alerts/critical",
+    "alerts_summary": "/api/alerts/summary",
+    "alerts_zones": "/api/alerts/zones",
+}
+
+
+def parse_mix(spec: str) -> dict:
+    """"name:weight,name" -> {name: weight}; an empty spec polls every endpoint equally"""
+    if not spec:
+        return {name: 1.0 for name in ENDPOINTS}
+    mix = {}
+    for entry in spec.split(","):
+        name, _, weight = entry.strip().partition(":")
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint '{name}' (choose from {', '.join(ENDPOINTS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def summarize(latencies_s: list, elapsed_s: float, errors: int = 0) -> dict:
+    """Count, throughput and latency percentiles in milliseconds"""
+    result = {"count": len(latencies_s), "per_second": round(len(latencies_s) / elapsed_s, 2), "errors": errors}
+    if latencies_s:
+        ms = np.asarray(latencies_s) * 1000
+        p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+        result.update(p50_ms=round(p50, 2), p95_ms=round(p95, 2), p99_ms=round(p99, 2), max_ms=round(ms.max(), 2))
+    return result
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def seed_database(path: str, rows: int):
+    generate_data.create_database(path)
+    end = datetime.utcnow()
+    generate_data.generate_history(rows, end - timedelta(days=1), end, seed=42, db_path=path)
+
+
+def start_server(db_path: str, serial_port: str, port: int, workdir: str, log) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "DB_PATH": db_path,
+        "SERIAL_PORTS": serial_port,
+        "ARCHIVE_PATH": os.path.join(workdir, "archive"),
+        "JWT_SECRET": os.environ.get("JWT_SECRET", "load-test-secret-load-test-secret"),
+        "MAINTENANCE_PASSWORD": PASSWORD,
+        # The harness opens hundreds of sockets from one address
+        "WS_MAX_CONNECTIONS": os.environ.get("WS_MAX_CONNECTIONS", "100000"),
+    }
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+
+
+async def wait_until_ready(client: httpx.AsyncClient, server: subprocess.Popen, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with status {server.returncode}")
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Server did not become healthy in time")
+
+
+async def login(client: httpx.AsyncClient) -> str:
+    response = await client.post("/api/auth/login", json={"username": USERNAME, "password": PASSWORD})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def wait_for_serial(client: httpx.AsyncClient, headers: dict, timeout: float = 30):
+    """Wait until the listener has opened the pty"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = (await client.get("/api/hardware/status", headers=headers)).json()
+        if status["connected"]:
+            return
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Serial listener did not connect to the simulated device")
+
+
+class LoadTest:
+    """Shared state for one run"""
+
+    def __init__(self, base_url: str, token: str, args):
+        self.base_url = base_url
+        self.token = token
+        self.args = args
+        self.stop = asyncio.Event()
+        self.rest = defaultdict(list)
+        self.rest_errors = defaultdict(int)
+        self.ws_delivery = []
+        self.ws_frames = defaultdict(int)
+        self.ws_errors = 0
+        self.serial_sent = []  # monotonic write time per reading, in order
+        self.serial_committed = []
+        self.drain_deadline = float("inf")
+
+    async def rest_client(self, mix: dict):
+        names, weights = list(mix), list(mix.values())
+        headers = {"Authorization": f"Bearer {self.token}"}
+        async with httpx.AsyncClient(base_url=self.base_url, headers=headers, timeout=30) as client:
+            while not self.stop.is_set():
+                name = random.choices(names, weights)[0]
+                path = ENDPOINTS[name].format(zone=random.randint(1, NUM_ZONES))
+                start = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    elapsed = time.perf_counter() - start
+                    if response.status_code >= 400:
+                        self.rest_errors[name] += 1
+                    else:
+                        self.rest[name].append(elapsed)
+                except httpx.HTTPError:
+                    self.rest_errors[name] += 1
+                if self.args.poll_interval:
+                    await asyncio.sleep(self.args.poll_interval)
+
+    async def ws_subscriber(self):
+        url = self.base_url.replace("http", "ws", 1) + f"/ws/live?token={self.token}"
+        try:
+            async with websockets.connect(url, max_size=None) as ws:
+                first = True
+                while not self.stop.is_set():
+                    try:
+                        text = await asyncio.wait_for(ws.recv(), timeout=0.5)
+                    except asyncio.TimeoutError:
+                        continue
+                    received = datetime.utcnow()
+                    message = json.loads(text)
+                    self.ws_frames[message.get("type")] += 1
+                    if first:
+                        first = False  # snapshot queued at connect, built earlier
+                        continue
+                    sent = datetime.fromisoformat(message["timestamp"])
+                    self.ws_delivery.append((received - sent).total_seconds())
+        except (OSError, websockets.WebSocketException) as e:
+            if not self.stop.is_set():
+                self.ws_errors += 1
+                logger.warning(f"WebSocket subscriber failed: {e}")
+
+    async def esp32(self, master_fd: int):
+        """Simulated device: one JSON line per reading, in the firmware's field layout"""
+        interval = 1 / self.args.serial_rate
+        next_at = time.monotonic()
+        while not self.stop.is_set():
+            reading = {
+                "zone": random.randint(1, NUM_ZONES),
+                "temp": round(random.uniform(20, 45), 1),
+                "humidity": round(random.uniform(30, 90), 1),
+                "stress": round(random.uniform(10, 95), 1),
+                "water_mm": round(random.uniform(0, 8), 1),
+                "fod": round(random.uniform(0, 600), 2),
+                # The firmware sends millis(); ISO time keeps rows in the live window
+                "timestamp": datetime.utcnow().isoformat(),
+            }
+            os.write(master_fd, (json.dumps(reading) + "\n").encode())
+            self.serial_sent.append(time.monotonic())
+            next_at += interval
+            await asyncio.sleep(max(0.0, next_at - time.monotonic()))
+
+    async def ingest_watcher(self, db_path: str, base_id: int):
+        """Timestamp the commit of each reading by polling max(id)"""
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+        try:
+            while not self.stop.is_set() or len(self.serial_committed) < len(self.serial_sent):
+                max_id = await asyncio.to_thread(lambda: conn.execute("SELECT MAX(id) FROM runway_data").fetchone()[0])
+                now = time.monotonic()
+                committed = min((max_id or 0) - base_id, len(self.serial_sent))
+                for i in range(len(self.serial_committed), committed):
+                    self.serial_committed.append(now - self.serial_sent[i])
+                if self.stop.is_set() and now > self.drain_deadline:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            conn.close()
+
+    async def run(self, db_path: str, master_fd: int):
+        conn = sqlite3.connect(db_path)
+        base_id = conn.execute("SELECT MAX(id) FROM runway_data").fetchone()[0] or 0
+        conn.close()
+
+        mix = self.args.mix
+        tasks = [asyncio.create_task(self.rest_client(mix)) for _ in range(self.args.rest_clients)]
+        tasks += [asyncio.create_task(self.ws_subscriber()) for _ in range(self.args.ws_clients)]
+        if self.args.serial_rate > 0:
+            tasks.append(asyncio.create_task(self.esp32(master_fd)))
+            watcher = asyncio.create_task(self.ingest_watcher(db_path, base_id))
+        else:
+            watcher = None
+
+        start = time.monotonic()
+        await asyncio.sleep(self.args.duration)
+        self.stop.set()
+        elapsed = time.monotonic() - start
+        await asyncio.gather(*tasks)
+        # Readings still in the ingest queue get a few flush intervals to land
+        self.drain_deadline = time.monotonic() + 5
+        if watcher:
+            await watcher
+        return elapsed
+
+    def report(self, elapsed: float) -> dict:
+        paths = {}
+        for name in sorted(set(self.rest) | set(self.rest_errors)):
+            paths[f"REST {ENDPOINTS[name]}"] = summarize(self.rest[name], elapsed, self.rest_errors[name])
+        paths["REST (all)"] = summarize(
+            [value for values in self.rest.values() for value in values], elapsed, sum(self.rest_errors.values())
+        )
+        paths["WebSocket delivery"] = summarize(self.ws_delivery, elapsed, self.ws_errors)
+        if self.serial_sent:
+            paths["Serial write -> SQLite commit"] = summarize(
+                self.serial_committed, elapsed, len(self.serial_sent) - len(self.serial_committed)
+            )
+        return {
+            "settings": {
+                "rest_clients": self.args.rest_clients,
+                "ws_clients": self.args.ws_clients,
+                "serial_rate": self.args.serial_rate,
+                "poll_interval": self.args.poll_interval,
+                "duration": round(elapsed, 2),
+                "rows": self.args.rows,
+                "mix": self.args.mix,
+            },
+            "ws_frames": dict(self.ws_frames),
+            "paths": paths,
+        }
+
+
+def log_report(report: dict):
+    settings = report["settings"]
+    logger.info(
+        f"{settings['rest_clients']} REST clients, {settings['ws_clients']} WebSocket subscribers, "
+        f"{settings['serial_rate']} readings/s over {settings['duration']}s"
+    )
+    logger.info(f"{'path':>48} {'count':>7} {'/s':>8} {'err':>5} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for name, stats in report["paths"].items():
+        percentiles = " ".join(
+            f"{stats[key]:>6.1f} ms" if key in stats else f"{'-':>9}" for key in ("p50_ms", "p95_ms", "p99_ms")
+        )
+        logger.info(f"{name:>48} {stats['count']:>7} {stats['per_second']:>8.1f} {stats['errors']:>5} {percentiles}")
+    logger.info(f"WebSocket frames by type: {report['ws_frames']}")
+
+
+async def main_async(args) -> dict:
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = os.path.join(workdir, "load.db")
+        seed_database(db_path, args.rows)
+
+        # The listener opens the slave end like a USB serial device
+        master_fd, slave_fd = pty.openpty()
+        tty.setraw(slave_fd)
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        log = open(args.server_log, "w") if args.server_log else subprocess.DEVNULL
+        server = start_server(db_path, os.ttyname(slave_fd), port, workdir, log)
+        try:
+            async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+                await wait_until_ready(client, server)
+                token = await login(client)
+                headers = {"Authorization": f"Bearer {token}"}
+                if args.serial_rate > 0:
+                    await wait_for_serial(client, headers)
+
+                load = LoadTest(base_url, token, args)
+                elapsed = await load.run(db_path, master_fd)
+                report = load.report(elapsed)
+                report["ingest"] = (await client.get("/api/hardware/status", headers=headers)).json()["ingest"]
+                return report
+        finally:
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+            os.close(master_fd)
+            os.close(slave_fd)
+            if args.server_log:
+                log.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rest-clients", type=int, default=10)
+    parser.add_argument("--ws-clients", type=int, default=50)
+    parser.add_argument("--serial-rate", type=float, default=20, help="Simulated readings per second (0 = off)")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between a client's requests")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(""),
+                        help=f"Weighted endpoints, e.g. status:1,flights:3 (names: {', '.join(ENDPOINTS)})")
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--rows", type=int, default=10_000, help="Rows seeded before the run")
+    parser.add_argument("--output", default=None, help="Write the report JSON here")
+    parser.add_argument("--server-log", default=None, help="Write the server's output here (discarded by default)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    for name in ("httpx", "websockets", "generate_data", "rollups"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    report = asyncio.run(main_async(args))
+    log_report(report)
+    ingest = report["ingest"]
+    logger.info(
+        f"Ingest: {ingest['total_inserted']} inserted, {ingest['dropped']} dropped, "
+        f"max queue depth {ingest['max_queue_depth']}"
+    )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
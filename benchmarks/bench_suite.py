@@ -0,0 +1,269 @@
+"""
+Benchmark suite: database.py analytics functions and HTTP endpoints by data size.
+
+Seeds one SQLite file per size with generate_data.generate_history(), then
+times load_data, validate_data, get_zone_summary, get_recent_flights,
+get_active_alerts, get_time_series and get_heatmap_data on the loaded
+frame, and the dashboard's REST calls through an in-process TestClient
+(response cache and derived values cleared before every request, so the
+handler really computes).
+
+Results are written as JSON. With --compare, medians are checked against
+a stored baseline and the script exits with status 1 if any measurement
+is slower than the baseline by more than --tolerance.
+
+Usage:
+    python benchmarks/bench_suite.py --sizes 10000 100000 1000000 --output bench.json
+    python benchmarks/bench_suite.py --sizes 10000 100000 --data-dir /tmp/bench \\
+        --output current.json --compare baseline.json --tolerance 0.2
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import platform
+import statistics
+import tempfile
+import argparse
+import logging
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+os.environ.setdefault("JWT_SECRET", "benchmark-secret-benchmark-secret")
+# No hardware or archive during the run
+os.environ.setdefault("SERIAL_PORTS", "/nonexistent")
+os.environ.setdefault("ARCHIVE_PATH", os.path.join(tempfile.gettempdir(), "smartzone_bench_archive"))
+
+import database
+import generate_data
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+HISTORY_DAYS = 7
+SEED = 42
+
+# Same functions and arguments the routes use
+FUNCTIONS = {
+    "validate_data": lambda df: database.validate_data(df.copy()),
+    "get_zone_summary": lambda df: database.get_zone_summary(df),
+    "get_recent_flights": lambda df: database.get_recent_flights(df, n=50),
+    "get_active_alerts": lambda df: database.get_active_alerts(df, limit=100),
+    "get_time_series": lambda df: database.get_time_series(df, "stress"),
+    "get_heatmap_data": lambda df: database.get_heatmap_data(df),
+}
+
+# Polled by frontend/js/api.js
+ENDPOINTS = (
+    "/api/status",
+    "/api/flights",
+    "/api/flights/latest",
+    "/api/analytics/summary",
+    "/api/analytics/zones",
+    "/api/analytics/timeseries?metric=stress",
+    "/api/analytics/heatmap",
+    "/api/alerts?limit=100",
+    "/api/alerts/summary",
+    "/api/alerts/zones",
+)
+
+
+def seed_database(path: str, rows: int, workers: int) -> float:
+    """Create path with `rows` generated readings; reuses an existing file of that size"""
+    if os.path.exists(path):
+        conn = sqlite3.connect(path)
+        try:
+            existing = conn.execute("SELECT COUNT(*) FROM runway_data").fetchone()[0]
+        except sqlite3.Error:
+            existing = None
+        finally:
+            conn.close()
+        if existing == rows:
+            logger.info(f"Reusing {path} ({rows:,} rows)")
+            return 0.0
+        os.remove(path)
+
+    start = time.perf_counter()
+    generate_data.create_database(path)
+    end = datetime(2026, 1, 1)
+    generate_data.generate_history(rows, end - timedelta(days=HISTORY_DAYS), end, seed=SEED,
+                                   workers=workers, db_path=path)
+    elapsed = time.perf_counter() - start
+    logger.info(f"Seeded {rows:,} rows in {elapsed:.1f}s")
+    return elapsed
+
+
+def measure(func, repeat: int) -> dict:
+    """Run func repeat times after one warm-up call; wall times in milliseconds"""
+    func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "median_ms": round(statistics.median(samples), 3),
+        "min_ms": round(min(samples), 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "max_ms": round(max(samples), 3),
+        "repeat": repeat,
+    }
+
+
+def bench_functions(path: str, repeat: int) -> dict:
+    database.DB_PATH = path
+    results = {"load_data": measure(database.load_data, repeat)}
+    df = database.load_data()
+    for name, func in FUNCTIONS.items():
+        results[name] = measure(lambda: func(df), repeat)
+    return results
+
+
+def bench_http(path: str, repeat: int) -> dict:
+    from fastapi.testclient import TestClient
+    from auth import AuthToken
+    from dataset_cache import dataset_cache
+    from response_cache import response_cache
+    import main
+
+    database.DB_PATH = path
+    dataset_cache.invalidate()
+    dataset_cache.get()
+    # Lifespan (serial listener, archiver, WebSocket hub) is not started
+    client = TestClient(main.app)
+    headers = {"Authorization": f"Bearer {AuthToken.create_token('benchmark', 'admin')}"}
+
+    results = {}
+    for endpoint in ENDPOINTS:
+        def call():
+            response_cache.clear()
+            with dataset_cache.lock:
+                dataset_cache.derived.clear()
+            response = client.get(endpoint, headers=headers)
+            response.raise_for_status()
+        results[f"GET {endpoint}"] = measure(call, repeat)
+    return results
+
+
+def run_size(rows: int, data_dir: str, args) -> dict:
+    path = os.path.join(data_dir, f"bench_{rows}.db")
+    result = {"rows": rows, "seed_seconds": round(seed_database(path, rows, args.workers), 2)}
+    repeat = args.repeat if rows < 1_000_000 else max(1, args.repeat // 2)
+
+    result["functions"] = bench_functions(path, repeat)
+    for name, stats in result["functions"].items():
+        logger.info(f"{rows:>9,} {name:>44} {stats['median_ms']:>10.2f} ms")
+    if not args.skip_http:
+        result["http"] = bench_http(path, repeat)
+        for name, stats in result["http"].items():
+            logger.info(f"{rows:>9,} {name:>44} {stats['median_ms']:>10.2f} ms")
+    return result
+
+
+def environment() -> dict:
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "sqlite": sqlite3.sqlite_version,
+    }
+
+
+def flatten(results: dict) -> dict:
+    """{"<rows>/<group>/<name>": median_ms} for every measurement"""
+    flat = {}
+    for size in results["sizes"]:
+        for group in ("functions", "http"):
+            for name, stats in size.get(group, {}).items():
+                flat[f"{size['rows']}/{group}/{name}"] = stats["median_ms"]
+    return flat
+
+
+def compare(current: dict, baseline: dict, tolerance: float, min_delta_ms: float) -> list:
+    """
+    Measurements slower than baseline * (1 + tolerance).
+
+    Differences below min_delta_ms are ignored so sub-millisecond timer
+    noise is not reported as a regression.
+    """
+    now, before = flatten(current), flatten(baseline)
+    regressions = []
+    for key in sorted(now.keys() & before.keys()):
+        old, new = before[key], now[key]
+        ratio = new / old if old else float("inf")
+        if ratio > 1 + tolerance and new - old >= min_delta_ms:
+            regressions.append({"name": key, "baseline_ms": old, "current_ms": new, "ratio": round(ratio, 3)})
+    missing = len(before.keys() - now.keys())
+    if missing:
+        logger.info(f"{missing} baseline measurement(s) not run this time")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per measurement (halved at 1M+ rows)")
+    parser.add_argument("--workers", type=int, default=1, help="generate_data processes used for seeding")
+    parser.add_argument("--data-dir", default=None, help="Keep seeded databases here and reuse them")
+    parser.add_argument("--skip-http", action="store_true", help="Only time database.py functions")
+    parser.add_argument("--output", default=None, help="Write results JSON here")
+    parser.add_argument("--compare", default=None, help="Baseline results JSON to check against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown ratio (0.2 = 20%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="Ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    for name in ("httpx", "database", "dataset_cache", "generate_data", "rollups"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    # load_data at these sizes always exceeds SLOW_QUERY_MS
+    logging.getLogger("profiling").setLevel(logging.ERROR)
+
+    results = {
+        "schema": SCHEMA_VERSION,
+        "environment": environment(),
+        "settings": {"repeat": args.repeat, "seed": SEED, "history_days": HISTORY_DAYS},
+        "sizes": [],
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data_dir or tmp
+        os.makedirs(data_dir, exist_ok=True)
+        for rows in args.sizes:
+            results["sizes"].append(run_size(rows, data_dir, args))
+
+    regressions = []
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+        results["comparison"] = {
+            "baseline": args.compare,
+            "tolerance": args.tolerance,
+            "min_delta_ms": args.min_delta_ms,
+            "regressions": regressions,
+        }
+        for entry in regressions:
+            logger.info(
+                f"REGRESSION {entry['name']}: {entry['baseline_ms']:.2f} -> {entry['current_ms']:.2f} ms "
+                f"({entry['ratio']:.2f}x)"
+            )
+        logger.info(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        logger.info(f"Results written to {args.output}")
+
+    if regressions:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Load test: WebSocket broadcast fan-out with many simulated clients.
+
+Compares the previous sequential send_json loop with the encode-once,
+per-client outbox broadcaster. A fraction of the clients are slow; the
+figure of interest is how long the fast clients wait for each frame.
+
+Usage:
+    python benchmarks/bench_ws_fanout.py --clients 100 1000 2000 --slow-fraction 0.01
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import logging
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+
+import websocket
+from websocket import ConnectionManager
+
+logger = logging.getLogger(__name__)
+
+
+class SimulatedClient:
+    """In-process WebSocket stand-in with a fixed per-frame send latency"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.received_at = []
+        self.encodes = 0
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, message):
+        json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+        self.encodes += 1
+        await self._deliver()
+
+    async def send_text(self, text):
+        await self._deliver()
+
+    async def _deliver(self):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.received_at.append(time.perf_counter())
+
+    async def close(self, code=None, reason=None):
+        pass
+
+
+def sample_message(zones: int = 50) -> dict:
+    """Live update shaped like build_live_update() output"""
+    return {
+        "timestamp": "2026-01-01T00:00:00",
+        "type": "live_update",
+        "zones": {
+            z: {"name": f"Zone {z}", "status": "NORMAL", "avg_stress": 42.5, "avg_rubber": 7.25,
+                "max_temp": 31.0, "max_humidity": 80.0, "anomalies": 3}
+            for z in range(1, zones + 1)
+        },
+        "active_alerts": 0,
+        "kpis": {"flights": 1200, "anomalies": 40, "worst_zone": "Zone 7",
+                 "avg_stress": 41.2, "avg_rubber": 7.1, "max_stress": 99.1},
+    }
+
+
+def make_clients(count: int, slow_fraction: float, slow_delay: float) -> list:
+    slow = int(count * slow_fraction)
+    return [SimulatedClient(slow_delay if i < slow else 0.0) for i in range(count)]
+
+
+async def legacy_fanout(clients: list, message: dict, frames: int) -> list:
+    """Previous implementation: sequential send_json to every client"""
+    starts = []
+    for _ in range(frames):
+        starts.append(time.perf_counter())
+        for client in clients:
+            await client.send_json(message)
+    return starts
+
+
+async def outbox_fanout(clients: list, message: dict, frames: int, interval: float) -> list:
+    """Current implementation: ConnectionManager.broadcast() with per-client outboxes"""
+    manager = ConnectionManager()
+    for client in clients:
+        await manager.connect(client)
+
+    starts = []
+    for _ in range(frames):
+        starts.append(time.perf_counter())
+        await manager.broadcast(message)
+        await asyncio.sleep(interval)
+
+    await manager.stop_broadcast()
+    return starts
+
+
+def fast_client_latency_ms(clients: list, starts: list) -> float:
+    """Worst delay between a broadcast and its arrival at any fast client"""
+    worst = 0.0
+    for client in clients:
+        if client.delay:
+            continue
+        for start, received in zip(starts, client.received_at):
+            worst = max(worst, received - start)
+    return worst * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, nargs="+", default=[100, 1000, 2000])
+    parser.add_argument("--frames", type=int, default=5)
+    parser.add_argument("--slow-fraction", type=float, default=0.01)
+    parser.add_argument("--slow-delay", type=float, default=0.05)
+    parser.add_argument("--interval", type=float, default=0.1, help="Seconds between broadcasts")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logging.getLogger("websocket").setLevel(logging.WARNING)
+    websocket.MAX_CONNECTIONS = max(args.clients)
+    message = sample_message()
+
+    logger.info(f"{'clients':>8} {'legacy ms':>10} {'outbox ms':>10} {'encodes old/new':>16}")
+    for count in args.clients:
+        legacy_clients = make_clients(count, args.slow_fraction, args.slow_delay)
+        starts = asyncio.run(legacy_fanout(legacy_clients, message, args.frames))
+        legacy = fast_client_latency_ms(legacy_clients, starts)
+        legacy_encodes = sum(c.encodes for c in legacy_clients)
+
+        clients = make_clients(count, args.slow_fraction, args.slow_delay)
+        starts = asyncio.run(outbox_fanout(clients, message, args.frames, args.interval))
+        outbox = fast_client_latency_ms(clients, starts)
+
+        logger.info(f"{count:>8} {legacy:>10.1f} {outbox:>10.1f} {legacy_encodes:>9}/{args.frames:<6}")
+
+
+if __name__ == "__main__":
+    main()
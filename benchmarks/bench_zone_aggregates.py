@@ -0,0 +1,96 @@
+"""
+Benchmark: per-zone mask loop vs single-pass groupby for zone summaries/heatmap.
+
+Usage:
+    python benchmarks/bench_zone_aggregates.py --rows 200000 --zones 10 50 200
+"""
+
+import os
+import sys
+import time
+import argparse
+import logging
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from database import (
+    get_zone_summary, compute_zone_aggregates, summarize_zone_aggregates,
+    heatmap_from_aggregates
+)
+
+logger = logging.getLogger(__name__)
+
+METRICS = ["stress", "rubber_mm", "cracks_mm", "water_mm", "fod_weight_g"]
+
+
+def make_frame(rows: int, zones: int, seed: int = 42) -> pd.DataFrame:
+    """Synthetic runway frame with the columns the aggregations read"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "zone": rng.integers(1, zones + 1, rows),
+        "stress": rng.uniform(0, 100, rows),
+        "rubber_mm": rng.uniform(0, 20, rows),
+        "cracks_mm": rng.uniform(0, 50, rows),
+        "water_mm": rng.exponential(2, rows),
+        "fod_weight_g": rng.exponential(50, rows),
+        "temperature_C": rng.normal(25, 5, rows),
+        "humidity_pct": rng.uniform(0, 100, rows),
+        "anomaly": rng.integers(0, 2, rows),
+    })
+
+
+def legacy_zone_summary_and_heatmap(df: pd.DataFrame):
+    """Previous implementation: one boolean mask and scan per zone, per endpoint"""
+    for _ in range(2):  # summary and heatmap each rescanned the frame
+        for zone in sorted(df["zone"].unique()):
+            zone_data = df[df["zone"] == zone]
+            for metric in METRICS:
+                zone_data[metric].mean()
+            zone_data["stress"].max()
+            zone_data["anomaly"].sum()
+
+
+def shared_groupby(df: pd.DataFrame):
+    """New implementation: one groupby shared by summary and heatmap"""
+    agg = compute_zone_aggregates(df)
+    summarize_zone_aggregates(agg)
+    heatmap_from_aggregates(agg)
+
+
+def best_of(func, df: pd.DataFrame, repeat: int) -> float:
+    """Best wall time in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df)
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--zones", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logger.info(f"{'zones':>6} {'rows':>9} {'legacy ms':>10} {'groupby ms':>11} {'speedup':>8}")
+
+    for zones in args.zones:
+        df = make_frame(args.rows, zones)
+
+        # Sanity check: groupby summary matches a direct per-zone mean
+        summary = get_zone_summary(df)
+        assert len(summary) == df["zone"].nunique()
+        assert summary[0]["avg_stress"] == round(df.loc[df["zone"] == 1, "stress"].mean(), 2)
+
+        legacy = best_of(legacy_zone_summary_and_heatmap, df, args.repeat)
+        grouped = best_of(shared_groupby, df, args.repeat)
+        logger.info(f"{zones:>6} {args.rows:>9} {legacy:>10.1f} {grouped:>11.1f} {legacy / grouped:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -76,12 +76,15 @@ async function fetchZones() {
   }
 }
 
-async function fetchTimeSeries(metric, zone = null) {
+async function fetchTimeSeries(metric, zone = null, { start = null, end = null, maxPoints = null, method = null } = {}) {
   try {
-    const url = zone 
-      ? `${BASE_URL}/analytics/timeseries?metric=${metric}&zone=${zone}`
-      : `${BASE_URL}/analytics/timeseries?metric=${metric}`;
-    const response = await fetch(url);
+    const params = new URLSearchParams({ metric });
+    if (zone) params.set('zone', zone);
+    if (start) params.set('start', start);
+    if (end) params.set('end', end);
+    if (maxPoints) params.set('max_points', maxPoints);
+    if (method) params.set('method', method);
+    const response = await fetch(`${BASE_URL}/analytics/timeseries?${params}`);
     if (!response.ok) throw new Error(`HTTP ${response.status}`);
     return await response.json();
   } catch (error) {
@@ -100,11 +103,13 @@ async function fetchHeatmap() {
 }
 
 // === ALERTS ENDPOINTS ===
-async function fetchAlerts(severity = null) {
+async function fetchAlerts(severity = null, limit = null) {
   try {
-    const url = severity 
-      ? `${BASE_URL}/alerts?severity=${severity}`
-      : `${BASE_URL}/alerts`;
+    const params = new URLSearchParams();
+    if (severity) params.set('severity', severity);
+    if (limit) params.set('limit', limit);
+    const query = params.toString();
+    const url = query ? `${BASE_URL}/alerts?${query}` : `${BASE_URL}/alerts`;
     const response = await fetch(url);
     if (!response.ok) throw new Error(`HTTP ${response.status}`);
     return await response.json();
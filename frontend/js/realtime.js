@@ -16,6 +16,13 @@ class RealtimeManager {
 
         this.warningBanner = null;
         this.connectionStatus = null;
+
+        // Live state rebuilt from the snapshot plus sequenced deltas
+        this.seq = null;
+        this.zones = {};
+        this.kpis = {};
+        this.activeAlerts = 0;
+        this.resyncPending = false;
     }
 
     /**
@@ -56,6 +63,10 @@ class RealtimeManager {
         this.connected = true;
         this.reconnectAttempts = 0;
 
+        // Server sends a full snapshot on connect
+        this.seq = null;
+        this.resyncPending = false;
+
         // Hide warning banner if shown
         if (this.warningBanner) {
             this.warningBanner.style.display = 'none';
@@ -83,6 +94,11 @@ class RealtimeManager {
             
             if (data.type === 'live_update') {
                 this._processLiveUpdate(data);
+            } else if (data.type === 'live_delta') {
+                this._processLiveDelta(data);
+            } else if (data.type === 'heartbeat' && this.seq !== null && data.seq > this.seq) {
+                // A delta was dropped while idle
+                this._requestResync();
             }
 
             // Reset heartbeat
@@ -183,7 +199,7 @@ class RealtimeManager {
     }
 
     /**
-     * Process live update data
+     * Process full live update snapshot
      */
     _processLiveUpdate(data) {
         try {
@@ -191,24 +207,86 @@ class RealtimeManager {
 
             console.log('Live update received:', timestamp);
 
+            this.seq = data.seq ?? null;
+            const droppedZones = Object.keys(this.zones).filter((zoneId) => !(zoneId in zones));
+            this.zones = { ...zones };
+            this.kpis = { ...kpis };
+            this.activeAlerts = active_alerts;
+            this.resyncPending = false;
+
             // Update KPI boxes
-            this._updateKPIBoxes(kpis, active_alerts);
+            this._updateKPIBoxes(this.kpis, this.activeAlerts);
 
             // Update zone indicators
             this._updateZoneIndicators(zones);
+            this._clearZoneIndicators(droppedZones);
 
-            // Update timestamp
-            const tsElement = document.getElementById('liveUpdateTimestamp');
-            if (tsElement) {
-                const date = new Date(timestamp);
-                tsElement.textContent = date.toLocaleTimeString();
-            }
+            this._updateTimestamp(timestamp);
 
         } catch (err) {
             console.error('Error processing live update:', err);
         }
     }
 
+    /**
+     * Apply a delta (changed zones/KPIs only) on top of the current state
+     */
+    _processLiveDelta(data) {
+        try {
+            if (this.seq === null || data.seq !== this.seq + 1) {
+                console.warn(`Live delta gap: have seq ${this.seq}, got ${data.seq}`);
+                this._requestResync();
+                return;
+            }
+            this.seq = data.seq;
+
+            const changedZones = data.zones || {};
+            const removedZones = data.removed?.zones || [];
+            Object.assign(this.zones, changedZones);
+            for (const zoneId of removedZones) {
+                delete this.zones[zoneId];
+            }
+            if (data.kpis) {
+                Object.assign(this.kpis, data.kpis);
+            }
+            if (data.active_alerts !== undefined) {
+                this.activeAlerts = data.active_alerts;
+            }
+
+            if (data.kpis || data.active_alerts !== undefined) {
+                this._updateKPIBoxes(this.kpis, this.activeAlerts);
+            }
+            this._updateZoneIndicators(changedZones);
+            this._clearZoneIndicators(removedZones);
+            this._updateTimestamp(data.timestamp);
+
+        } catch (err) {
+            console.error('Error processing live delta:', err);
+        }
+    }
+
+    /**
+     * Ask the server for a fresh snapshot after a sequence gap
+     */
+    _requestResync() {
+        if (this.resyncPending || !this.ws || this.ws.readyState !== WebSocket.OPEN) {
+            return;
+        }
+        this.resyncPending = true;
+        this.ws.send(JSON.stringify({ type: 'resync', seq: this.seq }));
+    }
+
+    /**
+     * Update last-update timestamp display
+     */
+    _updateTimestamp(timestamp) {
+        const tsElement = document.getElementById('liveUpdateTimestamp');
+        if (tsElement && timestamp) {
+            const date = new Date(timestamp);
+            tsElement.textContent = date.toLocaleTimeString();
+        }
+    }
+
     /**
      * Update KPI boxes with new data
      */
@@ -285,6 +363,32 @@ class RealtimeManager {
         }
     }
 
+    /**
+     * Reset indicators of zones with no readings in the live window
+     */
+    _clearZoneIndicators(zoneIds) {
+        try {
+            for (const zoneId of zoneIds) {
+                const zoneEl = document.querySelector(`[data-zone-id="${zoneId}"]`);
+                if (zoneEl) {
+                    zoneEl.classList.remove('normal', 'warning', 'critical', 'anomaly');
+
+                    const statusEl = zoneEl.querySelector('.zone-status');
+                    if (statusEl) {
+                        statusEl.textContent = 'NO DATA';
+                    }
+
+                    const stressEl = zoneEl.querySelector('.zone-stress');
+                    if (stressEl) {
+                        stressEl.textContent = '--';
+                    }
+                }
+            }
+        } catch (err) {
+            console.error('Error clearing zone indicators:', err);
+        }
+    }
+
     /**
      * Update connection status display
      */
@@ -301,11 +405,11 @@ class RealtimeManager {
                 if (connected) {
                     indicator?.classList.add('connected');
                     indicator?.classList.remove('disconnected');
-                    text?.textContent = 'LIVE';
+                    if (text) text.textContent = 'LIVE';
                 } else {
                     indicator?.classList.remove('connected');
                     indicator?.classList.add('disconnected');
-                    text?.textContent = 'OFFLINE';
+                    if (text) text.textContent = 'OFFLINE';
                 }
             }
         } catch (err) {
@@ -414,4 +518,4 @@ window.addEventListener('beforeunload', () => {
     }
 });
 
-export { RealtimeManager };
+window.RealtimeManager = RealtimeManager;
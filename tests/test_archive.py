@@ -0,0 +1,105 @@
+"""
+Pytest suite for the SmartZone-R Parquet archive tier.
+
+Tests move generated history into a temporary archive and check that
+load_data(), rollups and exports still see every reading exactly once.
+"""
+import os
+import sys
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+# Add backend directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../backend"))
+
+import archive
+import csv_export
+import database
+import generate_data
+import rollups
+
+NOW = datetime(2026, 1, 11)
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """Temporary database with ten days of history and an empty archive."""
+    path = str(tmp_path / "runway.db")
+    monkeypatch.setattr(generate_data, "DB_PATH", path)
+    monkeypatch.setattr(database, "DB_PATH", path)
+    monkeypatch.setattr(archive, "ARCHIVE_PATH", str(tmp_path / "archive"))
+    generate_data.create_database()
+    generate_data.generate_history(4000, datetime(2026, 1, 1), NOW, seed=21)
+    return path
+
+
+def _count(db_path, sql="SELECT COUNT(*) FROM runway_data"):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(sql).fetchone()[0]
+    finally:
+        conn.close()
+
+
+class TestArchiveMove:
+    """Tests for moving old days out of SQLite."""
+
+    def test_old_days_move_and_union_is_unchanged(self, db_path):
+        """Test that load_data() returns the same rows before and after archiving."""
+        before = database.load_data()
+        moved = archive.archive_old_data(older_than_days=3, now=NOW)
+
+        assert moved > 0
+        assert _count(db_path) == len(before) - moved
+        assert _count(db_path, "SELECT MIN(timestamp) FROM runway_data") >= "2026-01-08"
+        assert archive.archive_days() == [f"2026-01-0{d}" for d in range(1, 8)]
+
+        after = database.load_data()
+        assert after["id"].tolist() == before["id"].tolist()
+        assert after["timestamp"].tolist() == before["timestamp"].tolist()
+        assert after["stress"].tolist() == pytest.approx(before["stress"].tolist())
+
+        # Already archived days are not moved twice
+        assert archive.archive_old_data(older_than_days=3, now=NOW) == 0
+
+    def test_pruned_filtered_read(self, db_path):
+        """Test that column pruning and zone/time filters match the raw rows."""
+        start, end = datetime(2026, 1, 2, 6), datetime(2026, 1, 4)
+        expected = database.load_data()
+        expected = expected[(expected["zone"] == 5) & (expected["timestamp"] >= start)
+                            & (expected["timestamp"] < end)]
+        archive.archive_old_data(older_than_days=3, now=NOW)
+
+        df = archive.read_archive(["id", "stress"], zone=5, start=start, end=end)
+        assert list(df.columns) == ["id", "stress"]
+        assert df["id"].tolist() == expected["id"].tolist()
+
+
+class TestArchiveReaders:
+    """Tests for rollups and exports over archived days."""
+
+    def test_rollups_survive_archive_and_rebuild(self, db_path):
+        """Test that zone aggregates are unchanged by archiving and by a rebuild."""
+        raw = rollups.query_zone_aggregates()
+        archive.archive_old_data(older_than_days=3, now=NOW)
+        assert rollups.query_zone_aggregates().equals(raw)
+
+        with database.get_db_connection() as conn:
+            rollups.rebuild_rollups(conn)
+        rebuilt = rollups.query_zone_aggregates()
+        for column in raw.columns:
+            assert rebuilt[column].tolist() == pytest.approx(raw[column].tolist(), abs=1e-6), column
+
+    def test_export_spans_archive_and_sqlite(self, db_path):
+        """Test that a zone export lists archived and live rows once, in time order."""
+        before = [row[:2] for chunk in csv_export.iter_row_chunks(zone=2) for row in chunk]
+        archive.archive_old_data(older_than_days=3, now=NOW)
+        after = [row[:2] for chunk in csv_export.iter_row_chunks(zone=2, chunk_rows=50) for row in chunk]
+
+        assert len(after) == len(before)
+        assert [ts for ts, _ in after] == sorted(ts for ts, _ in after)
+        assert [fid for _, fid in after] == [fid for _, fid in before]
@@ -0,0 +1,108 @@
+"""
+Pytest suite for SmartZone-R JWT verification.
+
+Tests cover the verified-token cache: hits and misses, exp handling,
+LRU bounds, logout revocation and secret rotation.
+"""
+import os
+import sys
+import time
+
+import jwt
+import pytest
+from fastapi import HTTPException
+
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+# Add backend directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../backend"))
+
+import auth
+from auth import AuthToken, Authentication, VerifiedTokenCache
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    """Fresh verified-token cache and a counter of real decodes."""
+    fresh = VerifiedTokenCache(max_size=3, ttl_seconds=60)
+    monkeypatch.setattr(auth, "token_cache", fresh)
+    decodes = []
+    real_decode = jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        decodes.append(1)
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr(auth.jwt, "decode", counting_decode)
+    fresh.decodes = decodes
+    return fresh
+
+
+def _token(exp_seconds: float, role: str = "viewer") -> str:
+    payload = {"username": role, "role": role, "exp": int(time.time() + exp_seconds)}
+    return jwt.encode(payload, auth.JWT_SECRET, algorithm="HS256")
+
+
+class TestVerifiedTokenCache:
+    """Tests for cached token verification."""
+
+    def test_repeat_verification_is_cached(self, cache):
+        """Test that a token is decoded once and then served from the cache."""
+        token = AuthToken.create_token("admin", "admin")
+        for _ in range(5):
+            assert AuthToken.verify_token(token)["role"] == "admin"
+
+        assert len(cache.decodes) == 1
+        assert cache.get_stats()["hits"] == 4
+        assert cache.get_stats()["misses"] == 1
+
+    def test_entry_expires_with_token(self, cache):
+        """Test that a cached token is rejected once its exp passes."""
+        token = _token(1)
+        AuthToken.verify_token(token)
+        time.sleep(1.1)
+
+        with pytest.raises(HTTPException) as error:
+            AuthToken.verify_token(token)
+        assert error.value.detail == "Token expired"
+
+    def test_lru_bound(self, cache):
+        """Test that the least recently used token is evicted first."""
+        tokens = [_token(3600, role) for role in ("admin", "maintenance", "viewer", "guest")]
+        for token in tokens[:3]:
+            AuthToken.verify_token(token)
+        AuthToken.verify_token(tokens[0])
+        AuthToken.verify_token(tokens[3])
+
+        assert cache.get_stats()["evictions"] == 1
+        assert cache.get(tokens[0]) is not None
+        assert cache.get(tokens[1]) is None
+
+    def test_logout_revokes_token(self, cache):
+        """Test that a logged-out token is rejected even though its signature is valid."""
+        token = AuthToken.create_token("viewer", "viewer")
+        AuthToken.verify_token(token)
+        Authentication.logout(token)
+
+        with pytest.raises(HTTPException) as error:
+            AuthToken.verify_token(token)
+        assert error.value.status_code == 401
+        assert cache.get_stats()["entries"] == 0
+
+    def test_secret_rotation_invalidates_cache(self, cache, monkeypatch):
+        """Test that tokens signed with the old secret fail after rotation."""
+        token = AuthToken.create_token("admin", "admin")
+        AuthToken.verify_token(token)
+        monkeypatch.setattr(auth, "JWT_SECRET", auth.JWT_SECRET)
+        auth.rotate_secret("rotated-secret")
+
+        with pytest.raises(HTTPException):
+            AuthToken.verify_token(token)
+
+    def test_refresh_decodes_once(self, cache):
+        """Test that refreshing an expiring token verifies it a single time."""
+        token = _token(600)
+        result = Authentication.refresh(token)
+
+        assert result["role"] == "viewer"
+        assert len(cache.decodes) == 1
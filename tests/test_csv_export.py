@@ -0,0 +1,131 @@
+"""
+Pytest suite for the SmartZone-R streaming CSV exports.
+
+Tests check that chunked cursor exports reproduce the full filtered
+query, that alert rows match the in-memory alert evaluation, and that
+gzip output round-trips.
+"""
+import io
+import os
+import sys
+import csv
+import gzip
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+# Add backend directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../backend"))
+
+import archive
+import database
+import generate_data
+import csv_export
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """Temporary runway database with three days of generated history."""
+    path = str(tmp_path / "runway.db")
+    monkeypatch.setattr(generate_data, "DB_PATH", path)
+    monkeypatch.setattr(database, "DB_PATH", path)
+    generate_data.create_database()
+    generate_data.generate_history(2000, datetime(2026, 1, 1), datetime(2026, 1, 4), seed=11)
+    return path
+
+
+def _parse(chunks) -> list:
+    return list(csv.reader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+
+
+class TestFlightExport:
+    """Tests for chunked raw-reading exports."""
+
+    def test_chunks_match_filtered_query(self, db_path):
+        """Test that small chunks reproduce the zone/time-filtered rows in order."""
+        start, end = datetime(2026, 1, 2), datetime(2026, 1, 3)
+        chunks = list(csv_export.iter_flight_csv(zone=4, start=start, end=end, chunk_rows=37))
+        rows = _parse(chunks)
+
+        expected = database.execute_query(
+            "SELECT timestamp, flight_id FROM runway_data WHERE zone = 4 "
+            "AND timestamp >= ? AND timestamp < ? ORDER BY timestamp, id",
+            (start.isoformat(), end.isoformat()), fetch_all=True,
+        )
+        assert rows[0] == csv_export.FLIGHT_COLUMNS
+        assert [(r[0], r[1]) for r in rows[1:]] == [tuple(r) for r in expected]
+        assert {r[3] for r in rows[1:]} == {"4"}
+        assert len(chunks) > 2
+
+    def test_aware_range_is_utc_and_half_open(self, db_path, tmp_path, monkeypatch):
+        """Test that aware bounds select [start, end) in UTC across archive and SQLite."""
+        monkeypatch.setattr(archive, "ARCHIVE_PATH", str(tmp_path / "archive"))
+        timestamps = [r[0] for r in database.execute_query(
+            "SELECT timestamp FROM runway_data ORDER BY timestamp, id", fetch_all=True
+        )]
+        first = next(ts for ts in timestamps if ts.startswith("2026-01-01T1"))
+        last = next(ts for ts in timestamps if ts.startswith("2026-01-03T1"))
+        assert archive.archive_old_data(older_than_days=2, now=datetime(2026, 1, 4)) > 0
+
+        plus_two = timezone(timedelta(hours=2))
+        start = datetime.fromisoformat(first).replace(tzinfo=timezone.utc).astimezone(plus_two)
+        end = datetime.fromisoformat(last).replace(tzinfo=timezone.utc).astimezone(plus_two)
+        rows = _parse(csv_export.iter_flight_csv(start=start, end=end, chunk_rows=100))[1:]
+
+        exported = [r[0] for r in rows]
+        assert exported == [ts for ts in timestamps if first <= ts < last]
+        assert exported[0] == first and last not in exported
+
+    def test_gzip_round_trip(self, db_path):
+        """Test that gzipped chunks decompress to the plain CSV."""
+        plain = b"".join(csv_export.iter_flight_csv(chunk_rows=100))
+        compressed = b"".join(csv_export.gzip_chunks(csv_export.iter_flight_csv(chunk_rows=100)))
+
+        assert gzip.decompress(compressed) == plain
+        assert len(compressed) < len(plain)
+
+
+class TestAlertExport:
+    """Tests for chunked alert exports."""
+
+    def test_alerts_match_in_memory_evaluation(self, db_path):
+        """Test that streamed alerts agree with get_active_alerts() on the same data."""
+        rows = _parse(csv_export.iter_alert_csv(severity="critical", chunk_rows=50))[1:]
+        expected = database.get_active_alerts(database.load_data(), severity="critical")
+
+        assert len(rows) == len(expected)
+        assert {r[1] for r in rows} == {a["flight_id"] for a in expected}
+        assert all(r[4] == "critical" and r[5].startswith("High stress") for r in rows)
+
+    def test_unknown_severity_rejected(self, db_path):
+        """Test that an unknown severity fails before any output."""
+        with pytest.raises(ValueError):
+            next(csv_export.iter_alert_csv(severity="urgent"))
+
+
+class TestExportEndpoints:
+    """Tests for the export routes and their role checks."""
+
+    def test_zone_export_streams_for_maintenance_only(self, db_path, monkeypatch):
+        """Test the gzipped zone download, a missing zone, and viewer rejection."""
+        from fastapi.testclient import TestClient
+        import main
+        from auth import AuthToken
+
+        def headers(role):
+            token = AuthToken.create_token(role, role)
+            return {"Authorization": f"Bearer {token}"}
+
+        client = TestClient(main.app)
+        response = client.get("/api/runway/zones/2/export?gzip=true", headers=headers("maintenance"))
+        assert response.status_code == 200
+        assert 'filename="zone_2.csv.gz"' in response.headers["content-disposition"]
+        rows = list(csv.reader(io.StringIO(gzip.decompress(response.content).decode("utf-8"))))
+        assert rows[0] == csv_export.FLIGHT_COLUMNS
+        assert {r[3] for r in rows[1:]} == {"2"}
+
+        assert client.get("/api/runway/zones/99/export", headers=headers("maintenance")).status_code == 404
+        assert client.get("/api/alerts/download", headers=headers("viewer")).status_code == 403
+        assert client.get("/api/alerts/download?severity=high", headers=headers("admin")).status_code == 200
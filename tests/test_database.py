@@ -0,0 +1,380 @@
+"""
+Pytest suite for the SmartZone-R backend data layer.
+
+Tests cover the shared dataset cache and the analytics helpers
+in backend/database.py against a temporary SQLite database.
+"""
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+# Add backend directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../backend"))
+
+import database
+import generate_data
+from dataset_cache import DatasetCache
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """Temporary runway database seeded with generated flights."""
+    path = str(tmp_path / "runway.db")
+    monkeypatch.setattr(generate_data, "DB_PATH", path)
+    monkeypatch.setattr(database, "DB_PATH", path)
+    generate_data.create_database()
+    generate_data.insert_data_to_db(generate_data.generate_flight_data())
+    return path
+
+
+class TestDatasetCache:
+    """Tests for the incremental dataset cache."""
+
+    def test_initial_load_matches_load_data(self, db_path):
+        """Test that the first access loads every row."""
+        cache = DatasetCache(min_refresh_seconds=0, max_staleness_seconds=3600)
+        df = cache.get()
+
+        assert len(df) == len(database.load_data())
+        assert cache.last_id == int(df["id"].max())
+        assert cache.get_stats()["full_reloads"] == 1
+
+    def test_incremental_refresh_appends_new_rows(self, db_path):
+        """Test that only rows with a higher id are appended."""
+        cache = DatasetCache(min_refresh_seconds=0, max_staleness_seconds=3600)
+        before = len(cache.get())
+
+        generate_data.insert_data_to_db(generate_data.generate_flight_data().head(5))
+        df = cache.get()
+        stats = cache.get_stats()
+
+        assert len(df) == before + 5
+        assert stats["full_reloads"] == 1
+        assert stats["incremental_refreshes"] == 1
+        assert stats["rows_appended"] == 5
+        assert df["id"].is_unique
+
+    def test_rows_inserted_during_refresh_are_not_duplicated(self, db_path, monkeypatch):
+        """Test that a row committed between the max id check and the delta load is appended once."""
+        cache = DatasetCache(min_refresh_seconds=0, max_staleness_seconds=3600)
+        before = len(cache.get())
+        generate_data.insert_data_to_db(generate_data.generate_flight_data().head(3))
+
+        load_rows_after = database.load_rows_after
+
+        def concurrent_insert(*args, **kwargs):
+            generate_data.insert_data_to_db(generate_data.generate_flight_data().head(2))
+            return load_rows_after(*args, **kwargs)
+
+        monkeypatch.setattr(database, "load_rows_after", concurrent_insert)
+        cache.get()
+        monkeypatch.setattr(database, "load_rows_after", load_rows_after)
+        df = cache.get()
+
+        assert len(df) == before + 5
+        assert df["id"].is_unique
+        assert cache.last_id == int(df["id"].max())
+
+    def test_requests_within_window_are_hits(self, db_path):
+        """Test that repeated access inside the refresh window skips SQLite."""
+        cache = DatasetCache(min_refresh_seconds=60, max_staleness_seconds=3600)
+        cache.get()
+
+        generate_data.insert_data_to_db(generate_data.generate_flight_data().head(5))
+        df = cache.get()
+
+        assert cache.get_stats()["hits"] == 1
+        assert df["id"].max() == cache.last_id
+
+    def test_recreated_table_triggers_full_reload(self, db_path):
+        """Test that a dropped and regenerated table is reloaded from scratch."""
+        cache = DatasetCache(min_refresh_seconds=0, max_staleness_seconds=3600)
+        cache.get()
+
+        generate_data.create_database()
+        generate_data.insert_data_to_db(generate_data.generate_flight_data().head(10))
+        df = cache.get()
+
+        assert len(df) == 10
+        assert cache.get_stats()["full_reloads"] == 2
+
+
+def _reference_alerts(df, thresholds):
+    """Row-by-row alert evaluation the vectorized engine must reproduce."""
+    alerts = []
+    for _, row in df.iterrows():
+        reasons = []
+        severity = "normal"
+        if row["stress"] > thresholds["stress"]:
+            reasons.append(f"High stress ({row['stress']:.0f}%)")
+            severity = "critical"
+        if row["rubber_mm"] > thresholds["rubber_mm"]:
+            reasons.append(f"Rubber buildup ({row['rubber_mm']:.1f}mm)")
+            if severity != "critical":
+                severity = "high"
+        if row["cracks_mm"] > thresholds["cracks_mm"]:
+            reasons.append(f"Surface cracks ({row['cracks_mm']:.1f}mm)")
+            if severity == "normal":
+                severity = "medium"
+        if row["water_mm"] > thresholds["water_mm"]:
+            reasons.append(f"Water accumulation ({row['water_mm']:.1f}mm)")
+            if severity == "normal":
+                severity = "medium"
+        if row["fod_weight_g"] > thresholds["fod_weight_g"]:
+            reasons.append(f"FOD detected ({row['fod_weight_g']:.0f}g)")
+            if severity == "normal":
+                severity = "high"
+        if row["anomaly"] > 0:
+            reasons.append("Anomaly detected")
+            if severity == "normal":
+                severity = "medium"
+        if reasons:
+            alerts.append((str(row["flight_id"]), severity, reasons))
+    rank = {"critical": 0, "high": 1, "medium": 2, "normal": 3}
+    return sorted(alerts, key=lambda a: rank[a[1]])
+
+
+class TestAlertEngine:
+    """Tests for the columnar alert evaluator."""
+
+    # Loose thresholds so every severity branch is exercised
+    THRESHOLDS = {"stress": 80, "rubber_mm": 10, "cracks_mm": 12, "water_mm": 1, "fod_weight_g": 40}
+
+    def test_matches_row_by_row_evaluation(self, db_path):
+        """Test severity, reasons and ordering against the reference loop."""
+        df = database.load_data()
+        expected = _reference_alerts(df, self.THRESHOLDS)
+        alerts = database.get_active_alerts(df, self.THRESHOLDS)
+
+        assert [(a["flight_id"], a["severity"], a["reasons"]) for a in alerts] == expected
+
+    def test_pagination_and_severity_filter(self, db_path):
+        """Test that limit/offset slice the same ordering as the full list."""
+        df = database.load_data()
+        full = database.get_active_alerts(df, self.THRESHOLDS)
+        page = database.get_active_alerts(df, self.THRESHOLDS, limit=7, offset=3)
+        critical = database.get_active_alerts(df, self.THRESHOLDS, severity="critical")
+
+        assert page == full[3:10]
+        assert critical == [a for a in full if a["severity"] == "critical"]
+
+    def test_first_page_is_most_severe(self, db_path):
+        """Test that a limited page starts with the critical alerts."""
+        df = database.load_data()
+        full = database.get_active_alerts(df, self.THRESHOLDS)
+        first = database.get_active_alerts(df, self.THRESHOLDS, limit=5)
+        ranks = [database.SEVERITY_LEVELS.index(a["severity"]) for a in full]
+
+        assert ranks == sorted(ranks)
+        assert first == full[:5]
+        assert first[0]["severity"] == "critical"
+
+    def test_counts_match_materialized_alerts(self, db_path):
+        """Test severity and per-zone counts without building records."""
+        df = database.load_data()
+        full = database.get_active_alerts(df, self.THRESHOLDS)
+        counts = database.get_alert_counts(df, self.THRESHOLDS)
+        by_zone = database.get_alert_counts_by_zone(df, self.THRESHOLDS)
+
+        assert counts["total"] == len(full)
+        for level in database.SEVERITY_LEVELS:
+            assert counts[level] == len([a for a in full if a["severity"] == level])
+        assert sum(by_zone.values()) == len(full)
+        assert set(by_zone) == set(int(z) for z in df["zone"].unique())
+
+
+class TestSqlQueryLayer:
+    """Tests for the SQLite pushdown queries."""
+
+    def test_recent_flights_match_pandas(self, db_path):
+        """Test ORDER BY/LIMIT results against the DataFrame implementation."""
+        df = database.load_data()
+
+        assert database.query_recent_flights(n=1) == database.get_recent_flights(df, n=1)
+        sql_zone = database.query_recent_flights(n=5, zone=3)
+        assert [f["zone"] for f in sql_zone] == [3] * len(sql_zone)
+        assert [f["timestamp"] for f in sql_zone] == \
+            [f["timestamp"] for f in database.get_flights_by_zone(df, 3, n=5)]
+
+    def test_grouped_aggregates_match_pandas(self, db_path):
+        """Test GROUP BY zone summaries and heatmap against per-zone pandas scans."""
+        df = database.load_data()
+
+        sql_summary = database.query_zone_summary()
+        pandas_summary = database.get_zone_summary(df)
+        assert [z["zone"] for z in sql_summary] == [z["zone"] for z in pandas_summary]
+        for sql_zone, pandas_zone in zip(sql_summary, pandas_summary):
+            assert sql_zone["flight_count"] == pandas_zone["flight_count"]
+            assert sql_zone["avg_stress"] == pytest.approx(pandas_zone["avg_stress"], abs=0.011)
+            assert sql_zone["max_stress"] == pytest.approx(pandas_zone["max_stress"], abs=0.011)
+        sql_heatmap = database.query_heatmap_data()
+        pandas_heatmap = database.get_heatmap_data(df)
+        assert sql_heatmap["zones"] == pandas_heatmap["zones"]
+        assert sql_heatmap["metrics"] == pandas_heatmap["metrics"]
+        for sql_row, pandas_row in zip(sql_heatmap["data"], pandas_heatmap["data"]):
+            assert sql_row == pytest.approx(pandas_row, abs=0.11)
+
+    def test_latest_flight_uses_timestamp_index(self, db_path):
+        """Test that the top-N query is answered from the timestamp index."""
+        database.ensure_indexes()
+        with database.get_db_connection() as conn:
+            plan = conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM runway_data "
+                "ORDER BY timestamp DESC, id DESC LIMIT 1"
+            ).fetchall()
+
+        assert any("idx_runway_data_timestamp" in row[-1] for row in plan)
+
+
+class TestZoneAggregates:
+    """Tests for the shared single-pass zone aggregates."""
+
+    def test_groupby_matches_per_zone_means(self, db_path):
+        """Test groupby aggregates against a direct per-zone scan."""
+        df = database.load_data()
+        summaries = database.get_zone_summary(df)
+
+        for summary in summaries:
+            zone_data = df[df["zone"] == summary["zone"]]
+            assert summary["avg_stress"] == pytest.approx(zone_data["stress"].mean(), abs=0.006)
+            assert summary["flight_count"] == len(zone_data)
+            assert summary["anomaly_count"] == int(zone_data["anomaly"].sum())
+
+    def test_overall_means_match_dataset(self, db_path):
+        """Test whole-runway means recombined from per-zone sums."""
+        df = database.load_data()
+        overall = database.summarize_overall(database.compute_zone_aggregates(df))
+
+        assert overall["total_flights"] == len(df)
+        assert overall["avg_stress"] == pytest.approx(df["stress"].mean())
+        assert overall["avg_humidity_pct"] == pytest.approx(df["humidity_pct"].mean())
+
+    def test_derived_value_computed_once_per_version(self, db_path):
+        """Test that derived aggregates are shared until new rows arrive."""
+        cache = DatasetCache(min_refresh_seconds=0, max_staleness_seconds=3600)
+        calls = []
+
+        def compute(df):
+            calls.append(len(df))
+            return database.compute_zone_aggregates(df)
+
+        first = cache.derive("zone_aggregates", compute)
+        second = cache.derive("zone_aggregates", compute)
+        generate_data.insert_data_to_db(generate_data.generate_flight_data().head(5))
+        third = cache.derive("zone_aggregates", compute)
+
+        assert first is second
+        assert len(calls) == 2
+        assert int(third["flight_count"].sum()) == calls[-1]
+
+    def test_concurrent_derive_misses_compute_once(self, db_path):
+        """Test that simultaneous misses for one derived value share a single computation."""
+        import time
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+
+        cache = DatasetCache(min_refresh_seconds=3600, max_staleness_seconds=3600)
+        cache.get()
+        barrier = threading.Barrier(8)
+        calls = []
+
+        def compute(df):
+            calls.append(len(df))
+            time.sleep(0.05)
+            return database.compute_zone_aggregates(df)
+
+        def derive(_):
+            barrier.wait()
+            return cache.derive("zone_aggregates", compute)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(derive, range(8)))
+
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
+        assert cache.get_stats()["derived_coalesced"] == 7
+
+
+@pytest.fixture
+def history():
+    """Two weeks of generated readings across all zones."""
+    from datetime import datetime
+    import numpy as np
+    import pandas as pd
+
+    df = generate_data.generate_flight_batch(
+        20_000, datetime(2026, 1, 1), datetime(2026, 1, 15), np.random.default_rng(11)
+    )
+    df["timestamp"] = pd.to_datetime(df["timestamp"])
+    return df
+
+
+class TestTimeSeriesDownsampling:
+    """Tests for bucketed and LTTB time series."""
+
+    def test_buckets_share_one_axis_within_budget(self, history):
+        """Test that every zone series is aligned to the same bounded label axis."""
+        data = database.get_time_series(history, "stress", max_points=200)
+
+        assert len(data["labels"]) == 200
+        assert len(data["datasets"]) == history["zone"].nunique()
+        for dataset in data["datasets"]:
+            assert len(dataset["data"]) == len(dataset["min"]) == len(dataset["max"]) == 200
+            for lo, mean, hi in zip(dataset["min"], dataset["data"], dataset["max"]):
+                if mean is not None:
+                    assert lo <= mean <= hi
+
+    def test_bucket_mean_matches_raw_rows(self, history):
+        """Test one bucket's min/mean/max against the raw readings it covers."""
+        import pandas as pd
+
+        data = database.get_time_series(history, "stress", zone=4, max_points=50)
+        width = pd.Timedelta(seconds=data["bucket_seconds"])
+        first = pd.Timestamp(data["labels"][0])
+        raw = history[(history["zone"] == 4) & (history["timestamp"] < first + width)]["stress"]
+
+        dataset = data["datasets"][0]
+        assert dataset["data"][0] == pytest.approx(raw.mean(), abs=0.01)
+        assert dataset["min"][0] == raw.min()
+        assert dataset["max"][0] == raw.max()
+
+    def test_small_range_keeps_raw_timestamps(self, history):
+        """Test that ranges under the budget return exact points without bucketing."""
+        from datetime import datetime
+
+        data = database.get_time_series(
+            history, "stress", zone=2, start=datetime(2026, 1, 3), end=datetime(2026, 1, 3, 6)
+        )
+        raw = history[(history["zone"] == 2) & history["timestamp"].between("2026-01-03", "2026-01-03 06:00")]
+
+        assert data["bucket_seconds"] is None
+        assert len(data["labels"]) == raw["timestamp"].nunique()
+
+    def test_timezone_aware_bounds_match_naive_utc(self, history):
+        """Test that Z/+00:00 bounds select the same rows as naive UTC bounds."""
+        from datetime import datetime, timezone
+
+        naive = database.get_time_series(
+            history, "stress", zone=2, start=datetime(2026, 1, 3), end=datetime(2026, 1, 3, 6)
+        )
+        aware = database.get_time_series(
+            history, "stress", zone=2, start="2026-01-03T00:00:00Z",
+            end=datetime(2026, 1, 3, 6, tzinfo=timezone.utc)
+        )
+
+        assert aware == naive
+        assert len(aware["labels"]) > 0
+
+    def test_lttb_keeps_endpoints_and_extremes(self, history):
+        """Test that LTTB stays within budget and keeps the first, last and peak points."""
+        zone = history[history["zone"] == 7].sort_values("timestamp")
+        data = database.get_time_series(history, "stress", zone=7, max_points=100, method="lttb")
+        points = data["datasets"][0]["data"]
+
+        assert len(points) == 100
+        assert points[0]["x"] == zone["timestamp"].iloc[0].isoformat()
+        assert points[-1]["x"] == zone["timestamp"].iloc[-1].isoformat()
+        assert min(p["y"] for p in points) == zone["stress"].min()
@@ -0,0 +1,118 @@
+"""
+Pytest suite for the SmartZone-R SQLite connection pool.
+
+Tests cover per-thread reader reuse, tuned pragmas, the serialized writer,
+stray-transaction cleanup and reopening a replaced database file.
+"""
+import os
+import sys
+import time
+import sqlite3
+import threading
+
+import pytest
+
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+# Add backend directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../backend"))
+
+import db_pool
+from db_pool import ConnectionPool
+
+
+@pytest.fixture
+def pool(tmp_path):
+    """Pool over a small database with one table."""
+    path = str(tmp_path / "pool.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, v TEXT)")
+    conn.commit()
+    conn.close()
+    pool = ConnectionPool(path)
+    yield pool
+    pool.close()
+
+
+def _reader_in_thread(pool) -> sqlite3.Connection:
+    result = []
+
+    def run():
+        with pool.reader() as conn:
+            result.append(conn)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+class TestConnectionPool:
+    """Tests for pooled reader/writer connections."""
+
+    def test_reader_reused_per_thread_with_pragmas(self, pool):
+        """Test that a thread gets the same tuned connection on every checkout."""
+        with pool.reader() as first:
+            pass
+        with pool.reader() as second:
+            mmap_size = second.execute("PRAGMA mmap_size").fetchone()[0]
+            temp_store = second.execute("PRAGMA temp_store").fetchone()[0]
+
+        assert first is second
+        assert _reader_in_thread(pool) is not first
+        assert mmap_size == db_pool.SQLITE_MMAP_SIZE
+        assert temp_store == 2  # MEMORY
+        assert pool.get_stats()["connects"] == 2
+
+    def test_writer_enables_wal_and_serializes(self, pool):
+        """Test that the writer runs in WAL mode and concurrent writers wait their turn."""
+        inside = []
+
+        def write(value):
+            with pool.writer() as conn:
+                inside.append(value)
+                assert len(inside) == 1
+                conn.execute("INSERT INTO t (v) VALUES (?)", (value,))
+                conn.commit()
+                time.sleep(0.05)
+                inside.remove(value)
+
+        threads = [threading.Thread(target=write, args=(str(i),)) for i in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with pool.reader() as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 3
+
+        stats = pool.get_stats()
+        assert stats["writer_checkouts"] == 3
+        assert stats["writer_wait_ms_max"] >= 40
+        assert stats["open_connections"] == 2
+
+    def test_uncommitted_work_is_rolled_back_on_release(self, pool):
+        """Test that a checkout never leaks an open transaction to the next user."""
+        with pool.writer() as conn:
+            conn.execute("INSERT INTO t (v) VALUES ('lost')")
+        with pool.writer() as conn:
+            assert not conn.in_transaction
+            assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+
+    def test_replaced_database_is_reopened(self, pool):
+        """Test that pooled connections follow a database file that was recreated."""
+        with pool.reader() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+
+        replacement = pool.db_path + ".new"
+        conn = sqlite3.connect(replacement)
+        conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, v TEXT)")
+        conn.execute("INSERT INTO t (v) VALUES ('fresh')")
+        conn.commit()
+        conn.close()
+        os.replace(replacement, pool.db_path)
+
+        with pool.reader() as conn:
+            assert conn.execute("SELECT v FROM t").fetchone()[0] == "fresh"
+        assert pool.get_stats()["reconnects"] == 1
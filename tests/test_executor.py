@@ -0,0 +1,98 @@
+"""
+Pytest suite for the SmartZone-R blocking-work executor.
+
+Tests cover off-loop execution, the pending-call bound, streaming
+iterators and the event-loop lag monitor.
+"""
+import os
+import sys
+import time
+import asyncio
+import threading
+
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+# Add backend directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../backend"))
+
+from executor import BlockingExecutor, LoopLagMonitor, iterate_blocking
+
+
+class TestBlockingExecutor:
+    """Tests for the bounded DB executor."""
+
+    def test_runs_off_the_loop_thread(self):
+        """Test that blocking calls run on a pool thread, not the event loop."""
+        executor = BlockingExecutor(workers=2, max_pending=4)
+
+        async def scenario():
+            return await executor.run(lambda: threading.current_thread().name)
+
+        try:
+            name = asyncio.run(scenario())
+        finally:
+            executor.shutdown()
+
+        assert name.startswith("smartzone-db")
+        assert name != threading.main_thread().name
+        assert executor.get_stats()["completed"] == 1
+
+    def test_max_pending_bounds_in_flight_calls(self):
+        """Test that no more than max_pending calls are submitted at once."""
+        executor = BlockingExecutor(workers=4, max_pending=2)
+
+        async def scenario():
+            await asyncio.gather(*(executor.run(time.sleep, 0.05) for _ in range(6)))
+
+        try:
+            asyncio.run(scenario())
+        finally:
+            executor.shutdown()
+
+        stats = executor.get_stats()
+        assert stats["completed"] == 6
+        assert stats["max_pending_seen"] == 2
+        assert stats["waited_for_slot"] > 0
+        assert stats["pending"] == 0
+
+    def test_iterate_blocking_closes_abandoned_iterator(self):
+        """Test that a consumer stopping early closes the underlying generator."""
+        closed = []
+
+        def rows():
+            try:
+                for i in range(100):
+                    yield i
+            finally:
+                closed.append(True)
+
+        async def scenario():
+            stream = iterate_blocking(rows())
+            items = [await stream.__anext__() for _ in range(3)]
+            await stream.aclose()
+            return items
+
+        assert asyncio.run(scenario()) == [0, 1, 2]
+        assert closed == [True]
+
+
+class TestLoopLagMonitor:
+    """Tests for event-loop stall detection."""
+
+    def test_blocking_callback_is_counted(self):
+        """Test that a callback blocking past the threshold is recorded as a stall."""
+        monitor = LoopLagMonitor(interval=0.01, threshold_ms=50)
+
+        async def scenario():
+            monitor.start()
+            await asyncio.sleep(0.05)
+            time.sleep(0.2)  # Deliberately block the loop
+            await asyncio.sleep(0.05)
+            await monitor.stop()
+
+        asyncio.run(scenario())
+
+        stats = monitor.get_stats()
+        assert stats["stalls"] >= 1
+        assert stats["max_lag_ms"] >= 100
+        assert stats["samples"] > 1
@@ -0,0 +1,56 @@
+"""
+Pytest suite for the SmartZone-R fast JSON response path.
+
+Tests check NumPy-aware encoding and that bulk list routes keep their
+response schemas in OpenAPI while bypassing per-item validation.
+"""
+import os
+import sys
+import json
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+# Add backend directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../backend"))
+
+import fast_json
+from fast_json import FastJSONResponse
+
+
+class TestFastJSON:
+    """Tests for FastJSONResponse encoding and route wiring."""
+
+    def test_numpy_and_timestamps_encoded(self, monkeypatch):
+        """Test that NumPy scalars/arrays, timestamps and NaN encode with and without orjson."""
+        content = {
+            "zone": np.int64(3), "stress": np.float64(91.5), "values": np.array([1.5, 2.0]),
+            "flag": np.bool_(True), "at": pd.Timestamp("2026-01-01T10:00:00"),
+            "seen": datetime(2026, 1, 1, 10), "missing": None,
+            "nan": float("nan"), "inf": np.float64("inf"), "nan32": np.float32("nan"),
+            "series": [{"min": np.nan, "max": 2.5}], "gaps": np.array([1.0, np.nan, -np.inf]),
+        }
+        expected = {
+            "zone": 3, "stress": 91.5, "values": [1.5, 2.0], "flag": True,
+            "at": "2026-01-01T10:00:00", "seen": "2026-01-01T10:00:00", "missing": None,
+            "nan": None, "inf": None, "nan32": None,
+            "series": [{"min": None, "max": 2.5}], "gaps": [1.0, None, None],
+        }
+        assert json.loads(FastJSONResponse(content).body) == expected
+
+        monkeypatch.setattr(fast_json, "orjson", None)
+        assert json.loads(FastJSONResponse(content).body) == expected
+
+    def test_bulk_routes_keep_openapi_schema(self):
+        """Test that fast list routes still document their item models."""
+        import main
+
+        paths = main.app.openapi()["paths"]
+        for path, model in [("/api/flights", "FlightRecord"), ("/api/alerts", "AlertRecord"),
+                            ("/api/alerts/critical", "AlertRecord")]:
+            schema = paths[path]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+            assert schema["type"] == "array"
+            assert schema["items"]["$ref"].endswith(f"/{model}")
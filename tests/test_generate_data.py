@@ -0,0 +1,112 @@
+"""
+Pytest suite for the SmartZone-R synthetic data generator.
+
+Tests cover the vectorized batch generator and the streaming,
+multi-process history writer used for large load-test datasets.
+"""
+import os
+import sys
+import sqlite3
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+# Add backend directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../backend"))
+
+import generate_data
+
+START = datetime(2026, 1, 1)
+END = datetime(2026, 1, 31)
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """Temporary empty runway database."""
+    path = str(tmp_path / "runway.db")
+    monkeypatch.setattr(generate_data, "DB_PATH", path)
+    generate_data.create_database()
+    return path
+
+
+def _fetch(db_path, sql):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+class TestFlightBatch:
+    """Tests for vectorized batch generation."""
+
+    def test_seeded_batch_is_reproducible(self):
+        """Test that the same seed yields identical rows."""
+        first = generate_data.generate_flight_batch(500, START, END, np.random.default_rng(3))
+        second = generate_data.generate_flight_batch(500, START, END, np.random.default_rng(3))
+
+        assert first.equals(second)
+        assert list(first.columns) == generate_data.RUNWAY_COLUMNS
+
+    def test_values_within_physical_bounds(self):
+        """Test clamping, time range, and the anomaly rule."""
+        df = generate_data.generate_flight_batch(5000, START, END, np.random.default_rng(1))
+
+        assert df["timestamp"].is_monotonic_increasing
+        assert df["timestamp"].min() >= START.isoformat()
+        assert df["timestamp"].max() < END.isoformat()
+        assert df["stress"].between(0, 100).all()
+        assert df["rubber_mm"].between(0.5, 20).all()
+        assert df["zone"].between(1, generate_data.NUM_ZONES).all()
+        assert df["flight_id"].str.match(r"^[0-9A-Z]{2}\d{4}$").all()
+
+        expected = (df["stress"] > 75) | (df["rubber_mm"] < 2) | (df["cracks_mm"] > 20) | (df["fod_weight_g"] > 1000)
+        # Anomalies are computed before rounding, so allow boundary rows only
+        assert (df["anomaly"].astype(bool) != expected).sum() <= 5
+
+
+class TestHistoryWriter:
+    """Tests for chunked and partitioned writes."""
+
+    def test_chunked_write_in_time_order(self, db_path):
+        """Test that chunked executemany writes every row in timestamp order."""
+        written = generate_data.generate_history(2500, START, END, seed=5, chunk_size=400)
+
+        assert written == 2500
+        count, min_ts, max_ts = _fetch(db_path, "SELECT COUNT(*), MIN(timestamp), MAX(timestamp) FROM runway_data")[0]
+        assert count == 2500
+        assert START.isoformat() <= min_ts and max_ts < END.isoformat()
+        timestamps = [row[0] for row in _fetch(db_path, "SELECT timestamp FROM runway_data ORDER BY id")]
+        assert timestamps == sorted(timestamps)
+
+    def test_partitioned_write_matches_across_runs(self, db_path, tmp_path):
+        """Test that worker partitions are reproducible and indexes are rebuilt."""
+        generate_data.generate_history(3000, START, END, seed=9, workers=3, chunk_size=500)
+
+        other = str(tmp_path / "other.db")
+        generate_data.create_database(other)
+        generate_data.generate_history(3000, START, END, seed=9, workers=3, chunk_size=500, db_path=other)
+
+        query = "SELECT timestamp, flight_id, zone, stress FROM runway_data ORDER BY id"
+        rows = _fetch(db_path, query)
+        assert len(rows) == 3000
+        assert rows == _fetch(other, query)
+        assert [r[0] for r in rows] == sorted(r[0] for r in rows)
+
+        indexes = {row[0] for row in _fetch(db_path, "SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert set(generate_data.RUNWAY_INDEXES) <= indexes
+        assert not [p for p in os.listdir(tmp_path) if p.startswith("smartzone_gen_")]
+
+    def test_failed_load_restores_indexes(self, db_path, monkeypatch):
+        """Test that indexes dropped for the load are rebuilt when the load raises."""
+        def broken_write(*args, **kwargs):
+            raise sqlite3.OperationalError("disk I/O error")
+
+        monkeypatch.setattr(generate_data, "write_flight_rows", broken_write)
+
+        with pytest.raises(sqlite3.OperationalError):
+            generate_data.generate_history(100, START, END, seed=1)
+
+        indexes = {row[0] for row in _fetch(db_path, "SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert set(generate_data.RUNWAY_INDEXES) <= indexes
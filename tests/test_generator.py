@@ -1,274 +0,0 @@
-"""
-Pytest suite for SmartZone-R simulator test cases.
-
-Tests cover flight generation, aircraft selection, zone assignment,
-weather generation, and maintenance prediction logic.
-"""
-import pytest
-import sys
-import os
-from datetime import datetime, timedelta
-import re
-
-# Add software directory to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../software/simulator"))
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../software/dashboard"))
-
-from flights import generate_flight_id, pick_aircraft, assign_zone
-from generator import simulate_flight, simulate_day
-from weather import generate_weather
-from config import AIRCRAFT_TYPES, NUM_ZONES, THRESHOLDS
-from pages.alerts import categorize_thresholds
-import pandas as pd
-
-# Import utils (for the dashboard)
-# Add dashboard to path if needed
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../software/dashboard"))
-
-
-class TestFlightGeneration:
-    """Tests for flight generation logic."""
-    
-    def test_flight_id_format(self):
-        """Test that flight ID matches FL#### pattern."""
-        for _ in range(100):  # Test multiple samples
-            flight_id = generate_flight_id()
-            assert re.match(r"^FL\d{4}$", flight_id), f"Invalid flight ID format: {flight_id}"
-            assert 1000 <= int(flight_id[2:]) <= 9999
-    
-    def test_aircraft_types(self):
-        """Test that picked aircraft is in AIRCRAFT_TYPES."""
-        valid_aircraft = list(AIRCRAFT_TYPES.keys())
-        for _ in range(50):
-            aircraft = pick_aircraft()
-            assert aircraft in valid_aircraft, f"Aircraft {aircraft} not in {valid_aircraft}"
-    
-    def test_zone_range(self):
-        """Test that zone is between 1 and NUM_ZONES."""
-        for _ in range(50):
-            zone = assign_zone()
-            assert 1 <= zone <= NUM_ZONES, f"Zone {zone} out of valid range [1, {NUM_ZONES}]"
-
-
-class TestWeatherSimulation:
-    """Tests for weather generation logic."""
-    
-    def test_weather_monsoon(self):
-        """
-        Test that monsoon months return higher rain_mm on average.
-        
-        Monsoon months (May-October) should have higher average rainfall.
-        """
-        # Dry months (e.g., January)
-        dry_samples = [generate_weather(month=1) for _ in range(100)]
-        dry_rain_avg = sum(w["rain_mm"] for w in dry_samples) / len(dry_samples)
-        
-        # Monsoon months (e.g., August)
-        monsoon_samples = [generate_weather(month=8) for _ in range(100)]
-        monsoon_rain_avg = sum(w["rain_mm"] for w in monsoon_samples) / len(monsoon_samples)
-        
-        # Monsoon should have higher average rain
-        assert monsoon_rain_avg > dry_rain_avg, \
-            f"Monsoon avg rain ({monsoon_rain_avg:.2f}) should be > dry avg ({dry_rain_avg:.2f})"
-    
-    def test_weather_month_parameter(self):
-        """Test that weather generation respects month parameter."""
-        for month in range(1, 13):
-            weather = generate_weather(month=month)
-            assert isinstance(weather, dict)
-            assert all(key in weather for key in 
-                      ["temperature_C", "humidity_pct", "rain_mm", "wind_speed_mps", "wind_direction_deg"])
-            assert all(isinstance(weather[k], (int, float)) for k in weather)
-
-
-class TestFlightSimulation:
-    """Tests for flight simulation output."""
-    
-    def test_simulate_flight_returns_correct_columns(self):
-        """Test that simulate_flight returns correct tuple structure (13 elements)."""
-        timestamp = datetime(2025, 9, 5, 12, 0)
-        result = simulate_flight(timestamp)
-        
-        # Check tuple has 13 elements
-        assert isinstance(result, tuple), "simulate_flight should return tuple"
-        assert len(result) == 13, f"Expected 13 elements, got {len(result)}"
-        
-        # Check types
-        assert isinstance(result[0], str), f"timestamp should be str, got {type(result[0])}"  # timestamp
-        assert isinstance(result[1], str), f"flight_id should be str, got {type(result[1])}"  # flight_id
-        assert isinstance(result[2], str), f"aircraft should be str, got {type(result[2])}"  # aircraft
-        assert isinstance(result[3], int), f"zone should be int, got {type(result[3])}"  # zone
-        assert isinstance(result[4], float), f"rubber_mm should be float, got {type(result[4])}"  # rubber_mm
-        assert isinstance(result[5], float), f"cracks_mm should be float, got {type(result[5])}"  # cracks_mm
-        assert isinstance(result[6], float), f"water_mm should be float, got {type(result[6])}"  # water_mm
-        assert isinstance(result[7], float), f"stress should be float, got {type(result[7])}"  # stress
-        assert isinstance(result[8], float), f"fod_weight_g should be float, got {type(result[8])}"  # fod_weight_g
-        assert isinstance(result[9], float), f"temperature_C should be float, got {type(result[9])}"  # temperature_C
-        assert isinstance(result[10], float), f"humidity_pct should be float, got {type(result[10])}"  # humidity_pct
-        assert isinstance(result[11], float), f"rain_mm should be float, got {type(result[11])}"  # rain_mm
-        assert isinstance(result[12], int), f"anomaly should be int, got {type(result[12])}"  # anomaly
-    
-    def test_anomaly_flag(self):
-        """
-        Test anomaly detection by manually setting high stress.
-        
-        When metrics exceed thresholds, anomaly flag should be 1.
-        """
-        # Create a scenario that should trigger anomaly
-        # We can't directly control metrics, but we can check if anomalies are detected
-        
-        timestamp = datetime(2025, 9, 5, 12, 0)
-        
-        # Run many flights to likely trigger an anomaly
-        anomalies_detected = 0
-        for _ in range(50):
-            result = simulate_flight(timestamp)
-            if result[12] == 1:  # anomaly flag
-                anomalies_detected += 1
-        
-        # With enough samples, we should detect at least some anomalies
-        assert anomalies_detected > 0, "No anomalies detected in 50 flights (should have some)"
-
-
-class TestDaySimulation:
-    """Tests for multi-flight day simulation."""
-    
-    def test_stress_cap(self):
-        """
-        Test that stress values never exceed THRESHOLDS["stress"] * 2.
-        """
-        start_time = datetime(2025, 9, 5, 0, 0)
-        flights = simulate_day(start_time=start_time, interval_minutes=30)
-        
-        max_stress = THRESHOLDS["stress"] * 2
-        
-        for flight in flights:
-            stress = flight[7]  # stress is at index 7
-            assert stress <= max_stress, \
-                f"Stress {stress} exceeds maximum {max_stress}"
-    
-    def test_rubber_never_negative(self):
-        """Test that rubber_mm values never go negative."""
-        start_time = datetime(2025, 9, 5, 0, 0)
-        flights = simulate_day(start_time=start_time, interval_minutes=30)
-        
-        for flight in flights:
-            rubber_mm = flight[4]  # rubber_mm is at index 4
-            assert rubber_mm >= 0, f"Rubber thickness went negative: {rubber_mm}"
-
-
-class TestAlertsThresholds:
-    """Tests for alert categorization logic."""
-    
-    def test_categorize_thresholds(self):
-        """
-        Test alert severity categorization with synthetic data covering all levels.
-        
-        Create test data with known severity levels and verify categorization.
-        """
-        # Create synthetic dataframe
-        test_data = {
-            "timestamp": [datetime.now()] * 4,
-            "flight_id": ["FL0001", "FL0002", "FL0003", "FL0004"],
-            "aircraft": ["A320", "B738", "ATR72", "A321"],
-            "zone": [1, 2, 3, 4],
-            "rubber_mm": [0.5, 2.5, 5.0, 15.0],  # Very low, low, normal, ok
-            "cracks_mm": [10.0, 4.0, 2.0, 1.0],  # High, high, normal, ok
-            "water_mm": [5.0, 8.0, 5.0, 2.0],    # Normal
-            "stress": [200.0, 120.0, 70.0, 30.0],  # Very high, high, medium, ok
-            "fod_weight_g": [200.0, 60.0, 30.0, 10.0],  # Very high, high, ok, ok
-            "temperature_C": [25.0, 25.0, 25.0, 25.0],
-            "humidity_pct": [70.0, 70.0, 70.0, 70.0],
-            "rain_mm": [1.0, 1.0, 1.0, 1.0],
-            "anomaly": [1, 1, 0, 0]
-        }
-        df = pd.DataFrame(test_data)
-        
-        # Apply categorization
-        severity_df = categorize_thresholds(df, THRESHOLDS)
-        
-        # Verify all severity levels are present
-        assert "severity" in severity_df.columns
-        severities = severity_df["severity"].unique()
-        
-        # Should have at least Critical and Normal
-        assert "Critical" in severities or "High" in severities, "High/Critical not detected"
-        assert "Normal" in severities or "Medium" in severities, "Normal/Medium not detected"
-
-
-class TestDataValidation:
-    """Tests for data validation utilities."""
-    
-    def test_validate_dataframe(self):
-        """
-        Test the validate_dataframe function from utils.
-        
-        Check that it properly handles nulls and out-of-range values.
-        """
-        # This test requires importing utils with Streamlit mocking
-        # We'll create a simple validation test
-        
-        test_data = {
-            "timestamp": [datetime.now(), None, datetime.now()],
-            "flight_id": ["FL0001", "FL0002", "FL0003"],
-            "aircraft": ["A320", "B738", "ATR72"],
-            "zone": [1, 2, 3],
-            "rubber_mm": [5.0, -1.0, 25.0],  # One negative, one too high
-            "cracks_mm": [1.0, 2.0, 3.0],
-            "water_mm": [1.0, 2.0, 3.0],
-            "stress": [50.0, 100.0, 150.0],
-            "fod_weight_g": [10.0, 20.0, 30.0],
-            "temperature_C": [25.0, 30.0, 35.0],
-            "humidity_pct": [70.0, 75.0, 80.0],
-            "rain_mm": [1.0, 2.0, 3.0],
-            "anomaly": [0, 0, 1]
-        }
-        df = pd.DataFrame(test_data)
-        
-        # Basic validation: check that negative rubber is caught
-        assert (df["rubber_mm"] >= 0).all() == False, "Should have negative values before validation"
-        
-        # After validation (manual clip for this test)
-        df_validated = df.copy()
-        df_validated["rubber_mm"] = df_validated["rubber_mm"].clip(0, 20)
-        
-        # All should be valid now
-        assert (df_validated["rubber_mm"] >= 0).all()
-        assert (df_validated["rubber_mm"] <= 20).all()
-
-
-class TestEdgeCases:
-    """Tests for edge cases and error handling."""
-    
-    def test_empty_zone_assignment(self):
-        """Test that zone assignment always returns valid zones."""
-        zones = set()
-        for _ in range(100):
-            zone = assign_zone()
-            zones.add(zone)
-        
-        # Should have at least one zone and all should be valid
-        assert len(zones) > 0
-        assert all(1 <= z <= NUM_ZONES for z in zones)
-    
-    def test_weather_consistency(self):
-        """Test that weather values are within reasonable ranges."""
-        for month in [1, 6, 12]:  # Test different months
-            weather = generate_weather(month=month)
-            
-            # Temperature should be reasonable
-            assert -50 < weather["temperature_C"] < 60
-            
-            # Humidity should be 0-100
-            assert 0 <= weather["humidity_pct"] <= 100
-            
-            # Rain should be non-negative
-            assert weather["rain_mm"] >= 0
-            
-            # Wind should be non-negative
-            assert weather["wind_speed_mps"] >= 0
-            assert 0 <= weather["wind_direction_deg"] <= 360
-
-
-if __name__ == "__main__":
-    pytest.main([__file__, "-v"])
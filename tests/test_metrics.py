@@ -0,0 +1,87 @@
+"""
+Pytest suite for the SmartZone-R Prometheus metrics.
+
+Tests cover histogram buckets, the text exposition format, scrape-time
+collectors and per-route HTTP timing.
+"""
+import os
+import sys
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+# Add backend directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../backend"))
+
+import metrics
+from metrics import Counter, Histogram
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Empty metric and collector registry."""
+    monkeypatch.setattr(metrics, "_metrics", [])
+    monkeypatch.setattr(metrics, "_collectors", [])
+
+
+def _sample_lines(text: str) -> dict:
+    return dict(line.rsplit(" ", 1) for line in text.splitlines() if not line.startswith("#"))
+
+
+class TestMetrics:
+    """Tests for counters, histograms and rendering."""
+
+    def test_histogram_buckets_are_cumulative(self, registry):
+        """Test that observations land in le-inclusive buckets and render cumulatively."""
+        latency = metrics.histogram("test_latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            latency.observe(value, ("/a",))
+
+        samples = _sample_lines(metrics.render_metrics())
+        assert samples['test_latency_seconds_bucket{route="/a",le="0.1"}'] == "2"
+        assert samples['test_latency_seconds_bucket{route="/a",le="1.0"}'] == "3"
+        assert samples['test_latency_seconds_bucket{route="/a",le="+Inf"}'] == "4"
+        assert samples['test_latency_seconds_count{route="/a"}'] == "4"
+        assert float(samples['test_latency_seconds_sum{route="/a"}']) == pytest.approx(3.65)
+
+    def test_collectors_render_and_failures_are_skipped(self, registry):
+        """Test that collector samples are typed, labelled and a failing collector is ignored."""
+        counter = metrics.counter("test_events_total", "Events", ("kind",))
+        counter.inc(("a",), 2)
+        metrics.register_collector(lambda: metrics.stats_samples(
+            "test_cache", {"hits": 3, "total_inserted": 5, "hit_ratio": 0.75, "age": None},
+            counters=("hits", "total_inserted"), gauges=("hit_ratio", "age"), labels={"db": 'x"y'},
+        ))
+        metrics.register_collector(lambda: 1 / 0)
+
+        text = metrics.render_metrics()
+        samples = _sample_lines(text)
+        assert samples['test_events_total{kind="a"}'] == "2"
+        assert samples['test_cache_hits_total{db="x\\"y"}'] == "3"
+        assert samples['test_cache_inserted_total{db="x\\"y"}'] == "5"
+        assert samples['test_cache_hit_ratio{db="x\\"y"}'] == "0.75"
+        assert "# TYPE test_cache_hit_ratio gauge" in text
+        assert "test_cache_age" not in text
+
+    def test_middleware_labels_by_route_template(self, registry, monkeypatch):
+        """Test that requests are counted per route template, not per raw path."""
+        monkeypatch.setattr(metrics, "http_requests", Counter("req_total", "", ("method", "route", "status")))
+        monkeypatch.setattr(metrics, "http_duration", Histogram("req_seconds", "", ("method", "route")))
+        app = FastAPI()
+        app.add_middleware(metrics.MetricsMiddleware)
+
+        @app.get("/zones/{zone}")
+        async def zone(zone: int):
+            return {"zone": zone}
+
+        client = TestClient(app)
+        for zone in (1, 2, 3):
+            client.get(f"/zones/{zone}")
+        client.get("/missing")
+
+        assert metrics.http_requests.get(("GET", "/zones/{zone}", "200")) == 3
+        assert metrics.http_requests.get(("GET", "unmatched", "404")) == 1
+        assert metrics.http_duration.get_count(("GET", "/zones/{zone}")) == 3
@@ -0,0 +1,116 @@
+"""
+Pytest suite for SmartZone-R request profiling and the slow-query log.
+
+Tests use a small FastAPI app with a stub authorizer, and a temporary
+database for execute_query().
+"""
+import os
+import sys
+import sqlite3
+
+import pytest
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+# Add backend directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../backend"))
+
+import database
+import profiling
+from executor import run_blocking
+from profiling import ProfilingMiddleware, SlowQueryLog
+
+
+def crunch_numbers():
+    return sum(i * i for i in range(10_000))
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """App with one route doing executor work; 'Bearer admin' may profile."""
+    monkeypatch.setattr(profiling, "_profiles", profiling.deque(maxlen=5))
+
+    async def authorize(request: Request):
+        if request.headers.get("authorization") != "Bearer admin":
+            raise HTTPException(status_code=403, detail="INSUFFICIENT CLEARANCE")
+
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, authorize=authorize)
+
+    @app.get("/work")
+    async def work():
+        return {"total": await run_blocking(crunch_numbers)}
+
+    return TestClient(app)
+
+
+class TestRequestProfiling:
+    """Tests for the opt-in profiling middleware."""
+
+    def test_admin_profile_covers_executor_work(self, client):
+        """Test that a flagged admin request is profiled, including its executor calls."""
+        response = client.get("/work?profile=1", headers={"Authorization": "Bearer admin"})
+        profile_id = response.headers["x-profile-id"]
+        session = profiling.get_profile(profile_id)
+
+        assert response.json()["total"] == crunch_numbers()
+        assert session.executor_calls == 1
+        assert session.status == 200
+        assert "crunch_numbers" in session.report()
+        assert profiling.list_profiles()[0]["path"] == "/work"
+
+    def test_profiling_requires_admin(self, client):
+        """Test that a non-admin asking for a profile is rejected and nothing is stored."""
+        response = client.get("/work", headers={"X-Profile": "1", "Authorization": "Bearer viewer"})
+
+        assert response.status_code == 403
+        assert profiling.list_profiles() == []
+
+    def test_unflagged_requests_are_not_profiled(self, client):
+        """Test that ordinary requests skip authorization and profiling entirely."""
+        response = client.get("/work?profile=0")
+
+        assert response.status_code == 200
+        assert "x-profile-id" not in response.headers
+        assert profiling.list_profiles() == []
+
+
+class TestSlowQueryLog:
+    """Tests for the slow-query ring buffer."""
+
+    def test_threshold_and_capacity(self):
+        """Test that only slow queries are kept, newest first, up to the capacity."""
+        log = SlowQueryLog(threshold_ms=50, size=2)
+        log.record("SELECT 1", None, 1, 0.01)
+        for i in range(3):
+            log.record(f"SELECT {i}\n  FROM t", (i,), i, 0.1)
+
+        entries = log.get_entries()
+        assert [entry["sql"] for entry in entries] == ["SELECT 2 FROM t", "SELECT 1 FROM t"]
+        assert entries[0]["params"] == ["2"]
+        assert entries[0]["duration_ms"] == 100.0
+        assert log.get_stats()["recorded"] == 3
+
+    def test_execute_query_records_sql_params_and_rows(self, tmp_path, monkeypatch):
+        """Test that execute_query() logs statement, parameters and row count."""
+        path = str(tmp_path / "slow.db")
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE t (v INTEGER)")
+        conn.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(10)])
+        conn.commit()
+        conn.close()
+        log = SlowQueryLog(threshold_ms=0, size=10)
+        monkeypatch.setattr(database, "slow_query_log", log)
+        observed = database.query_seconds.get_count(("read",))
+
+        rows = database.execute_query("SELECT v FROM t WHERE v >= ?", (4,), fetch_all=True, db_path=path)
+
+        entry = log.get_entries()[0]
+        assert len(rows) == 6
+        assert entry["sql"] == "SELECT v FROM t WHERE v >= ?"
+        assert entry["params"] == ["4"]
+        assert entry["rows"] == 6
+        assert entry["source"] == "execute_query"
+        assert database.query_seconds.get_count(("read",)) == observed + 1
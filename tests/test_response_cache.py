@@ -0,0 +1,116 @@
+"""
+Pytest suite for the SmartZone-R dataset-versioned response cache.
+
+Tests run a small FastAPI app with a stubbed dataset version, so no
+database is needed.
+"""
+import os
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+# Add backend directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../backend"))
+
+import response_cache
+from response_cache import ResponseCache, cached_response
+from models import ZoneSummary
+
+
+@pytest.fixture
+def app(monkeypatch):
+    """App with one cached route; the dataset version is controlled by the test."""
+    state = {"version": "1", "computes": 0, "config": {"stress": 85}}
+    monkeypatch.setattr(response_cache, "response_cache", ResponseCache(max_bytes=10_000, max_entries=10))
+    monkeypatch.setattr(response_cache, "get_dataset_version", lambda: state["version"])
+
+    app = FastAPI()
+
+    @app.get("/zones", response_model=List[ZoneSummary])
+    async def zones(request: Request):
+        def compute():
+            state["computes"] += 1
+            return [{"zone": 1, "avg_stress": 10.0, "max_stress": 20.0, "avg_rubber": 1.0,
+                     "avg_cracks": 0.5, "avg_water": 0.0, "avg_fod": 0.0,
+                     "flight_count": state["computes"], "anomaly_count": 0, "status": "normal"}]
+        return await cached_response(request, compute, List[ZoneSummary], config=state["config"])
+
+    return TestClient(app), state
+
+
+class TestResponseCache:
+    """Tests for ETags, 304s and version-keyed invalidation."""
+
+    def test_hit_and_not_modified(self, app):
+        """Test that repeat requests reuse the body and If-None-Match yields 304."""
+        client, state = app
+        first = client.get("/zones")
+        second = client.get("/zones")
+        revalidated = client.get("/zones", headers={"If-None-Match": first.headers["etag"]})
+
+        assert state["computes"] == 1
+        assert second.content == first.content
+        assert second.headers["etag"] == first.headers["etag"]
+        assert revalidated.status_code == 304
+        assert revalidated.content == b""
+        assert response_cache.response_cache.get_stats()["not_modified"] == 1
+
+    def test_new_version_or_config_recomputes(self, app):
+        """Test that new data or changed thresholds produce a fresh body and ETag."""
+        client, state = app
+        etag = client.get("/zones").headers["etag"]
+
+        state["version"] = "2"
+        response = client.get("/zones", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()[0]["flight_count"] == 2
+
+        state["config"] = {"stress": 90}
+        client.get("/zones")
+        client.get("/zones?zone=1")
+        assert state["computes"] == 4
+
+    def test_concurrent_misses_compute_once(self, app):
+        """Test that simultaneous misses on one key share a single computation."""
+        _, state = app
+        barrier = threading.Barrier(8)
+
+        def compute():
+            state["computes"] += 1
+            time.sleep(0.05)
+            return [{"zone": 1, "avg_stress": 10.0, "max_stress": 20.0, "avg_rubber": 1.0,
+                     "avg_cracks": 0.5, "avg_water": 0.0, "avg_fod": 0.0,
+                     "flight_count": 1, "anomaly_count": 0, "status": "normal"}]
+
+        def request(_):
+            barrier.wait()
+            return response_cache._lookup_or_compute("/zones", "", compute, List[ZoneSummary], None)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(request, range(8)))
+
+        stats = response_cache.response_cache.get_stats()
+        assert state["computes"] == 1
+        assert len(set(results)) == 1
+        assert stats["misses"] == 8
+        assert stats["coalesced"] == 7
+
+    def test_lru_respects_memory_cap(self):
+        """Test that entries are evicted oldest-first once the byte cap is exceeded."""
+        cache = ResponseCache(max_bytes=100, max_entries=10)
+        for i in range(4):
+            cache.put(("k", i), f'"{i}"', b"x" * 40)
+
+        stats = cache.get_stats()
+        assert stats["bytes"] <= 100
+        assert stats["evictions"] == 2
+        assert cache.get(("k", 0)) is None
+        assert cache.get(("k", 3)) is not None
@@ -0,0 +1,165 @@
+"""
+Pytest suite for the SmartZone-R per-zone rollup tables.
+
+Tests check that incrementally maintained minute/hour/day rollups agree
+with aggregates computed from the raw runway_data rows.
+"""
+import os
+import sys
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+# Add backend directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../backend"))
+
+import database
+import generate_data
+import rollups
+from serial_listener import IngestWriter, SerialListener
+
+ESP_LINE = '{"zone": 3, "temp": 31.5, "humidity": 70, "stress": 82.0, "water_mm": 1.2, "fod": 12, "timestamp": "2026-01-01T10:00:00"}'
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """Temporary runway database with three days of generated history."""
+    path = str(tmp_path / "runway.db")
+    monkeypatch.setattr(generate_data, "DB_PATH", path)
+    monkeypatch.setattr(database, "DB_PATH", path)
+    generate_data.create_database()
+    generate_data.generate_history(3000, datetime(2026, 1, 1), datetime(2026, 1, 4), seed=3)
+    return path
+
+
+def _rollup_rows(db_path, grain):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(f"SELECT * FROM {rollups.rollup_table(grain)} ORDER BY bucket, zone").fetchall()
+    finally:
+        conn.close()
+
+
+def _assert_aggregates_match(rollup_agg, raw_agg):
+    assert list(rollup_agg["zone"]) == list(raw_agg["zone"])
+    for column in raw_agg.columns:
+        assert rollup_agg[column].tolist() == pytest.approx(raw_agg[column].tolist(), abs=1e-6), column
+
+
+class TestRollupMaintenance:
+    """Tests for incremental maintenance and rebuilds."""
+
+    def test_every_grain_matches_raw_aggregates(self, db_path):
+        """Test that each grain sums back to the raw per-zone aggregates."""
+        raw = database.query_zone_aggregates()
+        _assert_aggregates_match(rollups.query_zone_aggregates(), raw)
+
+        conn = sqlite3.connect(db_path)
+        try:
+            for grain in rollups.ROLLUP_GRAINS:
+                totals = conn.execute(
+                    f"SELECT SUM(reading_count), SUM(anomaly_count), MAX(stress_max) "
+                    f"FROM {rollups.rollup_table(grain)}"
+                ).fetchone()
+                assert totals[0] == raw["flight_count"].sum()
+                assert totals[1] == raw["anomaly_count"].sum()
+                assert totals[2] == pytest.approx(raw["stress_max"].max())
+        finally:
+            conn.close()
+
+    def test_ingest_writer_updates_rollups_in_same_commit(self, db_path):
+        """Test that serial ingest folds new rows into rollups as it writes them."""
+        writer = IngestWriter(db_path=db_path, flush_interval=0.05)
+        listener = SerialListener(writer=writer)
+        writer.start()
+        for _ in range(4):
+            listener.enqueue(listener.map_to_schema(listener.parse_json(ESP_LINE)))
+        writer.stop()
+
+        hour = [r for r in _rollup_rows(db_path, "hour") if r[0] == "2026-01-01T10:00:00" and r[1] == 3]
+        raw = database.execute_query(
+            "SELECT COUNT(*) AS n FROM runway_data WHERE zone = 3 AND timestamp LIKE '2026-01-01T10:%'",
+            fetch_one=True,
+        )
+        assert hour[0][2] == raw["n"]
+        _assert_aggregates_match(rollups.query_zone_aggregates(), database.query_zone_aggregates())
+
+    def test_rebuild_matches_incremental(self, db_path):
+        """Test that a rebuild from raw rows reproduces the incremental rollups."""
+        before = {grain: _rollup_rows(db_path, grain) for grain in rollups.ROLLUP_GRAINS}
+        with database.get_db_connection(db_path) as conn:
+            assert rollups.rebuild_rollups(conn) == 3000
+
+        for grain, rows in before.items():
+            assert _rollup_rows(db_path, grain) == rows
+
+    def test_rows_written_without_maintenance_are_caught_up(self, db_path):
+        """Test that readers fold in rows inserted behind the rollups' back."""
+        conn = sqlite3.connect(db_path)
+        with conn:
+            conn.execute(
+                "INSERT INTO runway_data (timestamp, flight_id, aircraft, zone, rubber_mm, cracks_mm, "
+                "water_mm, stress, fod_weight_g, temperature_C, humidity_pct, rain_mm, anomaly) "
+                "VALUES ('2026-01-05T00:00:00', 'XX0001', 'A320', 99, 5, 5, 0, 50, 0, 25, 70, 0, 0)"
+            )
+        conn.close()
+
+        agg = rollups.query_zone_aggregates()
+        assert 99 in agg["zone"].tolist()
+        _assert_aggregates_match(agg, database.query_zone_aggregates())
+
+    def test_read_paths_skip_the_writer_when_current(self, db_path):
+        """Test that up-to-date rollups are served without checking out the pooled writer."""
+        from db_pool import get_pool
+
+        rollups.refresh_rollups()
+        before = get_pool(db_path).get_stats()["writer_checkouts"]
+        rollups.query_zone_aggregates()
+        rollups.get_time_series("stress", max_points=48)
+
+        assert get_pool(db_path).get_stats()["writer_checkouts"] == before
+
+
+class TestRollupTimeSeries:
+    """Tests for long-window time series read from rollups."""
+
+    def test_long_window_uses_rollups_within_bounds(self, db_path):
+        """Test grain choice and that bucket min/max bound the raw values."""
+        data = rollups.get_time_series("stress", zone=5, max_points=48)
+        raw = database.load_data()
+        raw = raw[raw["zone"] == 5]["stress"]
+
+        assert data["rollup_grain"] == "hour"
+        assert len(data["labels"]) <= 48
+        dataset = data["datasets"][0]
+        assert min(v for v in dataset["min"] if v is not None) == pytest.approx(raw.min())
+        assert max(v for v in dataset["max"] if v is not None) == pytest.approx(raw.max())
+
+    def test_timezone_aware_bounds_on_both_paths(self, db_path):
+        """Test that Z-suffixed bounds work for rollup buckets and the raw fallback."""
+        long_naive = rollups.get_time_series(
+            "stress", start=datetime(2026, 1, 1), end=datetime(2026, 1, 4), max_points=48
+        )
+        long_aware = rollups.get_time_series(
+            "stress", start="2026-01-01T00:00:00Z", end="2026-01-04T00:00:00+00:00", max_points=48
+        )
+        df = database.load_data()
+        short_naive = database.get_time_series(df, "stress", start=datetime(2026, 1, 2), end=datetime(2026, 1, 2, 1))
+        short_aware = database.get_time_series(df, "stress", start="2026-01-02T00:00:00Z", end="2026-01-02T01:00:00Z")
+
+        assert long_aware == long_naive
+        assert long_aware["rollup_grain"] == "hour"
+        assert short_aware == short_naive
+        assert rollups.get_time_series(
+            "stress", start="2026-01-02T00:00:00Z", end="2026-01-02T01:00:00Z", max_points=500
+        ) is None
+
+    def test_short_window_falls_back_to_raw(self, db_path):
+        """Test that windows finer than a minute per point are not served from rollups."""
+        assert rollups.pick_grain(3600, 500) is None
+        assert rollups.get_time_series(
+            "stress", start=datetime(2026, 1, 2), end=datetime(2026, 1, 2, 1), max_points=500
+        ) is None
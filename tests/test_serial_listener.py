@@ -0,0 +1,196 @@
+"""
+Pytest suite for the SmartZone-R serial ingest pipeline.
+
+Tests cover JSON parsing/mapping, the batched SQLite writer that
+drains readings from the bounded ingest queue, and multi-device
+ingestion using pseudo-terminals in place of ESP32 hardware.
+"""
+import os
+import pty
+import sys
+import time
+import sqlite3
+
+import pytest
+
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+# Add backend directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../backend"))
+
+import generate_data
+from serial_listener import SerialListener, IngestWriter, DeviceManager, resolve_ports
+
+ESP_LINE = '{"zone": 3, "temp": 31.5, "humidity": 70, "stress": 82.0, "water_mm": 1.2, "fod": 12, "timestamp": "2026-01-01T10:00:00"}'
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """Temporary empty runway database."""
+    path = str(tmp_path / "runway.db")
+    monkeypatch.setattr(generate_data, "DB_PATH", path)
+    generate_data.create_database()
+    return path
+
+
+def _count_rows(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM runway_data").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _reading(listener):
+    return listener.map_to_schema(listener.parse_json(ESP_LINE))
+
+
+class TestIngestWriter:
+    """Tests for the batching writer."""
+
+    def test_records_flushed_in_batches(self, db_path):
+        """Test that queued readings land in SQLite in batch-sized transactions."""
+        writer = IngestWriter(db_path=db_path, batch_size=10, flush_interval=0.05)
+        listener = SerialListener(writer=writer)
+
+        writer.start()
+        for _ in range(25):
+            assert listener.enqueue(_reading(listener))
+        writer.stop()
+
+        stats = writer.get_stats()
+        assert _count_rows(db_path) == 25
+        assert stats["total_inserted"] == 25
+        assert stats["batches"] >= 3
+        assert stats["dropped"] == 0
+        assert listener.get_status()["readings"] == 25
+
+    def test_wal_mode_enabled(self, db_path):
+        """Test that the writer switches the database to WAL journaling."""
+        writer = IngestWriter(db_path=db_path)
+        writer.start()
+        writer.stop()
+
+        conn = sqlite3.connect(db_path)
+        try:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        finally:
+            conn.close()
+
+    def test_full_queue_drops_with_backpressure_counters(self, db_path):
+        """Test that a full queue blocks briefly, then drops and counts the reading."""
+        writer = IngestWriter(db_path=db_path, queue_size=2, enqueue_timeout=0.01)
+        listener = SerialListener(writer=writer)
+
+        results = [listener.enqueue(_reading(listener)) for _ in range(3)]
+        stats = writer.get_stats()
+
+        assert results == [True, True, False]
+        assert stats["blocked"] == 1
+        assert stats["dropped"] == 1
+        assert stats["max_queue_depth"] == 2
+
+    def test_open_failure_is_retried_and_reported(self, db_path, monkeypatch):
+        """Test that a failing database open is retried and surfaced instead of killing the writer."""
+        writer = IngestWriter(db_path=db_path, flush_interval=0.05)
+        listener = SerialListener(writer=writer)
+        real_open = writer._open
+        attempts = []
+
+        def flaky_open():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise sqlite3.OperationalError("database is locked")
+            real_open()
+
+        monkeypatch.setattr(writer, "_open", flaky_open)
+        monkeypatch.setattr(writer.stop_event, "wait", lambda timeout: None)
+        writer.start()
+        assert listener.enqueue(_reading(listener))
+        deadline = time.monotonic() + 2
+        while not writer.get_stats()["database_open"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        writer.stop()
+        stats = writer.get_stats()
+
+        assert stats["open_failures"] == 1
+        assert stats["database_open"] is True
+        assert stats["last_error"] is None
+        assert stats["total_inserted"] == 1
+        assert _count_rows(db_path) == 1
+
+
+class TestParsing:
+    """Tests for ESP32 JSON parsing."""
+
+    def test_incomplete_json_rejected(self):
+        """Test that lines missing required fields are ignored."""
+        listener = SerialListener(writer=IngestWriter())
+        assert listener.parse_json('{"zone": 1}') is None
+        assert listener.parse_json("not json") is None
+
+    def test_mapping_flags_anomaly(self):
+        """Test schema mapping and anomaly calculation."""
+        listener = SerialListener(writer=IngestWriter())
+        record = _reading(listener)
+
+        assert record["zone"] == 3
+        assert record["temperature_C"] == 31.5
+        assert record["anomaly"] == 1
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+@pytest.fixture
+def fake_devices():
+    """Two pseudo-terminals standing in for ESP32 serial ports."""
+    pairs = [pty.openpty() for _ in range(2)]
+    yield [(master, os.ttyname(slave)) for master, slave in pairs]
+    for master, slave in pairs:
+        os.close(master)
+        os.close(slave)
+
+
+class TestDeviceManager:
+    """Tests for multi-port ingestion."""
+
+    def test_resolve_ports_expands_globs(self, tmp_path):
+        """Test that globs expand and explicit ports are kept once."""
+        for name in ["ttyUSB1", "ttyUSB0"]:
+            (tmp_path / name).touch()
+        spec = f"{tmp_path}/ttyUSB*, /dev/ttyACM0, {tmp_path}/ttyUSB0"
+
+        assert resolve_ports(spec) == [
+            f"{tmp_path}/ttyUSB0", f"{tmp_path}/ttyUSB1", "/dev/ttyACM0"
+        ]
+
+    def test_one_reader_per_pty_device(self, db_path, fake_devices):
+        """Test that each device is read independently into the shared writer."""
+        writer = IngestWriter(db_path=db_path, flush_interval=0.05)
+        spec = ",".join(port for _, port in fake_devices)
+        manager = DeviceManager(spec, writer=writer, reconnect_interval=1)
+
+        assert manager.start()
+        try:
+            first, second = fake_devices
+            assert _wait_for(lambda: all(d["connected"] for d in manager.get_status()["devices"]))
+            os.write(first[0], ((ESP_LINE + "\n") * 3 + "garbage\n").encode())
+            os.write(second[0], (ESP_LINE + "\n").encode())
+            assert _wait_for(lambda: writer.get_stats()["total_inserted"] == 4)
+        finally:
+            manager.stop()
+
+        devices = {d["port"]: d for d in manager.get_status()["devices"]}
+        assert devices[first[1]]["readings"] == 3
+        assert devices[first[1]]["parse_errors"] == 1
+        assert devices[first[1]]["parse_error_rate"] == 0.25
+        assert devices[second[1]]["readings"] == 1
+        assert devices[second[1]]["last_reading_age_seconds"] is not None
+        assert _count_rows(db_path) == 4
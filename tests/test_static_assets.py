@@ -0,0 +1,95 @@
+"""
+Pytest suite for the SmartZone-R in-memory static asset layer.
+
+Tests build a manifest from a temporary frontend directory and serve it
+through a small FastAPI app.
+"""
+import os
+import sys
+import gzip
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+# Add backend directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../backend"))
+
+import static_assets
+from static_assets import serve_static
+
+INDEX = """<html><head><link rel="stylesheet" href="css/main.css"></head>
+<body><script type="module">import * as api from './js/api.js';</script>
+<script src="https://cdn.example.com/lib.js"></script></body></html>"""
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Client for an app serving a temporary frontend from memory."""
+    (tmp_path / "css").mkdir()
+    (tmp_path / "js").mkdir()
+    (tmp_path / "index.html").write_text(INDEX)
+    (tmp_path / "alerts.html").write_text("<html>alerts</html>")
+    (tmp_path / "css" / "main.css").write_text("body { color: #0f0; }\n" * 100)
+    (tmp_path / "js" / "api.js").write_text("export const x = 1;\n")
+    monkeypatch.setattr(static_assets, "_manifest", None)
+    manifest = static_assets.load_static_assets(str(tmp_path))
+
+    app = FastAPI()
+
+    @app.get("/{path:path}")
+    async def frontend(path: str, request: Request):
+        return serve_static(request, path)
+
+    return TestClient(app), manifest
+
+
+class TestStaticAssets:
+    """Tests for manifest lookups, compression and cache headers."""
+
+    def test_pages_reference_versioned_assets(self, client):
+        """Test that local CSS/JS references carry the asset hash and CDN URLs are untouched."""
+        client, manifest = client
+        html = client.get("/").text
+        css, js = manifest.assets["css/main.css"], manifest.assets["js/api.js"]
+
+        assert f'href="css/main.css?v={css.hash}"' in html
+        assert f"from './js/api.js?v={js.hash}'" in html
+        assert '"https://cdn.example.com/lib.js"' in html
+
+    def test_versioned_asset_is_immutable_and_compressed(self, client):
+        """Test that ?v=<hash> URLs get a long max-age and the precompressed body."""
+        client, manifest = client
+        css = manifest.assets["css/main.css"]
+        response = client.get(f"/css/main.css?v={css.hash}", headers={"Accept-Encoding": "gzip"})
+
+        assert "immutable" in response.headers["cache-control"]
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.content == gzip.decompress(css.variants["gzip"])
+
+        unversioned = client.get("/css/main.css", headers={"Accept-Encoding": "identity"})
+        assert unversioned.headers["cache-control"] == "no-cache"
+        assert "content-encoding" not in unversioned.headers
+
+    def test_etag_revalidation(self, client):
+        """Test that a matching If-None-Match yields 304 without a body."""
+        client, _ = client
+        etag = client.get("/js/api.js").headers["etag"]
+        response = client.get("/js/api.js", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+
+    def test_html_and_spa_fallback_served_from_memory(self, client, tmp_path):
+        """Test that /alerts maps to alerts.html and unknown routes to index.html without disk reads."""
+        client, _ = client
+        for file in tmp_path.rglob("*.html"):
+            file.unlink()
+
+        assert client.get("/alerts").text == "<html>alerts</html>"
+        spa = client.get("/zones/7/history")
+        assert spa.status_code == 200
+        assert "css/main.css?v=" in spa.text
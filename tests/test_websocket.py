@@ -0,0 +1,289 @@
+"""
+Pytest suite for the SmartZone-R WebSocket broadcaster.
+
+Tests drive ConnectionManager with in-memory fake sockets and a
+stubbed live-update builder, so no server or database is needed.
+"""
+import os
+import sys
+import json
+import asyncio
+
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+# Add backend directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../backend"))
+
+import websocket
+from websocket import ConnectionManager
+
+
+class FakeWebSocket:
+    """Minimal stand-in for a Starlette WebSocket."""
+
+    def __init__(self, delay=0.0):
+        self.messages = []
+        self.delay = delay
+        self.closed = False
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        await asyncio.sleep(self.delay)
+        self.messages.append(json.loads(text))
+
+    async def close(self, code=None, reason=None):
+        self.closed = True
+
+
+class StubData:
+    """Controls max(id) and counts live-update rebuilds."""
+
+    def __init__(self):
+        self.max_id = 1
+        self.builds = 0
+
+    def get_max_row_id(self):
+        return self.max_id
+
+    async def build(self):
+        self.builds += 1
+        return {"type": "live_update", "build": self.builds}
+
+
+def _run_with_manager(monkeypatch, scenario):
+    stub = StubData()
+    monkeypatch.setattr(websocket, "get_max_row_id", stub.get_max_row_id)
+    monkeypatch.setattr(websocket, "COALESCE_WINDOW_SECONDS", 0.02)
+
+    async def main():
+        manager = ConnectionManager()
+        manager._build_live_update = stub.build
+        manager.broadcast_task = asyncio.create_task(manager.start_broadcast())
+        await asyncio.sleep(0)
+        try:
+            await scenario(manager, stub)
+        finally:
+            await manager.stop_broadcast()
+
+    asyncio.run(main())
+    return stub
+
+
+class TestEventDrivenBroadcast:
+    """Tests for ingest-triggered, coalesced broadcasting."""
+
+    def test_connect_pushes_initial_update(self, monkeypatch):
+        """Test that a new client receives an update without waiting for ingest."""
+        client = FakeWebSocket()
+
+        async def scenario(manager, stub):
+            await manager.connect(client)
+            await asyncio.sleep(0.1)
+
+        stub = _run_with_manager(monkeypatch, scenario)
+        assert stub.builds == 1
+        assert client.messages[0]["type"] == "live_update"
+
+    def test_unchanged_data_skips_rebuild(self, monkeypatch):
+        """Test that an event without new rows does not rebuild the update."""
+        async def scenario(manager, stub):
+            await manager.connect(FakeWebSocket())
+            await asyncio.sleep(0.1)
+            manager.notify_new_data()
+            await asyncio.sleep(0.1)
+            assert manager.get_stats()["updates_skipped"] == 1
+
+        stub = _run_with_manager(monkeypatch, scenario)
+        assert stub.builds == 1
+
+    def test_burst_of_events_coalesced(self, monkeypatch):
+        """Test that several ingest events in one window produce one update."""
+        client = FakeWebSocket()
+
+        async def scenario(manager, stub):
+            await manager.connect(client)
+            await asyncio.sleep(0.1)
+            stub.max_id = 5
+            for _ in range(5):
+                manager.notify_new_data()
+            await asyncio.sleep(0.1)
+
+        stub = _run_with_manager(monkeypatch, scenario)
+        assert stub.builds == 2
+        assert [m["build"] for m in client.messages] == [1, 2]
+
+    def test_idle_heartbeat_without_rebuild(self, monkeypatch):
+        """Test that idle periods send heartbeats and never touch the data."""
+        monkeypatch.setattr(websocket, "HEARTBEAT_INTERVAL_SECONDS", 0.05)
+        client = FakeWebSocket()
+
+        async def scenario(manager, stub):
+            await manager.connect(client)
+            await asyncio.sleep(0.2)
+
+        stub = _run_with_manager(monkeypatch, scenario)
+        assert stub.builds == 1
+        assert any(m["type"] == "heartbeat" for m in client.messages)
+
+
+class TestFanOut:
+    """Tests for encode-once, per-client outbox broadcasting."""
+
+    def test_slow_client_does_not_stall_others(self, monkeypatch):
+        """Test that a fast client receives frames while a slow one lags and drops."""
+        monkeypatch.setattr(websocket, "OUTBOX_SIZE", 2)
+        fast, slow = FakeWebSocket(), FakeWebSocket(delay=0.5)
+
+        async def main():
+            manager = ConnectionManager()
+            await manager.connect(fast)
+            await manager.connect(slow)
+            for i in range(6):
+                await manager.broadcast({"type": "live_update", "seq": i})
+                await asyncio.sleep(0.01)
+            stats = manager.get_stats()
+            await manager.stop_broadcast()
+            return stats
+
+        stats = asyncio.run(main())
+        assert [m["seq"] for m in fast.messages] == list(range(6))
+        assert slow.messages == []
+        assert stats["frames_dropped"] > 0
+
+    def test_send_timeout_disconnects_client(self, monkeypatch):
+        """Test that a client stuck past the send timeout is closed and removed."""
+        monkeypatch.setattr(websocket, "SEND_TIMEOUT_SECONDS", 0.05)
+        stuck = FakeWebSocket(delay=1.0)
+
+        async def main():
+            manager = ConnectionManager()
+            await manager.connect(stuck)
+            await manager.broadcast({"type": "heartbeat"})
+            await asyncio.sleep(0.2)
+            return manager.get_stats()
+
+        stats = asyncio.run(main())
+        assert stats["clients"] == 0
+        assert stats["slow_disconnects"] == 1
+        assert stuck.closed
+
+    def test_max_connections_configurable(self, monkeypatch):
+        """Test that connections beyond WS_MAX_CONNECTIONS are refused."""
+        monkeypatch.setattr(websocket, "MAX_CONNECTIONS", 3)
+
+        async def main():
+            manager = ConnectionManager()
+            results = [await manager.connect(FakeWebSocket()) for _ in range(4)]
+            await manager.stop_broadcast()
+            return results
+
+        assert asyncio.run(main()) == [True, True, True, False]
+
+
+class TestDeltaUpdates:
+    """Tests for snapshot-on-connect and sequenced deltas."""
+
+    def test_diff_reports_changed_and_removed_keys(self):
+        """Test that only changed zones/KPIs and removed zones appear in a delta."""
+        previous = {
+            "type": "live_update", "timestamp": "t1", "seq": 1, "active_alerts": 0,
+            "zones": {1: {"status": "NORMAL"}, 2: {"status": "NORMAL"}, 3: {"status": "NORMAL"}},
+            "kpis": {"flights": 10, "anomalies": 1},
+        }
+        current = {
+            "type": "live_update", "timestamp": "t2", "active_alerts": 0,
+            "zones": {1: {"status": "NORMAL"}, 2: {"status": "CRITICAL"}},
+            "kpis": {"flights": 11, "anomalies": 1},
+        }
+
+        assert websocket.diff_live_update(previous, current) == {
+            "zones": {2: {"status": "CRITICAL"}},
+            "kpis": {"flights": 11},
+            "removed": {"zones": [3]},
+        }
+        assert websocket.diff_live_update(current, current) == {}
+
+    def test_late_client_gets_snapshot_then_deltas(self, monkeypatch):
+        """Test that a client joining later gets the snapshot without a rebuild, then deltas."""
+        first, late = FakeWebSocket(), FakeWebSocket()
+
+        async def scenario(manager, stub):
+            await manager.connect(first)
+            await asyncio.sleep(0.1)
+            await manager.connect(late)
+            await asyncio.sleep(0.1)
+            stub.max_id = 2
+            manager.notify_new_data()
+            await asyncio.sleep(0.1)
+
+        stub = _run_with_manager(monkeypatch, scenario)
+        assert stub.builds == 2
+        assert [(m["type"], m["seq"]) for m in late.messages] == [("live_update", 1), ("live_delta", 2)]
+        assert late.messages[1] == {"timestamp": None, "type": "live_delta", "seq": 2, "build": 2}
+
+    def test_resync_resends_snapshot(self, monkeypatch):
+        """Test that a resync command queues the latest snapshot for that client only."""
+        client, other = FakeWebSocket(), FakeWebSocket()
+
+        async def scenario(manager, stub):
+            monkeypatch.setattr(websocket, "manager", manager)
+            await manager.connect(client)
+            await manager.connect(other)
+            await asyncio.sleep(0.1)
+            websocket.handle_client_message(client, '{"type": "resync", "seq": 0}')
+            websocket.handle_client_message(client, "not json")
+            await asyncio.sleep(0.05)
+
+        _run_with_manager(monkeypatch, scenario)
+        assert [m["type"] for m in client.messages] == ["live_update", "live_update"]
+        assert [m["type"] for m in other.messages] == ["live_update"]
+
+
+class TestLiveUpdateQuery:
+    """Tests for the single grouped live-update query."""
+
+    def test_zones_and_kpis_from_one_query(self, tmp_path, monkeypatch):
+        """Test per-zone status and window KPIs against recent rows only."""
+        import sqlite3
+        from datetime import datetime, timedelta
+        import generate_data
+
+        path = str(tmp_path / "live.db")
+        monkeypatch.setattr(generate_data, "DB_PATH", path)
+        generate_data.create_database()
+
+        now = datetime.utcnow()
+        recent = (now - timedelta(minutes=5)).strftime("%Y-%m-%d %H:%M:%S")
+        old = (now - timedelta(hours=3)).strftime("%Y-%m-%d %H:%M:%S")
+        rows = [
+            (recent, "FL1", 1, 90.0, 1),
+            (recent, "FL2", 1, 80.0, 0),
+            (recent, "FL3", 2, 30.0, 1),
+            # A flight crossing a second zone is still one flight
+            (recent, "FL1", 2, 40.0, 0),
+            (old, "FL4", 3, 99.0, 1),
+        ]
+        conn = sqlite3.connect(path)
+        conn.row_factory = sqlite3.Row
+        with conn:
+            conn.executemany(
+                "INSERT INTO runway_data (timestamp, flight_id, aircraft, zone, rubber_mm, cracks_mm, "
+                "water_mm, stress, fod_weight_g, temperature_C, humidity_pct, rain_mm, anomaly) "
+                "VALUES (?, ?, 'A320', ?, 5, 5, 0, ?, 0, 25, 70, 0, ?)",
+                rows,
+            )
+
+        message = websocket.build_live_update(conn)
+        conn.close()
+
+        assert list(message["zones"]) == [1, 2]
+        assert message["zones"][1]["status"] == "CRITICAL"
+        assert message["zones"][1]["avg_stress"] == 85.0
+        assert message["zones"][2]["status"] == "ANOMALY"
+        assert message["kpis"]["flights"] == 3
+        assert message["kpis"]["anomalies"] == 2
+        assert message["kpis"]["worst_zone"] == "Zone 1"
+        assert message["kpis"]["max_stress"] == 90.0
+        assert message["active_alerts"] == 0